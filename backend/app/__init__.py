@@ -27,6 +27,17 @@ def create_app(config_name="default"):
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
          supports_credentials=True)
 
+    # Verify the caller's token once; routes read it from g.identity
+    from app.identity import load_identity
+
+    app.before_request(load_identity)
+
+    # Validate ?cursor= on list routes before they run; cursors are bound to
+    # the caller, so this runs after load_identity
+    from app.pagination import load_cursor
+
+    app.before_request(load_cursor)
+
     # Register blueprints
     from app.admin_routes import admin_bp
     from app.advanced_routes import advanced_bp
@@ -5,8 +5,9 @@ This is the main interface for the Adaptive Content Engine.
 Coordinates all components: learner profiles, skill trees, module selection, and generation.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from app.models import User as UserModel, Lab as LabModel
+from app.orm import orm, UnitOfWork
 from .learner_profile import LearnerProfileManager
 from .skill_tree import SkillTreeManager
 from .module_selector import ModuleSelector
@@ -167,21 +168,11 @@ class ACEEngine:
         completed = performance_data.get("completed", False)
         time_taken = performance_data.get("time_taken", 1800)
         score = performance_data.get("score", 0.0)
-        module_id = module_data.get("id", "unknown")
         module_skills = module_data.get("skills", [])
         
-        # Update learner profile
-        updated_profile = self.profile_manager.update_profile(
-            user_id, module_id, completed, time_taken, score
-        )
-        
-        # Update skill tree if module was completed
-        if completed and module_skills:
-            # Convert score to performance score (0-100)
-            performance_score = min(100.0, max(0.0, score))
-            self.skill_manager.update_skill_tree_from_module(
-                user_id, module_skills, performance_score
-            )
+        # Update learner profile and skill tree together
+        with orm.transaction() as uow:
+            self.stage_module_completion(uow, user_id, module_skills, completed, time_taken, score)
         
         # Get updated analysis and recommendations
         analysis = self.get_comprehensive_user_analysis(user_id)
@@ -198,6 +189,27 @@ class ACEEngine:
         
         return analysis
     
+    def stage_module_completion(self, uow: UnitOfWork, user_id: str, module_skills: List[str],
+                                completed: bool, time_taken: int, score: float) -> Tuple[Any, Any]:
+        """Add the profile and skill tree updates for a finished module to a unit of work
+        
+        Returns the updated (profile, skill_tree); the skill tree is None
+        when it doesn't change.
+        """
+        profile = self.profile_manager.load_profile(user_id) or self.profile_manager.new_profile(user_id)
+        self.profile_manager.record_module_result(profile, completed, time_taken)
+        self.profile_manager.stage_profile(uow, profile)
+        
+        skill_tree = None
+        if completed and module_skills:
+            # Convert score to performance score (0-100)
+            performance_score = min(100.0, max(0.0, float(score or 0)))
+            skill_tree = self.skill_manager.load_skill_tree(user_id) or self.skill_manager.new_skill_tree(user_id)
+            self.skill_manager.record_module_skills(skill_tree, module_skills, performance_score)
+            self.skill_manager.stage_skill_tree(uow, skill_tree)
+        
+        return profile, skill_tree
+    
     def get_adaptive_recommendations(self, user_id: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Get adaptive recommendations based on current context
@@ -5,12 +5,11 @@ Tracks user learning patterns, completion rates, failure rates, and time taken.
 Includes expiry system for inactive users.
 """
 
-import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from decimal import Decimal
-from app.orm import orm
+from app.orm import orm, UnitOfWork
 
 
 @dataclass
@@ -48,17 +47,26 @@ class LearnerProfileManager:
     
     def get_or_create_profile(self, user_id: str) -> LearnerProfile:
         """Get existing learner profile or create new one"""
+        profile = self.load_profile(user_id)
+        if profile:
+            return profile
+        
+        profile = self.new_profile(user_id)
+        
+        # Save to database
+        self.save_profile(profile)
+        return profile
+    
+    def load_profile(self, user_id: str) -> Optional[LearnerProfile]:
+        """Stored learner profile, or None if the user has none yet"""
         # Try to get existing profile from user preferences
-        result = orm.user_preferences.scan(
-            filter_expression="user_id = :user_id AND preference_type = :type",
-            expression_values={
-                ":user_id": user_id,
-                ":type": "learner_profile"
-            }
-        )
+        existing = orm.user_preferences.find_one({
+            "user_id": user_id,
+            "preference_type": "learner_profile"
+        })
         
-        if result.items:
-            profile_data = result.items[0].to_dict()
+        if existing:
+            profile_data = existing.to_dict()
             # Convert Decimal values back to float for the dataclass
             raw_data = profile_data['profile_data']
             return LearnerProfile(
@@ -73,24 +81,30 @@ class LearnerProfileManager:
                 created_at=raw_data['created_at'],
                 updated_at=raw_data['updated_at']
             )
-        
-        # Create new profile
-        profile = LearnerProfile(
+        return None
+    
+    def new_profile(self, user_id: str) -> LearnerProfile:
+        """Fresh, unsaved learner profile"""
+        return LearnerProfile(
             user_id=user_id,
             created_at=datetime.utcnow().isoformat(),
             updated_at=datetime.utcnow().isoformat(),
             last_activity=datetime.utcnow().isoformat()
         )
-        
-        # Save to database
-        self.save_profile(profile)
-        return profile
     
     def update_profile(self, user_id: str, module_id: str, 
                       completed: bool, time_taken: int, score: float = None) -> LearnerProfile:
         """Update learner profile based on module interaction"""
-        profile = self.get_or_create_profile(user_id)
+        profile = self.load_profile(user_id) or self.new_profile(user_id)
+        self.record_module_result(profile, completed, time_taken)
+        
+        # Save updated profile
+        self.save_profile(profile)
         
+        return profile
+    
+    def record_module_result(self, profile: LearnerProfile, completed: bool, time_taken: int):
+        """Fold one module interaction into the profile's statistics"""
         # Update statistics
         profile.total_modules_attempted += 1
         if completed:
@@ -119,17 +133,18 @@ class LearnerProfileManager:
         # Update activity timestamp
         profile.last_activity = datetime.utcnow().isoformat()
         profile.updated_at = datetime.utcnow().isoformat()
-        
-        # Save updated profile
-        self.save_profile(profile)
-        
-        return profile
     
     def save_profile(self, profile: LearnerProfile):
         """Save learner profile to database"""
-        profile_data = {
-            "id": str(uuid.uuid4()),
-            "user_id": profile.user_id,
+        # user-preferences is keyed by user_id, so the upsert needs no lookup
+        orm.user_preferences.atomic_update({"user_id": profile.user_id}, set_fields=self._profile_fields(profile))
+    
+    def stage_profile(self, uow: UnitOfWork, profile: LearnerProfile):
+        """Add the profile's upsert to a unit of work instead of saving it"""
+        uow.update(orm.user_preferences, {"user_id": profile.user_id}, set_fields=self._profile_fields(profile))
+    
+    def _profile_fields(self, profile: LearnerProfile) -> Dict[str, Any]:
+        return {
             "preference_type": "learner_profile",
             "profile_data": {
                 "user_id": profile.user_id,
@@ -144,20 +159,6 @@ class LearnerProfileManager:
                 "updated_at": profile.updated_at
             }
         }
-        
-        # Update or create
-        existing = orm.user_preferences.scan(
-            filter_expression="user_id = :user_id AND preference_type = :type",
-            expression_values={
-                ":user_id": profile.user_id,
-                ":type": "learner_profile"
-            }
-        )
-        
-        if existing.items:
-            orm.user_preferences.update(existing.items[0].to_dict()['id'], profile_data)
-        else:
-            orm.user_preferences.create(profile_data)
     
     def reset_stale_profile(self, user_id: str) -> LearnerProfile:
         """Reset learner profile if it's stale due to inactivity"""
@@ -23,13 +23,10 @@ class ModuleSelector:
         profile = self.profile_manager.get_or_create_profile(user_id)
         skill_tree = self.skill_manager.get_or_create_skill_tree(user_id)
         
-        # Get all available modules
-        modules_result = orm.modules.scan()
-        available_modules = [module.to_dict() for module in modules_result.items]
-        
-        # Score each module based on user's current state
+        # Stream all available modules page by page, in the table's stable order
         scored_modules = []
-        for module in available_modules:
+        for module_record in orm.modules.iter_scan():
+            module = module_record.to_dict()
             score = self._calculate_module_score(module, profile, skill_tree)
             if score > 0:  # Only include suitable modules
                 scored_modules.append({
@@ -212,8 +209,7 @@ class ModuleSelector:
             all_required_skills.update(path)
         
         # Find modules that teach these skills
-        modules_result = orm.modules.scan()
-        available_modules = [module.to_dict() for module in modules_result.items]
+        available_modules = [module.to_dict() for module in orm.modules.iter_scan()]
         
         # Build learning path
         learning_path = []
@@ -7,10 +7,10 @@ Identifies skill gaps and provides learning path recommendations.
 
 import uuid
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from decimal import Decimal
-from app.orm import orm
+from app.orm import orm, UnitOfWork
 
 
 @dataclass
@@ -41,6 +41,7 @@ class SkillTree:
     user_id: str
     skills: Dict[str, SkillNode] = field(default_factory=dict)
     updated_at: str = ""
+    record_id: str = ""  # skill-progress item holding the tree, once stored
     
     def add_skill(self, skill_name: str, prerequisite_skills: List[str] = None) -> SkillNode:
         """Add a new skill to the tree"""
@@ -97,15 +98,24 @@ class SkillTreeManager:
     
     def get_or_create_skill_tree(self, user_id: str) -> SkillTree:
         """Get existing skill tree or create new one"""
+        skill_tree = self.load_skill_tree(user_id)
+        if skill_tree:
+            return skill_tree
+        
+        skill_tree = self.new_skill_tree(user_id)
+        self.save_skill_tree(skill_tree)
+        
+        return skill_tree
+    
+    def load_skill_tree(self, user_id: str) -> Optional[SkillTree]:
+        """Stored skill tree, or None if the user has none yet"""
         # Try to get existing skill tree
-        result = orm.skill_progress.scan(
-            filter_expression="user_id = :user_id",
-            expression_values={":user_id": user_id}
-        )
+        existing = orm.skill_progress.find_one({"user_id": user_id})
         
-        if result.items:
-            skill_tree_data = result.items[0].to_dict()
-            skill_tree = SkillTree(user_id=user_id, updated_at=skill_tree_data.get('updated_at', ''))
+        if existing:
+            skill_tree_data = existing.to_dict()
+            skill_tree = SkillTree(user_id=user_id, updated_at=skill_tree_data.get('updated_at', ''),
+                                   record_id=existing.id)
             
             # Reconstruct skills from stored data
             for skill_name, skill_data in skill_tree_data.get('skills', {}).items():
@@ -115,8 +125,10 @@ class SkillTreeManager:
                 skill_tree.skills[skill_name] = SkillNode(**skill_data_copy)
             
             return skill_tree
-        
-        # Create new skill tree with fundamental skills
+        return None
+    
+    def new_skill_tree(self, user_id: str) -> SkillTree:
+        """Fresh, unsaved skill tree with the fundamental skills"""
         skill_tree = SkillTree(
             user_id=user_id,
             updated_at=datetime.utcnow().isoformat()
@@ -124,8 +136,6 @@ class SkillTreeManager:
         
         # Add fundamental skills
         self._initialize_skill_tree(skill_tree)
-        self.save_skill_tree(skill_tree)
-        
         return skill_tree
     
     def _initialize_skill_tree(self, skill_tree: SkillTree):
@@ -170,8 +180,15 @@ class SkillTreeManager:
     def update_skill_tree_from_module(self, user_id: str, module_skills: List[str], 
                                     performance_score: float) -> SkillTree:
         """Update skill tree based on module completion"""
-        skill_tree = self.get_or_create_skill_tree(user_id)
+        skill_tree = self.load_skill_tree(user_id) or self.new_skill_tree(user_id)
+        self.record_module_skills(skill_tree, module_skills, performance_score)
         
+        self.save_skill_tree(skill_tree)
+        return skill_tree
+    
+    def record_module_skills(self, skill_tree: SkillTree, module_skills: List[str],
+                             performance_score: float):
+        """Practice each of a module's skills at the given performance"""
         for skill in module_skills:
             # Add skill if it doesn't exist
             if skill not in skill_tree.skills:
@@ -179,12 +196,25 @@ class SkillTreeManager:
             
             # Update proficiency based on performance
             skill_tree.update_skill_proficiency(skill, performance_score)
-        
-        self.save_skill_tree(skill_tree)
-        return skill_tree
     
     def save_skill_tree(self, skill_tree: SkillTree):
         """Save skill tree to database"""
+        if not skill_tree.record_id:
+            existing = orm.skill_progress.find_one({"user_id": skill_tree.user_id}, fields=["id"])
+            skill_tree.record_id = existing.id if existing else str(uuid.uuid4())
+        orm.skill_progress.atomic_update({"id": skill_tree.record_id}, set_fields=self._skill_tree_fields(skill_tree))
+    
+    def stage_skill_tree(self, uow: UnitOfWork, skill_tree: SkillTree):
+        """Add the skill tree's upsert to a unit of work instead of saving it
+        
+        The tree must come from load_skill_tree() or new_skill_tree(), so it
+        is known whether a record exists.
+        """
+        if not skill_tree.record_id:
+            skill_tree.record_id = str(uuid.uuid4())
+        uow.update(orm.skill_progress, {"id": skill_tree.record_id}, set_fields=self._skill_tree_fields(skill_tree))
+    
+    def _skill_tree_fields(self, skill_tree: SkillTree) -> Dict[str, Any]:
         # Convert SkillNode objects to dictionaries
         skills_data = {}
         for skill_name, skill_node in skill_tree.skills.items():
@@ -197,23 +227,10 @@ class SkillTreeManager:
                 "dependent_skills": skill_node.dependent_skills
             }
         
-        skill_tree_data = {
-            "id": str(uuid.uuid4()),
+        return {
             "user_id": skill_tree.user_id,
-            "skills": skills_data,
-            "updated_at": skill_tree.updated_at
+            "skills": skills_data
         }
-        
-        # Update or create
-        existing = orm.skill_progress.scan(
-            filter_expression="user_id = :user_id",
-            expression_values={":user_id": skill_tree.user_id}
-        )
-        
-        if existing.items:
-            orm.skill_progress.update(existing.items[0].to_dict()['id'], skill_tree_data)
-        else:
-            orm.skill_progress.create(skill_tree_data)
     
     def analyze_skill_gaps(self, user_id: str, required_skills: List[str]) -> Dict[str, Any]:
         """Analyze skill gaps for a user given required skills"""
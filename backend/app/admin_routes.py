@@ -8,8 +8,9 @@ Provides full CRUD operations for system administration and management.
 
 from functools import wraps
 from flask import Blueprint, jsonify, request
-from app.orm import orm, PaginationParams
-from app.auth_service import auth_service
+from app.orm import orm
+from app.pagination import next_cursor, page_params
+from app.identity import require_auth
 from datetime import datetime
 import traceback
 
@@ -19,26 +20,11 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 def require_admin_auth(f):
     """Decorator to require admin authentication"""
     @wraps(f)
+    @require_auth
     def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            # Check if user is admin (you can implement admin role checking here)
-            # For now, we'll allow any authenticated user
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
+        # Check if user is admin (you can implement admin role checking here)
+        # For now, we'll allow any authenticated user
+        return f(*args, **kwargs)
 
     return decorated_function
 
@@ -53,15 +39,13 @@ def get_users():
     """Get all users with pagination"""
     try:
         limit = int(request.args.get('limit', 50))
-        last_key = request.args.get('last_key')
         
-        pagination = PaginationParams(limit=limit, last_evaluated_key=last_key)
-        result = orm.users.scan(pagination=pagination)
+        result = orm.users.scan(pagination=page_params(limit))
         
         return jsonify({
             "users": [user.to_dict() for user in result.items],
             "count": result.count,
-            "last_evaluated_key": result.last_evaluated_key
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get users: {e}"}), 500
@@ -113,31 +97,24 @@ def get_labs():
         if user_id:
             result = orm.labs.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if lab_type:
-                filter_conditions.append("lab_type = :lab_type")
-                expression_values[":lab_type"] = lab_type
+                conditions["lab_type"] = lab_type
             
             if is_public is not None:
-                filter_conditions.append("is_public = :is_public")
-                expression_values[":is_public"] = is_public.lower() == 'true'
+                conditions["is_public"] = is_public.lower() == 'true'
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.labs.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.labs.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "labs": [lab.to_dict() for lab in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get labs: {e}"}), 500
@@ -188,27 +165,21 @@ def get_widgets():
         if user_id:
             result = orm.widgets.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if widget_type:
-                filter_conditions.append("widget_type = :widget_type")
-                expression_values[":widget_type"] = widget_type
-            
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+                conditions["widget_type"] = widget_type
             
-            result = orm.widgets.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.widgets.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "widgets": [widget.to_dict() for widget in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widgets: {e}"}), 500
@@ -237,14 +208,16 @@ def get_collections():
         if user_id:
             result = orm.collections.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.collections.scan(pagination=PaginationParams(limit=limit))
+            result = orm.collections.scan(pagination=page_params(limit))
         
         return jsonify({
             "collections": [collection.to_dict() for collection in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get collections: {e}"}), 500
@@ -262,28 +235,20 @@ def get_widget_selection_analytics():
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if user_id:
-            filter_conditions.append("user_id = :user_id")
-            expression_values[":user_id"] = user_id
+            conditions["user_id"] = user_id
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
         
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-        
-        result = orm.widget_selection.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.widget_selection.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "analytics": [item.to_dict() for item in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget selection analytics: {e}"}), 500
@@ -297,28 +262,20 @@ def get_feedback_generated_analytics():
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if user_id:
-            filter_conditions.append("user_id = :user_id")
-            expression_values[":user_id"] = user_id
+            conditions["user_id"] = user_id
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
         
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-        
-        result = orm.feedback_generated.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.feedback_generated.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "analytics": [item.to_dict() for item in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get feedback analytics: {e}"}), 500
@@ -332,28 +289,20 @@ def get_api_usage_analytics():
         endpoint = request.args.get('endpoint')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if user_id:
-            filter_conditions.append("user_id = :user_id")
-            expression_values[":user_id"] = user_id
+            conditions["user_id"] = user_id
         
         if endpoint:
-            filter_conditions.append("endpoint = :endpoint")
-            expression_values[":endpoint"] = endpoint
-        
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+            conditions["endpoint"] = endpoint
         
-        result = orm.api_usage.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.api_usage.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "analytics": [item.to_dict() for item in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get API usage analytics: {e}"}), 500
@@ -375,32 +324,27 @@ def get_attempts():
         if user_id:
             result = orm.attempts.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         elif lab_id:
             result = orm.attempts.query(
                 index_name="lab-id-index",
-                key_condition={"lab_id": lab_id}
+                key_condition={"lab_id": lab_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if status:
-                filter_conditions.append("status = :status")
-                expression_values[":status"] = status
-            
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+                conditions["status"] = status
             
-            result = orm.attempts.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.attempts.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "attempts": [attempt.to_dict() for attempt in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get attempts: {e}"}), 500
@@ -418,31 +362,24 @@ def get_mastery():
         if user_id:
             result = orm.mastery.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if skill_tag:
-                filter_conditions.append("skill_tag = :skill_tag")
-                expression_values[":skill_tag"] = skill_tag
+                conditions["skill_tag"] = skill_tag
             
             if level:
-                filter_conditions.append("level = :level")
-                expression_values[":level"] = level
+                conditions["level"] = level
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.mastery.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.mastery.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "mastery": [mastery.to_dict() for mastery in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get mastery records: {e}"}), 500
@@ -459,27 +396,21 @@ def get_feedback():
         if user_id:
             result = orm.feedback.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if widget_id:
-                filter_conditions.append("widget_id = :widget_id")
-                expression_values[":widget_id"] = widget_id
-            
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+                conditions["widget_id"] = widget_id
             
-            result = orm.feedback.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.feedback.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "feedback": [feedback.to_dict() for feedback in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get feedback: {e}"}), 500
@@ -501,31 +432,24 @@ def get_notifications():
         if user_id:
             result = orm.notifications.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if notification_type:
-                filter_conditions.append("notification_type = :notification_type")
-                expression_values[":notification_type"] = notification_type
+                conditions["notification_type"] = notification_type
             
             if is_read is not None:
-                filter_conditions.append("is_read = :is_read")
-                expression_values[":is_read"] = is_read.lower() == 'true'
+                conditions["is_read"] = is_read.lower() == 'true'
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.notifications.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.notifications.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "notifications": [notification.to_dict() for notification in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get notifications: {e}"}), 500
@@ -542,27 +466,21 @@ def get_streaks():
         if user_id:
             result = orm.streaks.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if streak_type:
-                filter_conditions.append("streak_type = :streak_type")
-                expression_values[":streak_type"] = streak_type
-            
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+                conditions["streak_type"] = streak_type
             
-            result = orm.streaks.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.streaks.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "streaks": [streak.to_dict() for streak in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get streaks: {e}"}), 500
@@ -579,27 +497,21 @@ def get_badges():
         if user_id:
             result = orm.badges.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if badge_type:
-                filter_conditions.append("badge_type = :badge_type")
-                expression_values[":badge_type"] = badge_type
-            
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+                conditions["badge_type"] = badge_type
             
-            result = orm.badges.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.badges.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "badges": [badge.to_dict() for badge in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get badges: {e}"}), 500
@@ -617,28 +529,20 @@ def get_error_logs():
         severity = request.args.get('severity')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if error_type:
-            filter_conditions.append("error_type = :error_type")
-            expression_values[":error_type"] = error_type
+            conditions["error_type"] = error_type
         
         if severity:
-            filter_conditions.append("severity = :severity")
-            expression_values[":severity"] = severity
+            conditions["severity"] = severity
         
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-        
-        result = orm.error_logs.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.error_logs.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "error_logs": [log.to_dict() for log in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get error logs: {e}"}), 500
@@ -654,14 +558,16 @@ def get_system_config():
         if config_category:
             result = orm.system_config.query(
                 index_name="config-category-index",
-                key_condition={"config_category": config_category}
+                key_condition={"config_category": config_category},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.system_config.scan(pagination=PaginationParams(limit=limit))
+            result = orm.system_config.scan(pagination=page_params(limit))
         
         return jsonify({
             "config": [config.to_dict() for config in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get system config: {e}"}), 500
@@ -737,16 +643,16 @@ def bulk_delete():
         if not orm_instance:
             return jsonify({"error": f"Table {table_name} not found"}), 404
         
-        # Delete items one by one (DynamoDB doesn't support batch delete)
-        deleted_count = 0
-        for item_id in item_ids:
-            try:
-                orm_instance.delete_by_id(item_id)
-                deleted_count += 1
-            except Exception as e:
-                print(f"Failed to delete {item_id}: {e}")
+        # Delete in BatchWriteItem chunks of 25, run in parallel
+        result = orm_instance.batch_delete(item_ids)
+        for failure in result.failed:
+            print(f"Failed to delete {failure['key']}: {failure['error']}")
         
-        return jsonify({"message": f"Successfully deleted {deleted_count} records"}), 200
+        return jsonify({
+            "message": f"Successfully deleted {result.succeeded} records",
+            "deleted_count": result.succeeded,
+            "failed": result.failed
+        }), 200
             
     except Exception as e:
         return jsonify({"error": f"Failed to bulk delete: {e}"}), 500
@@ -755,33 +661,58 @@ def bulk_delete():
 # STATISTICS AND OVERVIEW
 # ============================================================================
 
+# Tables whose item counts the stats and health endpoints report
+STATS_TABLES = [
+    'users', 'labs', 'widgets', 'collections', 'modules', 'attempts',
+    'mastery', 'feedback', 'notifications', 'streaks', 'badges',
+    'error_logs', 'system_config'
+]
+
 @admin_bp.route("/stats", methods=["GET"])
 @require_admin_auth
 def get_system_stats():
-    """Get system statistics"""
+    """Get system statistics
+    
+    Counts come from the maintained counters by default; ``mode=approximate``
+    uses DescribeTable and ``mode=exact`` scans every table. ``user_id``
+    restricts the counts to one user's records.
+    """
     try:
-        stats = {}
+        mode = request.args.get('mode', 'counter')
+        if mode not in ('counter', 'approximate', 'exact'):
+            return jsonify({"error": "mode must be counter, approximate or exact"}), 400
+        user_id = request.args.get('user_id')
         
-        # Count records in each table
-        tables = [
-            'users', 'labs', 'widgets', 'collections', 'modules', 'attempts',
-            'mastery', 'feedback', 'notifications', 'streaks', 'badges',
-            'error_logs', 'system_config'
-        ]
+        stats = orm.item_counts(STATS_TABLES, user_id=user_id, mode=mode)
         
+        return jsonify({"stats": stats, "mode": mode}), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Failed to get system stats: {e}"}), 500
+
+@admin_bp.route("/stats/rebuild", methods=["POST"])
+@require_admin_auth
+def rebuild_system_stats():
+    """Recount tables with a parallel scan and overwrite their counters"""
+    try:
+        data = request.get_json(silent=True) or {}
+        tables = data.get('tables', STATS_TABLES)
+        
+        unknown = [table for table in tables if table not in STATS_TABLES]
+        if unknown:
+            return jsonify({"error": f"Tables are not counted: {', '.join(unknown)}"}), 400
+        
+        counts = {}
         for table in tables:
             try:
-                orm_instance = getattr(orm, table, None)
-                if orm_instance:
-                    count = orm_instance.count()
-                    stats[table] = count
+                counts[table] = getattr(orm, table).rebuild_counters()
             except Exception as e:
-                stats[table] = f"Error: {e}"
+                counts[table] = f"Error: {e}"
         
-        return jsonify({"stats": stats}), 200
+        return jsonify({"message": "Counters rebuilt", "stats": counts}), 200
         
     except Exception as e:
-        return jsonify({"error": f"Failed to get system stats: {e}"}), 500
+        return jsonify({"error": f"Failed to rebuild system stats: {e}"}), 500
 
 @admin_bp.route("/health", methods=["GET"])
 @require_admin_auth
@@ -794,19 +725,12 @@ def get_system_health():
             "tables": {}
         }
         
-        # Check each table
-        tables = [
-            'users', 'labs', 'widgets', 'collections', 'modules', 'attempts',
-            'mastery', 'feedback', 'notifications', 'streaks', 'badges',
-            'error_logs', 'system_config'
-        ]
-        
-        for table in tables:
+        # Check each table with DescribeTable, which doesn't read any items
+        for table in STATS_TABLES:
             try:
                 orm_instance = getattr(orm, table, None)
                 if orm_instance:
-                    # Try to count records
-                    count = orm_instance.count()
+                    count = orm_instance.approximate_count()
                     health_status["tables"][table] = {
                         "status": "healthy",
                         "record_count": count
@@ -851,16 +775,16 @@ def fix_time_spent():
     Fix corrupted time_spent values in module_sessions table
     """
     try:
-        # Get all module sessions
-        sessions = orm.module_sessions.scan()
-        
         fixed_count = 0
+        total_sessions = 0
         errors = []
         current_timestamp = int(datetime.utcnow().timestamp())
         
-        for session in sessions:
-            time_spent = session.get('time_spent', 0)
-            session_id = session.get('id')
+        # Stream every module session using a parallel segmented scan
+        for session in orm.module_sessions.parallel_scan():
+            total_sessions += 1
+            time_spent = session.time_spent or 0
+            session_id = session.id
             
             needs_fix = False
             new_value = 0
@@ -893,7 +817,7 @@ def fix_time_spent():
         
         return jsonify({
             "success": True,
-            "total_sessions": len(sessions),
+            "total_sessions": total_sessions,
             "fixed_count": fixed_count,
             "errors": errors,
             "timestamp": datetime.utcnow().isoformat()
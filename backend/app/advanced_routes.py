@@ -5,40 +5,16 @@ Advanced Learning Routes for Prismo Backend
 API routes for advanced learning features including sandbox sessions, review sessions, and system management.
 """
 
-from functools import wraps
 from flask import Blueprint, jsonify, request
-from app.orm import orm, PaginationParams
-from app.auth_service import auth_service
+from app.orm import orm
+from app.pagination import next_cursor, page_params
+from app.identity import current_user_id, require_auth
 from datetime import datetime, timedelta
 import traceback
 
 # Advanced routes blueprint
 advanced_bp = Blueprint("advanced", __name__, url_prefix="/advanced")
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
-
 # ============================================================================
 # SANDBOX SESSIONS
 # ============================================================================
@@ -48,28 +24,21 @@ def require_auth(f):
 def get_sandbox_sessions():
     """Get sandbox sessions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         session_type = request.args.get('session_type')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if session_type:
-            filter_conditions.append("session_type = :session_type")
-            expression_values[":session_type"] = session_type
-        
-        filter_expression = " AND ".join(filter_conditions)
+            conditions["session_type"] = session_type
         
-        result = orm.sandbox_sessions.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.sandbox_sessions.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "sessions": [session.to_dict() for session in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get sandbox sessions: {e}"}), 500
@@ -80,7 +49,7 @@ def create_sandbox_session():
     """Create sandbox session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         session_data = {
             "user_id": user_id,
@@ -116,7 +85,7 @@ def update_sandbox_session(session_id):
 def get_review_sessions():
     """Get review sessions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         review_type = request.args.get('review_type')
         session_date = request.args.get('session_date')
         limit = int(request.args.get('limit', 50))
@@ -124,12 +93,14 @@ def get_review_sessions():
         if session_date:
             result = orm.review_sessions.query(
                 index_name="session-date-index",
-                key_condition={"session_date": session_date}
+                key_condition={"session_date": session_date},
+                pagination=page_params(limit)
             )
         else:
             result = orm.review_sessions.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         # Filter by review type if provided
@@ -140,7 +111,8 @@ def get_review_sessions():
         
         return jsonify({
             "sessions": [session.to_dict() for session in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get review sessions: {e}"}), 500
@@ -151,7 +123,7 @@ def create_review_session():
     """Create review session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         session_data = {
             "user_id": user_id,
@@ -194,32 +166,23 @@ def get_lab_templates():
         subject = request.args.get('subject')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if template_type:
-            filter_conditions.append("template_type = :template_type")
-            expression_values[":template_type"] = template_type
+            conditions["template_type"] = template_type
         
         if difficulty:
-            filter_conditions.append("difficulty = :difficulty")
-            expression_values[":difficulty"] = int(difficulty)
+            conditions["difficulty"] = int(difficulty)
         
         if subject:
-            filter_conditions.append("subject = :subject")
-            expression_values[":subject"] = subject
+            conditions["subject"] = subject
         
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-        
-        result = orm.lab_templates.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.lab_templates.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "templates": [template.to_dict() for template in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get lab templates: {e}"}), 500
@@ -262,32 +225,23 @@ def get_widget_registry():
         version = request.args.get('version')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if widget_type:
-            filter_conditions.append("widget_type = :widget_type")
-            expression_values[":widget_type"] = widget_type
+            conditions["widget_type"] = widget_type
         
         if domain:
-            filter_conditions.append("domain = :domain")
-            expression_values[":domain"] = domain
+            conditions["domain"] = domain
         
         if version:
-            filter_conditions.append("version = :version")
-            expression_values[":version"] = version
-        
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+            conditions["version"] = version
         
-        result = orm.widget_registry.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.widget_registry.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "widgets": [widget.to_dict() for widget in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget registry: {e}"}), 500
@@ -331,27 +285,21 @@ def get_lab_steps():
         if lab_id:
             result = orm.lab_steps.query(
                 index_name="lab-id-index",
-                key_condition={"lab_id": lab_id}
+                key_condition={"lab_id": lab_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if step_type:
-                filter_conditions.append("step_type = :step_type")
-                expression_values[":step_type"] = step_type
+                conditions["step_type"] = step_type
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.lab_steps.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.lab_steps.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "steps": [step.to_dict() for step in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get lab steps: {e}"}), 500
@@ -396,27 +344,21 @@ def get_hints():
         if step_id:
             result = orm.hints.query(
                 index_name="step-id-index",
-                key_condition={"step_id": step_id}
+                key_condition={"step_id": step_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if hint_level:
-                filter_conditions.append("hint_level = :hint_level")
-                expression_values[":hint_level"] = int(hint_level)
+                conditions["hint_level"] = int(hint_level)
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.hints.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.hints.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "hints": [hint.to_dict() for hint in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get hints: {e}"}), 500
@@ -458,27 +400,21 @@ def get_educator_content():
         if educator_id:
             result = orm.educator_content.query(
                 index_name="educator-id-index",
-                key_condition={"educator_id": educator_id}
+                key_condition={"educator_id": educator_id},
+                pagination=page_params(limit)
             )
         else:
-            filter_conditions = []
-            expression_values = {}
+            conditions = {}
             
             if content_type:
-                filter_conditions.append("content_type = :content_type")
-                expression_values[":content_type"] = content_type
+                conditions["content_type"] = content_type
             
-            filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
-            
-            result = orm.educator_content.scan(
-                filter_expression=filter_expression,
-                expression_values=expression_values if expression_values else None,
-                pagination=PaginationParams(limit=limit)
-            )
+            result = orm.educator_content.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "content": [content.to_dict() for content in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get educator content: {e}"}), 500
@@ -489,7 +425,7 @@ def create_educator_content():
     """Create educator content"""
     try:
         data = request.get_json()
-        educator_id = request.current_user.get("cognito_user_id")
+        educator_id = current_user_id()
         
         content_data = {
             "educator_id": educator_id,
@@ -522,14 +458,16 @@ def get_system_config():
         if config_category:
             result = orm.system_config.query(
                 index_name="config-category-index",
-                key_condition={"config_category": config_category}
+                key_condition={"config_category": config_category},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.system_config.scan(pagination=PaginationParams(limit=limit))
+            result = orm.system_config.scan(pagination=page_params(limit))
         
         return jsonify({
             "config": [config.to_dict() for config in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get system config: {e}"}), 500
@@ -578,28 +516,20 @@ def get_error_logs():
         severity = request.args.get('severity')
         limit = int(request.args.get('limit', 100))
         
-        filter_conditions = []
-        expression_values = {}
+        conditions = {}
         
         if error_type:
-            filter_conditions.append("error_type = :error_type")
-            expression_values[":error_type"] = error_type
+            conditions["error_type"] = error_type
         
         if severity:
-            filter_conditions.append("severity = :severity")
-            expression_values[":severity"] = severity
-        
-        filter_expression = " AND ".join(filter_conditions) if filter_conditions else None
+            conditions["severity"] = severity
         
-        result = orm.error_logs.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values if expression_values else None,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.error_logs.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "error_logs": [log.to_dict() for log in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get error logs: {e}"}), 500
@@ -621,7 +551,7 @@ def create_error_log():
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        log = orm.error_logs.create(log_data)
+        log = orm.error_logs.create_deferred(log_data)
         return jsonify({"error_log": log.to_dict()}), 201
     except Exception as e:
         return jsonify({"error": f"Failed to create error log: {e}"}), 500
@@ -5,39 +5,23 @@ Analytics Routes for Prismo Backend
 API routes for analytics, monitoring, and data insights.
 """
 
-from functools import wraps
 from flask import Blueprint, jsonify, request
-from app.orm import orm, PaginationParams
-from app.auth_service import auth_service
+from app.orm import orm
+from app.pagination import next_cursor, page_params
+from app.identity import current_user_id, require_auth
 from datetime import datetime, timedelta
 import traceback
 
 # Analytics routes blueprint
 analytics_bp = Blueprint("analytics", __name__, url_prefix="/analytics")
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
+# Aggregate widget metrics; counters may also be sent as atomic "increments"
+PERFORMANCE_METRICS = ("total_interactions", "successful_interactions", "average_time",
+                       "average_attempts", "error_rate", "difficulty_score", "user_satisfaction")
+PERFORMANCE_COUNTERS = ("total_interactions", "successful_interactions")
+USAGE_METRICS = ("total_users", "total_sessions", "total_interactions",
+                 "average_session_time", "completion_rate", "popularity_score")
+USAGE_COUNTERS = ("total_users", "total_sessions", "total_interactions")
 
 # ============================================================================
 # WIDGET ANALYTICS
@@ -48,28 +32,21 @@ def require_auth(f):
 def get_widget_selection():
     """Get widget selection analytics"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.widget_selection.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.widget_selection.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "analytics": [item.to_dict() for item in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget selection analytics: {e}"}), 500
@@ -80,7 +57,7 @@ def track_widget_selection():
     """Track widget selection"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         selection_data = {
             "user_id": user_id,
@@ -90,7 +67,7 @@ def track_widget_selection():
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        selection = orm.widget_selection.create(selection_data)
+        selection = orm.widget_selection.create_deferred(selection_data)
         return jsonify({"selection": selection.to_dict()}), 201
     except Exception as e:
         return jsonify({"error": f"Failed to track widget selection: {e}"}), 500
@@ -104,28 +81,21 @@ def track_widget_selection():
 def get_feedback_generated():
     """Get feedback generation analytics"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.feedback_generated.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.feedback_generated.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "analytics": [item.to_dict() for item in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get feedback analytics: {e}"}), 500
@@ -136,7 +106,7 @@ def track_feedback_generated():
     """Track feedback generation"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         feedback_data = {
             "user_id": user_id,
@@ -156,7 +126,7 @@ def track_feedback_generated():
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        feedback = orm.feedback_generated.create(feedback_data)
+        feedback = orm.feedback_generated.create_deferred(feedback_data)
         return jsonify({"feedback": feedback.to_dict()}), 201
     except Exception as e:
         return jsonify({"error": f"Failed to track feedback: {e}"}), 500
@@ -170,24 +140,27 @@ def track_feedback_generated():
 def get_learning_sessions():
     """Get learning sessions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         session_date = request.args.get('session_date')
         limit = int(request.args.get('limit', 50))
         
         if session_date:
             result = orm.learning_sessions.query(
                 index_name="session-date-index",
-                key_condition={"session_date": session_date}
+                key_condition={"session_date": session_date},
+                pagination=page_params(limit)
             )
         else:
             result = orm.learning_sessions.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         return jsonify({
             "sessions": [session.to_dict() for session in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get learning sessions: {e}"}), 500
@@ -198,7 +171,7 @@ def create_learning_session():
     """Create learning session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         session_data = {
             "user_id": user_id,
@@ -224,24 +197,27 @@ def create_learning_session():
 def get_skill_progress():
     """Get skill progress"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         skill_tag = request.args.get('skill_tag')
         limit = int(request.args.get('limit', 50))
         
         if skill_tag:
             result = orm.skill_progress.query(
                 index_name="skill-tag-index",
-                key_condition={"skill_tag": skill_tag}
+                key_condition={"skill_tag": skill_tag},
+                pagination=page_params(limit)
             )
         else:
             result = orm.skill_progress.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         return jsonify({
             "progress": [progress.to_dict() for progress in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get skill progress: {e}"}), 500
@@ -252,7 +228,7 @@ def update_skill_progress():
     """Update skill progress"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         progress_data = {
             "user_id": user_id,
@@ -277,28 +253,21 @@ def update_skill_progress():
 def get_api_usage():
     """Get API usage analytics"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         endpoint = request.args.get('endpoint')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if endpoint:
-            filter_conditions.append("endpoint = :endpoint")
-            expression_values[":endpoint"] = endpoint
+            conditions["endpoint"] = endpoint
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.api_usage.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.api_usage.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "usage": [usage.to_dict() for usage in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get API usage: {e}"}), 500
@@ -309,7 +278,7 @@ def track_api_usage():
     """Track API usage"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         usage_data = {
             "user_id": user_id,
@@ -320,7 +289,7 @@ def track_api_usage():
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        usage = orm.api_usage.create(usage_data)
+        usage = orm.api_usage.create_deferred(usage_data)
         return jsonify({"usage": usage.to_dict()}), 201
     except Exception as e:
         return jsonify({"error": f"Failed to track API usage: {e}"}), 500
@@ -334,7 +303,7 @@ def track_api_usage():
 def get_dashboard_analytics():
     """Get dashboard analytics for user"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         # Get user's recent activity
         recent_sessions = orm.learning_sessions.query(
@@ -389,7 +358,7 @@ def track_widget_interaction():
     """Track widget interaction"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         interaction_data = {
             "user_id": user_id,
@@ -414,33 +383,25 @@ def track_widget_interaction():
 def get_widget_interactions():
     """Get widget interactions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         module_id = request.args.get('module_id')
         widget_id = request.args.get('widget_id')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
             
         if widget_id:
-            filter_conditions.append("widget_id = :widget_id")
-            expression_values[":widget_id"] = widget_id
+            conditions["widget_id"] = widget_id
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.widget_interactions.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.widget_interactions.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "interactions": [interaction.to_dict() for interaction in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget interactions: {e}"}), 500
@@ -451,7 +412,7 @@ def create_widget_session():
     """Create widget session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         session_data = {
             "user_id": user_id,
@@ -472,18 +433,13 @@ def update_widget_session(session_id):
     """Update widget session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         # Find the session
-        sessions = orm.widget_sessions.scan(
-            filter_expression="session_id = :session_id AND user_id = :user_id",
-            expression_values={":session_id": session_id, ":user_id": user_id}
-        )
+        session = orm.widget_sessions.find_one({"session_id": session_id, "user_id": user_id})
         
-        if not sessions.items:
+        if not session:
             return jsonify({"error": "Session not found"}), 404
-            
-        session = sessions.items[0]
         
         # Update session data
         updates = {
@@ -505,28 +461,21 @@ def update_widget_session(session_id):
 def get_widget_sessions():
     """Get widget sessions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if module_id:
-            filter_conditions.append("module_id = :module_id")
-            expression_values[":module_id"] = module_id
+            conditions["module_id"] = module_id
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.widget_sessions.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.widget_sessions.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "sessions": [session.to_dict() for session in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget sessions: {e}"}), 500
@@ -537,43 +486,28 @@ def update_widget_performance():
     """Update widget performance metrics"""
     try:
         data = request.get_json()
-        
-        # Check if performance record exists
-        existing = orm.widget_performance.scan(
-            filter_expression="widget_id = :widget_id",
-            expression_values={":widget_id": data.get("widget_id")}
+        widget_id = data.get("widget_id")
+        if not widget_id:
+            return jsonify({"error": "widget_id is required"}), 400
+        
+        # One record per widget, keyed by widget_id, upserted in a single write
+        increments = {k: v for k, v in (data.get("increments") or {}).items() if k in PERFORMANCE_COUNTERS}
+        updates = {k: data[k] for k in PERFORMANCE_METRICS if k in data and k not in increments}
+        updates["last_updated"] = datetime.utcnow().isoformat()
+        defaults = {k: 0 for k in PERFORMANCE_METRICS}
+        defaults.update({
+            "widget_id": widget_id,
+            "widget_type": data.get("widget_type", ""),
+            "module_id": data.get("module_id", "")
+        })
+        
+        performance = orm.widget_performance.atomic_update(
+            {"id": widget_id},
+            set_fields=updates,
+            add=increments,
+            defaults=defaults
         )
         
-        if existing.items:
-            # Update existing record
-            performance = existing.items[0]
-            updates = {
-                "total_interactions": data.get("total_interactions", performance.total_interactions),
-                "successful_interactions": data.get("successful_interactions", performance.successful_interactions),
-                "average_time": data.get("average_time", performance.average_time),
-                "average_attempts": data.get("average_attempts", performance.average_attempts),
-                "error_rate": data.get("error_rate", performance.error_rate),
-                "difficulty_score": data.get("difficulty_score", performance.difficulty_score),
-                "user_satisfaction": data.get("user_satisfaction", performance.user_satisfaction),
-                "last_updated": datetime.utcnow().isoformat()
-            }
-            performance = orm.widget_performance.update(performance.id, updates)
-        else:
-            # Create new record
-            performance_data = {
-                "widget_id": data.get("widget_id"),
-                "widget_type": data.get("widget_type", ""),
-                "module_id": data.get("module_id", ""),
-                "total_interactions": data.get("total_interactions", 0),
-                "successful_interactions": data.get("successful_interactions", 0),
-                "average_time": data.get("average_time", 0.0),
-                "average_attempts": data.get("average_attempts", 0.0),
-                "error_rate": data.get("error_rate", 0.0),
-                "difficulty_score": data.get("difficulty_score", 0.0),
-                "user_satisfaction": data.get("user_satisfaction", 0.0)
-            }
-            performance = orm.widget_performance.create(performance_data)
-        
         return jsonify({"performance": performance.to_dict()}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to update widget performance: {e}"}), 500
@@ -603,14 +537,15 @@ def get_widget_performance():
             result = orm.widget_performance.scan(
                 filter_expression=filter_expression,
                 expression_values=expression_values,
-                pagination=PaginationParams(limit=limit)
+                pagination=page_params(limit)
             )
         else:
-            result = orm.widget_performance.scan(pagination=PaginationParams(limit=limit))
+            result = orm.widget_performance.scan(pagination=page_params(limit))
         
         return jsonify({
             "performance": [perf.to_dict() for perf in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget performance: {e}"}), 500
@@ -621,40 +556,27 @@ def update_widget_usage():
     """Update widget usage statistics"""
     try:
         data = request.get_json()
-        
-        # Check if usage record exists
-        existing = orm.widget_usage.scan(
-            filter_expression="widget_id = :widget_id",
-            expression_values={":widget_id": data.get("widget_id")}
+        widget_id = data.get("widget_id")
+        if not widget_id:
+            return jsonify({"error": "widget_id is required"}), 400
+        
+        # One record per widget, keyed by widget_id, upserted in a single write
+        increments = {k: v for k, v in (data.get("increments") or {}).items() if k in USAGE_COUNTERS}
+        updates = {k: data[k] for k in USAGE_METRICS if k in data and k not in increments}
+        updates["last_used"] = datetime.utcnow().isoformat()
+        defaults = {k: 0 for k in USAGE_METRICS}
+        defaults.update({
+            "widget_id": widget_id,
+            "widget_type": data.get("widget_type", "")
+        })
+        
+        usage = orm.widget_usage.atomic_update(
+            {"id": widget_id},
+            set_fields=updates,
+            add=increments,
+            defaults=defaults
         )
         
-        if existing.items:
-            # Update existing record
-            usage = existing.items[0]
-            updates = {
-                "total_users": data.get("total_users", usage.total_users),
-                "total_sessions": data.get("total_sessions", usage.total_sessions),
-                "total_interactions": data.get("total_interactions", usage.total_interactions),
-                "average_session_time": data.get("average_session_time", usage.average_session_time),
-                "completion_rate": data.get("completion_rate", usage.completion_rate),
-                "popularity_score": data.get("popularity_score", usage.popularity_score),
-                "last_used": datetime.utcnow().isoformat()
-            }
-            usage = orm.widget_usage.update(usage.id, updates)
-        else:
-            # Create new record
-            usage_data = {
-                "widget_id": data.get("widget_id"),
-                "widget_type": data.get("widget_type", ""),
-                "total_users": data.get("total_users", 0),
-                "total_sessions": data.get("total_sessions", 0),
-                "total_interactions": data.get("total_interactions", 0),
-                "average_session_time": data.get("average_session_time", 0.0),
-                "completion_rate": data.get("completion_rate", 0.0),
-                "popularity_score": data.get("popularity_score", 0.0)
-            }
-            usage = orm.widget_usage.create(usage_data)
-        
         return jsonify({"usage": usage.to_dict()}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to update widget usage: {e}"}), 500
@@ -671,14 +593,15 @@ def get_widget_usage():
             result = orm.widget_usage.scan(
                 filter_expression="widget_id = :widget_id",
                 expression_values={":widget_id": widget_id},
-                pagination=PaginationParams(limit=limit)
+                pagination=page_params(limit)
             )
         else:
-            result = orm.widget_usage.scan(pagination=PaginationParams(limit=limit))
+            result = orm.widget_usage.scan(pagination=page_params(limit))
         
         return jsonify({
             "usage": [usage.to_dict() for usage in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get widget usage: {e}"}), 500
@@ -692,7 +615,7 @@ def get_widget_usage():
 def get_learning_insights():
     """Get learning insights and recommendations"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         # Get user's skill progress
         skill_progress = orm.skill_progress.query(
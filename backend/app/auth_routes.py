@@ -1,9 +1,9 @@
-from functools import wraps
 import requests
 import base64
 
 from app.auth_service import auth_service
-from flask import Blueprint, jsonify, request, current_app
+from app.identity import current_user, current_user_id, require_auth
+from flask import Blueprint, jsonify, request, current_app, g
 from config import config
 
 
@@ -11,36 +11,6 @@ from config import config
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
-def require_auth(f):
-    """Decorator to require authentication"""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            # Extract token from "Bearer <token>" format
-            token = auth_header.split(" ")[1]
-
-            # Verify token
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            # Add user data to request context
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
-
-
 @auth_bp.route("/register", methods=["POST"])
 def register():
     """Register a new user"""
@@ -265,7 +235,7 @@ def confirm_forgot_password():
 def get_profile():
     """Get user profile"""
     try:
-        return jsonify({"user_data": request.current_user}), 200
+        return jsonify({"user_data": current_user()}), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get profile: {e}"}), 500
 
@@ -299,17 +269,13 @@ def update_profile():
 def verify_token():
     """Verify access token"""
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
+        if not request.headers.get("Authorization"):
             return jsonify({"error": "Authorization header required"}), 401
 
-        token = auth_header.split(" ")[1]
-        result = auth_service.verify_token(token)
-
-        if result["success"]:
-            return jsonify({"valid": True, "user_data": result["user_data"]}), 200
+        if current_user_id():
+            return jsonify({"valid": True, "user_data": current_user()}), 200
         else:
-            return jsonify({"valid": False, "error": result["error"]}), 401
+            return jsonify({"valid": False, "error": g.auth_error}), 401
 
     except Exception as e:
         return jsonify({"error": f"Token verification failed: {e}"}), 500
@@ -2,13 +2,27 @@ import os
 import hashlib
 import hmac
 import base64
+import time
 from typing import Any, Dict, Optional
 
 import boto3
 from app.aws_config import aws_config
 from app.models import User
+from app.orm import EntityCache
+from app.token_verifier import KeySetUnavailableError, TokenVerificationError, create_token_verifier
 from botocore.exceptions import ClientError
 
+# Cognito errors that mean the token itself is bad, not that the call failed
+INVALID_TOKEN_ERRORS = {"NotAuthorizedException", "UserNotFoundException"}
+
+# Verification results keyed by token hash, shared by every service instance
+token_cache = EntityCache(max_size=aws_config.auth_cache_size, ttl=aws_config.auth_cache_max_ttl)
+
+
+def token_cache_key(access_token: str, kind: str = "token") -> tuple:
+    """Cache key for a token; the token itself is never kept"""
+    return (kind, hashlib.sha256(access_token.encode("utf-8")).hexdigest())
+
 
 class CognitoAuthService:
     """Cognito authentication service"""
@@ -19,6 +33,7 @@ class CognitoAuthService:
         self.client_id = aws_config.cognito_client_id
         self.client_secret = aws_config.cognito_client_secret
         self.user_model = User()
+        self.token_verifier = create_token_verifier()
     
     def _get_secret_hash(self, username: str) -> str:
         """Generate SECRET_HASH for Cognito operations"""
@@ -399,42 +414,154 @@ class CognitoAuthService:
             return {"success": False, "error": f"Unexpected error: {e}"}
 
     def verify_token(self, access_token: str) -> Dict[str, Any]:
-        """Verify access token and get user info"""
+        """Verify access token and get user info
+        
+        Tokens are checked offline against the user pool's signing keys
+        (app.token_verifier); Cognito's get_user is only called when the keys
+        can't be loaded, or when no user pool is configured. Results are
+        cached by token hash: successes until the token's exp (at most
+        AUTH_CACHE_MAX_TTL), rejected tokens for AUTH_NEGATIVE_CACHE_TTL.
+        Failures to reach DynamoDB or Cognito are not cached.
+        """
+        key = token_cache_key(access_token)
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result, ttl = self._verify_token_uncached(access_token)
+        if ttl > 0:
+            token_cache.set(key, result, ttl=ttl)
+        return result
+    
+    def forget_token(self, access_token: str):
+        """Drop a token's cached verification, e.g. after its user changed"""
+        token_cache.invalidate(token_cache_key(access_token))
+        token_cache.invalidate(token_cache_key(access_token, "identity"))
+    
+    def _token_ttl(self, expires_at: Optional[float]) -> float:
+        """Seconds a successful verification may be cached"""
+        if expires_at is None:
+            return 0.0
+        return min(expires_at - time.time(), aws_config.auth_cache_max_ttl)
+    
+    def resolve_identity(self, access_token: str) -> Dict[str, Any]:
+        """Verify a token and say whose it is
+        
+        With offline verification the result has user_id, username and
+        claims. user_id is the key of the caller's user record, which for
+        older federated users is their Cognito username rather than the sub;
+        the record is read once per token to find it, and load_user() fetches
+        it again when a caller needs it. Otherwise it is verify_token(),
+        whose result already carries user_data.
+        """
+        if self.token_verifier is None:
+            return self.verify_token(access_token)
+        
+        key = token_cache_key(access_token, "identity")
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            print(f"DEBUG: Verifying token (first 30 chars): {access_token[:30]}...")
-            
-            # First try to decode as JWT to get user info directly
-            import jwt
-            try:
-                # Decode without verification to get the payload
-                decoded = jwt.decode(access_token, options={'verify_signature': False})
-                user_id = decoded.get('sub')
-                username = decoded.get('username')
-                print(f"DEBUG: JWT decoded - user_id: {user_id}, username: {username}")
-                
-                if user_id and username:
-                    # Get user from DynamoDB using the user ID
-                    try:
-                        user_data = self.user_model.get_user_by_cognito_id(user_id)
-                        print(f"DEBUG: User data retrieved from DynamoDB: {bool(user_data)}")
-                        
-                        if user_data:
-                            return {
-                                "success": True, 
-                                "user_data": user_data, 
-                                "user_id": user_id,
-                                "username": username,
-                                "cognito_user": {"Username": username}
-                            }
-                        else:
-                            print(f"WARNING: No user found in DynamoDB for user_id: {user_id}")
-                            # Continue to Cognito verification as fallback
-                    except Exception as db_error:
-                        print(f"WARNING: DynamoDB lookup failed: {db_error}")
+            result, _, ttl = self._identity_uncached(access_token)
+        except KeySetUnavailableError as e:
+            print(f"WARNING: {e}; verifying with Cognito instead")
+            return self.verify_token(access_token)
+        if ttl > 0:
+            token_cache.set(key, result, ttl=ttl)
+        return result
+    
+    def load_user(self, user_id: str, username: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """User record for a verified identity"""
+        # Users are keyed by sub, or by username for older records
+        user_data = self.user_model.get_user_by_cognito_id(user_id)
+        if not user_data and username and username != user_id:
+            user_data = self.user_model.get_user_by_cognito_id(username)
+        return user_data
+    
+    def _identity_uncached(self, access_token: str) -> tuple:
+        """(identity result, user record, seconds the result may be cached)
+        
+        Raises KeySetUnavailableError. Without a user record the id falls
+        back to the sub, and the result isn't cached.
+        """
+        try:
+            claims = self.token_verifier.verify(access_token)
+        except TokenVerificationError as e:
+            error = {"success": False, "error": f"Token verification failed: {e}"}
+            return error, None, aws_config.auth_negative_cache_ttl
+        
+        username = claims.get('username') or claims.get('cognito:username')
+        try:
+            user_data = self.load_user(claims['sub'], username)
+        except Exception as e:
+            return {"success": False, "error": f"Unexpected error: {e}"}, None, 0.0
+        
+        result = {
+            "success": True,
+            "user_id": (user_data or {}).get("cognito_user_id") or claims['sub'],
+            "username": username,
+            "claims": claims
+        }
+        return result, user_data, self._token_ttl(claims['exp']) if user_data else 0.0
+    
+    def _verify_token_uncached(self, access_token: str) -> tuple:
+        """(result, seconds the result may be cached)"""
+        if self.token_verifier is None:
+            return self._verify_token_unsigned(access_token)
+        
+        try:
+            identity, user_data, ttl = self._identity_uncached(access_token)
+        except KeySetUnavailableError as e:
+            print(f"WARNING: {e}; verifying with Cognito instead")
+            return self._verify_with_cognito(access_token, None)
+        if not identity["success"]:
+            return identity, ttl
+        
+        result = {**identity, "user_data": user_data, "cognito_user": {"Username": identity["username"]}}
+        return result, ttl
+    
+    def _verify_token_unsigned(self, access_token: str) -> tuple:
+        """Legacy check for setups without a user pool: trust the JWT payload, then Cognito"""
+        expires_at = None
+        # First try to decode as JWT to get user info directly
+        import jwt
+        try:
+            # Decode without verification to get the payload
+            decoded = jwt.decode(access_token, options={'verify_signature': False})
+            expires_at = decoded.get('exp')
+            user_id = decoded.get('sub')
+            username = decoded.get('username')
+            print(f"DEBUG: JWT decoded - user_id: {user_id}, username: {username}")
+            
+            if user_id and username:
+                # Get user from DynamoDB using the user ID
+                try:
+                    user_data = self.user_model.get_user_by_cognito_id(user_id)
+                    print(f"DEBUG: User data retrieved from DynamoDB: {bool(user_data)}")
+                    
+                    if user_data:
+                        return {
+                            "success": True, 
+                            "user_data": user_data, 
+                            "user_id": user_id,
+                            "username": username,
+                            "cognito_user": {"Username": username}
+                        }, self._token_ttl(expires_at)
+                    else:
+                        print(f"WARNING: No user found in DynamoDB for user_id: {user_id}")
                         # Continue to Cognito verification as fallback
-            except Exception as jwt_error:
-                print(f"JWT decode failed: {jwt_error}")
-            
+                except Exception as db_error:
+                    print(f"WARNING: DynamoDB lookup failed: {db_error}")
+                    # Continue to Cognito verification as fallback
+        except Exception as jwt_error:
+            print(f"JWT decode failed: {jwt_error}")
+
+        return self._verify_with_cognito(access_token, expires_at)
+    
+    def _verify_with_cognito(self, access_token: str, expires_at: Optional[float]) -> tuple:
+        """Verify a token with a Cognito get_user call"""
+        try:
             # Fallback to Cognito get_user method
             print("DEBUG: Falling back to Cognito get_user method")
             response = self.cognito.get_user(AccessToken=access_token)
@@ -443,16 +570,18 @@ class CognitoAuthService:
             # Get user from DynamoDB
             user_data = self.user_model.get_user_by_cognito_id(response["Username"])
 
-            return {"success": True, "user_data": user_data, "cognito_user": response}
+            result = {"success": True, "user_data": user_data, "cognito_user": response}
+            return result, self._token_ttl(expires_at) if user_data else 0.0
 
         except ClientError as e:
             error_msg = f"Token verification failed: {e}"
             print(f"ERROR: {error_msg}")
-            return {"success": False, "error": error_msg}
+            invalid = e.response.get("Error", {}).get("Code") in INVALID_TOKEN_ERRORS
+            return {"success": False, "error": error_msg}, aws_config.auth_negative_cache_ttl if invalid else 0.0
         except Exception as e:
             error_msg = f"Unexpected error: {e}"
             print(f"ERROR: {error_msg}")
-            return {"success": False, "error": error_msg}
+            return {"success": False, "error": error_msg}, 0.0
 
     def update_user_profile(
         self, access_token: str, profile_updates: Dict[str, Any]
@@ -479,6 +608,7 @@ class CognitoAuthService:
                     {"cognito_user_id": user_info["Username"]},
                     {"profile": {**user_data.get("profile", {}), **profile_updates}},
                 )
+                self.forget_token(access_token)
 
             return {"success": True, "message": "Profile updated successfully"}
 
@@ -496,12 +626,13 @@ class CognitoAuthService:
             
             # Get user info from Cognito
             user_info = self.cognito.get_user(AccessToken=access_token)
-            cognito_user_id = user_info["Username"]
-            
-            print(f"DEBUG: Cognito user ID: {cognito_user_id}")
             
             # Extract user attributes
             attributes = {attr["Name"]: attr["Value"] for attr in user_info["UserAttributes"]}
+            # Keyed by sub like password sign-ups, so the token alone identifies the user
+            cognito_user_id = attributes.get("sub") or user_info["Username"]
+            
+            print(f"DEBUG: Cognito user ID: {cognito_user_id}")
             email = attributes.get("email")
             name = attributes.get("name", "")
             picture = attributes.get("picture", "")
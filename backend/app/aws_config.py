@@ -1,6 +1,8 @@
 import os
+import threading
 
 import boto3
+from botocore.config import Config as BotocoreConfig
 from botocore.exceptions import ClientError
 from config import Config
 
@@ -14,7 +16,76 @@ class AWSConfig:
         self.cognito_user_pool_id = os.getenv("COGNITO_USER_POOL_ID")
         self.cognito_client_id = os.getenv("COGNITO_CLIENT_ID")
         self.cognito_client_secret = os.getenv("COGNITO_CLIENT_SECRET")
+        # Offline RS256 verification of Cognito tokens against the pool's JWKS
+        self.auth_offline_verification = os.getenv("AUTH_OFFLINE_VERIFICATION", "true").lower() == "true"
+        # Pool ids start with the pool's region, e.g. us-east-1_AbCdEf
+        pool_url = (f"https://cognito-idp.{self.cognito_user_pool_id.split('_')[0]}.amazonaws.com/"
+                    f"{self.cognito_user_pool_id}" if self.cognito_user_pool_id else "")
+        self.cognito_issuer = os.getenv("COGNITO_ISSUER", pool_url)
+        self.cognito_jwks_url = os.getenv("COGNITO_JWKS_URL", f"{pool_url}/.well-known/jwks.json" if pool_url else "")
+        self.jwks_path = os.getenv("JWKS_PATH", "")  # Local key set file, e.g. for tests
+        self.jwks_refresh_interval = float(os.getenv("JWKS_REFRESH_INTERVAL", "3600"))
+        self.jwt_leeway = float(os.getenv("JWT_LEEWAY", "30"))
+        # Verified access tokens are cached until their exp, capped at the max TTL
+        self.auth_cache_size = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+        self.auth_cache_max_ttl = float(os.getenv("AUTH_CACHE_MAX_TTL", "300"))
+        self.auth_negative_cache_ttl = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL", "30"))
         self.dynamodb_table_prefix = os.getenv("DYNAMODB_TABLE_PREFIX", "prismo")
+        self.dynamodb_scan_segments = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "4"))
+        self.entity_cache_size = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+        self.entity_cache_ttl = float(os.getenv("ENTITY_CACHE_TTL", "10"))
+        # dynamodb, memory or sqlite (see app.storage)
+        self.storage_backend = os.getenv("STORAGE_BACKEND", "dynamodb").lower()
+        self.sqlite_path = os.getenv("SQLITE_PATH", "prismo.db")
+        # Compression of large model attributes (zstd falls back to zlib if unavailable)
+        self.field_compression = os.getenv("FIELD_COMPRESSION", "zstd").lower()
+        self.field_compression_min_bytes = int(os.getenv("FIELD_COMPRESSION_MIN_BYTES", "1024"))
+        # Content-addressed store for attributes too large to keep in an item
+        self.object_store = os.getenv("OBJECT_STORE", "none").lower()
+        self.object_store_bucket = os.getenv("OBJECT_STORE_BUCKET", "")
+        self.object_store_prefix = os.getenv("OBJECT_STORE_PREFIX", "objects/")
+        self.object_store_path = os.getenv("OBJECT_STORE_PATH", "object-store")
+        self.object_store_cache_bytes = int(os.getenv("OBJECT_STORE_CACHE_BYTES", str(32 * 1024 * 1024)))
+        self.object_offload_min_bytes = int(os.getenv("OBJECT_OFFLOAD_MIN_BYTES", "65536"))
+        # Per-operation ORM metrics and the slow/low-selectivity logs
+        self.orm_metrics_enabled = os.getenv("ORM_METRICS_ENABLED", "true").lower() == "true"
+        self.orm_slow_query_ms = float(os.getenv("ORM_SLOW_QUERY_MS", "250"))
+        self.orm_low_selectivity = float(os.getenv("ORM_LOW_SELECTIVITY", "0.1"))
+        self.orm_low_selectivity_min_scanned = int(os.getenv("ORM_LOW_SELECTIVITY_MIN_SCANNED", "100"))
+        # Write-behind buffering of append-only telemetry tables
+        self.write_buffer_enabled = os.getenv("WRITE_BUFFER_ENABLED", "true").lower() == "true"
+        self.write_buffer_flush_items = int(os.getenv("WRITE_BUFFER_FLUSH_ITEMS", "100"))
+        self.write_buffer_flush_interval = float(os.getenv("WRITE_BUFFER_FLUSH_INTERVAL", "1.0"))
+        self.write_buffer_max_pending = int(os.getenv("WRITE_BUFFER_MAX_PENDING", "10000"))
+        self.write_buffer_put_timeout = float(os.getenv("WRITE_BUFFER_PUT_TIMEOUT", "0.05"))
+        self.write_buffer_max_retries = int(os.getenv("WRITE_BUFFER_MAX_RETRIES", "3"))
+        # Pre-forked workers for /claude/execute-code Python runs
+        self.python_pool_enabled = os.getenv("PYTHON_POOL_ENABLED", "true").lower() == "true"
+        self.python_pool_size = int(os.getenv("PYTHON_POOL_SIZE", "4"))
+        self.python_pool_max_jobs = int(os.getenv("PYTHON_POOL_MAX_JOBS", "1"))  # Jobs before a worker is replaced
+        self.python_pool_timeout = float(os.getenv("PYTHON_POOL_TIMEOUT", "5"))
+        self.python_pool_cpu_seconds = int(os.getenv("PYTHON_POOL_CPU_SECONDS", "5"))
+        self.python_pool_memory_mb = int(os.getenv("PYTHON_POOL_MEMORY_MB", "512"))
+        self.python_pool_output_bytes = int(os.getenv("PYTHON_POOL_OUTPUT_BYTES", str(1024 * 1024)))
+
+        # Client tuning; every request thread may fan out to
+        # DYNAMODB_SCAN_SEGMENTS concurrent calls (parallel scans, batches)
+        self.worker_threads = int(os.getenv("AWS_WORKER_THREADS", "16"))
+        self.max_pool_connections = int(os.getenv(
+            "AWS_MAX_POOL_CONNECTIONS",
+            str(max(10, self.worker_threads * self.dynamodb_scan_segments))
+        ))
+        self.connect_timeout = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+        self.read_timeout = float(os.getenv("AWS_READ_TIMEOUT", "10"))
+        self.max_attempts = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+        self.retry_mode = os.getenv("AWS_RETRY_MODE", "adaptive")
+        self.tcp_keepalive = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
+        self.bedrock_read_timeout = float(os.getenv("BEDROCK_READ_TIMEOUT", "120"))
+
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._dynamodb_resource = None
+        self._local = threading.local()
 
         # Initialize AWS clients
         self._init_clients()
@@ -37,29 +108,68 @@ class AWSConfig:
                 print("Warning: No AWS credentials found. Using default credential chain.")
                 print("Make sure to set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY in your .env file")
             
-            # Initialize clients with explicit credentials if provided
-            client_kwargs = {"region_name": self.region}
+            # Sessions are built from explicit credentials if provided
+            self._session_kwargs = {"region_name": self.region}
             
             if aws_access_key_id and aws_secret_access_key:
-                client_kwargs.update({
+                self._session_kwargs.update({
                     "aws_access_key_id": aws_access_key_id,
                     "aws_secret_access_key": aws_secret_access_key
                 })
                 if aws_session_token:
-                    client_kwargs["aws_session_token"] = aws_session_token
+                    self._session_kwargs["aws_session_token"] = aws_session_token
             elif aws_profile:
-                client_kwargs["profile_name"] = aws_profile
+                self._session_kwargs["profile_name"] = aws_profile
             
-            self.dynamodb = boto3.client("dynamodb", **client_kwargs)
-            self.dynamodb_resource = boto3.resource("dynamodb", **client_kwargs)
-            self.cognito = boto3.client("cognito-idp", **client_kwargs)
-            self.s3 = boto3.client("s3", **client_kwargs)
+            # Clients are thread-safe and shared; resources are per thread, over one shared client
+            self._session = boto3.session.Session(**self._session_kwargs)
+            self.dynamodb = self.client("dynamodb")
+            self.cognito = self.client("cognito-idp")
+            self.s3 = self.client("s3")
 
         except Exception as e:
             print(f"Error initializing AWS clients: {e}")
             print("Please check your AWS credentials in the .env file")
             raise
 
+    def client_config(self, **overrides) -> BotocoreConfig:
+        """botocore Config with pooling, keep-alive, timeouts and adaptive retries"""
+        settings = {
+            "max_pool_connections": self.max_pool_connections,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "tcp_keepalive": self.tcp_keepalive,
+            "retries": {"max_attempts": self.max_attempts, "mode": self.retry_mode},
+        }
+        settings.update(overrides)
+        return BotocoreConfig(**settings)
+
+    def client(self, service_name: str, region_name=None, **overrides):
+        """Shared, thread-safe client for a service, created once per settings"""
+        cache_key = (service_name, region_name, tuple(sorted(overrides.items())))
+        with self._clients_lock:
+            if cache_key not in self._clients:
+                self._clients[cache_key] = self._session.client(
+                    service_name,
+                    region_name=region_name or self.region,
+                    config=self.client_config(**overrides)
+                )
+            return self._clients[cache_key]
+
+    @property
+    def dynamodb_resource(self):
+        """DynamoDB resource for the calling thread (resources are not thread-safe)"""
+        resource = getattr(self._local, "dynamodb_resource", None)
+        if resource is None:
+            with self._clients_lock:
+                if self._dynamodb_resource is None:
+                    self._dynamodb_resource = self._session.resource("dynamodb", config=self.client_config())
+            # Wrapping the shared resource's client is cheap and keeps one connection pool
+            shared = self._dynamodb_resource
+            resource = type(shared)(client=shared.meta.client)
+            self._local.dynamodb_resource = resource
+        return resource
+
     def get_table_name(self, table_type):
         """Generate table name with prefix"""
         return f"{self.dynamodb_table_prefix}-{table_type}"
@@ -1,9 +1,14 @@
 import json
 import os
+import time
 
-import boto3
 from flask import Blueprint, jsonify, request
 
+from app.aws_config import aws_config
+from app.sandbox import (
+    ExecutionTimeout, PoolUnavailableError, TestRun, get_python_pool, run_cpp_tests, run_python_tests
+)
+
 
 # Create blueprint
 claude_bp = Blueprint("claude", __name__)
@@ -23,9 +28,11 @@ def get_claude_response(message, system_prompt=None, max_tokens=1000):
         str: Claude's response text, or None if error
     """
     try:
-        # Initialize the Bedrock client
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime", region_name="us-east-1"
+        # Shared Bedrock client; generation needs a longer read timeout
+        bedrock_runtime = aws_config.client(
+            "bedrock-runtime",
+            region_name="us-east-1",
+            read_timeout=aws_config.bedrock_read_timeout,
         )
 
         # Build messages array
@@ -391,21 +398,14 @@ def execute_code():
         start_time = time.time()
         
         # Execute code based on language
-        if language in ["python", "py"]:
-            output, error = execute_python_code(code)
-        elif language in ["cpp", "c++"]:
-            output, error = execute_cpp_code(code)
-        elif language == "java":
-            output, error = execute_java_code(code)
-        else:  # javascript or js
-            output, error = execute_javascript_code(code)
+        output, error = execute_for_language(code, language)
         
         execution_time = int((time.time() - start_time) * 1000)  # Convert to ms
         
         # Run test cases if provided
         test_results = []
         if test_cases and not error:
-            test_results = run_test_cases(code, language, test_cases)
+            test_results = run_test_cases(code, language, test_cases, TestRun(output, error, execution_time))
         
         if error:
             return jsonify({
@@ -438,6 +438,20 @@ def execute_code():
 
 
 def execute_python_code(code):
+    """Execute Python code in a warm pooled worker, or a new subprocess"""
+    pool = get_python_pool()
+    if pool is not None:
+        try:
+            output, stderr, returncode = pool.run(code)
+            return output, stderr if returncode != 0 else None
+        except ExecutionTimeout as e:
+            return None, f"Error: {e}"
+        except PoolUnavailableError as e:
+            print(f"WARNING: Python worker pool unavailable, using a subprocess: {e}")
+    return execute_python_subprocess(code)
+
+
+def execute_python_subprocess(code):
     """Execute Python code in a subprocess with timeout"""
     import subprocess
     import tempfile
@@ -650,39 +664,59 @@ def execute_java_code(code):
         return None, f"Error executing Java code: {str(e)}"
 
 
-def run_test_cases(code, language, test_cases):
-    """Run test cases against the code"""
-    results = []
+def execute_for_language(code, language):
+    """Execute code with the runner for its language"""
+    if language in ["python", "py"]:
+        return execute_python_code(code)
+    elif language in ["cpp", "c++"]:
+        return execute_cpp_code(code)
+    elif language == "java":
+        return execute_java_code(code)
+    else:  # javascript or js
+        return execute_javascript_code(code)
+
+
+def run_test_cases(code, language, test_cases, base_run=None):
+    """Run test cases against the code
     
-    for test in test_cases:
-        test_id = test.get("id", "")
-        test_input = test.get("input", "")
-        expected_output = test.get("expectedOutput", "")
-        
-        # For now, we'll implement a basic test runner
-        # In a real implementation, this would need more sophisticated handling
-        # of function calls, input parameters, etc.
-        
-        # Simple approach: append the input to the code and capture output
-        test_code = f"{code}\n{test_input}"
-        
-        if language in ["python", "py"]:
-            output, error = execute_python_code(test_code)
-        elif language in ["cpp", "c++"]:
-            output, error = execute_cpp_code(test_code)
-        elif language == "java":
-            output, error = execute_java_code(test_code)
-        else:
-            output, error = execute_javascript_code(test_code)
-        
-        actual_output = (output or "").strip()
-        expected = expected_output.strip()
+    Each test program is the code with the test's input appended. A test
+    without input is the unchanged program, so it reuses base_run (the run
+    execute_code already made). The other distinct programs run in one
+    harness process per submission for Python and C++ (one compile, a
+    forked child per test), and one at a time otherwise.
+    """
+    inputs = [test.get("input", "") for test in test_cases]
+    runs = {}
+    if base_run is not None:
+        runs.update({test_input: base_run for test_input in inputs if not test_input.strip()})
+    pending = list(dict.fromkeys(test_input for test_input in inputs if test_input not in runs))
+    
+    harness_runs = None
+    if language in ["python", "py"]:
+        harness_runs = run_python_tests(code, pending)
+    elif language in ["cpp", "c++"]:
+        harness_runs = run_cpp_tests(code, pending)
+    if harness_runs is not None:
+        runs.update(zip(pending, harness_runs))
+    
+    for test_input in pending:
+        if test_input not in runs:
+            start = time.perf_counter()
+            output, error = execute_for_language(f"{code}\n{test_input}", language)
+            runs[test_input] = TestRun(output, error, (time.perf_counter() - start) * 1000)
+    
+    results = []
+    for test, test_input in zip(test_cases, inputs):
+        run = runs[test_input]
+        actual_output = (run.output or "").strip()
+        expected = test.get("expectedOutput", "").strip()
         
         results.append({
-            "id": test_id,
-            "passed": actual_output == expected and not error,
-            "actualOutput": actual_output if not error else f"Error: {error}",
-            "expectedOutput": expected
+            "id": test.get("id", ""),
+            "passed": actual_output == expected and not run.error,
+            "actualOutput": actual_output if not run.error else f"Error: {run.error}",
+            "expectedOutput": expected,
+            "executionTime": int(run.time_ms)
         })
     
     return results
@@ -1,6 +1,5 @@
-from functools import wraps
 
-from app.auth_service import auth_service
+from app.identity import current_user_id, require_auth
 from app.models import Collection, Lab, User, Widget
 from flask import Blueprint, jsonify, request
 
@@ -9,32 +8,6 @@ from flask import Blueprint, jsonify, request
 data_bp = Blueprint("data", __name__, url_prefix="/api")
 
 
-def require_auth(f):
-    """Decorator to require authentication"""
-
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
-
-
 # Lab routes
 @data_bp.route("/labs", methods=["GET"])
 def get_labs():
@@ -42,20 +15,11 @@ def get_labs():
     try:
         lab_model = Lab()
 
-        # Check if user is authenticated
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                result = auth_service.verify_token(token)
-                if result["success"]:
-                    # Get user's labs
-                    user_labs = lab_model.get_labs_by_user(
-                        result["user_data"]["cognito_user_id"]
-                    )
-                    return jsonify({"labs": user_labs}), 200
-            except:
-                pass
+        # Get user's labs if authenticated
+        user_id = current_user_id()
+        if user_id:
+            user_labs = lab_model.get_labs_by_user(user_id)
+            return jsonify({"labs": user_labs}), 200
 
         # Get public labs
         public_labs = lab_model.get_public_labs()
@@ -83,7 +47,7 @@ def create_lab():
             lab_type=data["lab_type"],
             description=data["description"],
             content=data["content"],
-            user_id=request.current_user["cognito_user_id"],
+            user_id=current_user_id(),
             is_public=data.get("is_public", False),
             tags=data.get("tags", []),
             difficulty=data.get("difficulty", "beginner"),
@@ -106,20 +70,9 @@ def get_lab(lab_id):
         if not lab:
             return jsonify({"error": "Lab not found"}), 404
 
-        # Check if user can access this lab
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                result = auth_service.verify_token(token)
-                if result["success"]:
-                    # User can access their own labs or public labs
-                    if lab["user_id"] == result["user_data"][
-                        "cognito_user_id"
-                    ] or lab.get("is_public", False):
-                        return jsonify({"lab": lab}), 200
-            except:
-                pass
+        # User can access their own labs or public labs
+        if current_user_id() and lab["user_id"] == current_user_id():
+            return jsonify({"lab": lab}), 200
 
         # Check if lab is public
         if lab.get("is_public", False):
@@ -143,7 +96,7 @@ def update_lab(lab_id):
             return jsonify({"error": "Lab not found"}), 404
 
         # Check if user owns this lab
-        if lab["user_id"] != request.current_user["cognito_user_id"]:
+        if lab["user_id"] != current_user_id():
             return jsonify({"error": "Unauthorized"}), 403
 
         data = request.get_json()
@@ -188,7 +141,7 @@ def delete_lab(lab_id):
             return jsonify({"error": "Lab not found"}), 404
 
         # Check if user owns this lab
-        if lab["user_id"] != request.current_user["cognito_user_id"]:
+        if lab["user_id"] != current_user_id():
             return jsonify({"error": "Unauthorized"}), 403
 
         lab_model.delete_item({"id": lab_id})
@@ -205,20 +158,11 @@ def get_widgets():
     try:
         widget_model = Widget()
 
-        # Check if user is authenticated
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                result = auth_service.verify_token(token)
-                if result["success"]:
-                    # Get user's widgets
-                    user_widgets = widget_model.get_widgets_by_user(
-                        result["user_data"]["cognito_user_id"]
-                    )
-                    return jsonify({"widgets": user_widgets}), 200
-            except:
-                pass
+        # Get user's widgets if authenticated
+        user_id = current_user_id()
+        if user_id:
+            user_widgets = widget_model.get_widgets_by_user(user_id)
+            return jsonify({"widgets": user_widgets}), 200
 
         # Get public widgets
         public_widgets = widget_model.get_public_widgets()
@@ -245,7 +189,7 @@ def create_widget():
             name=data["name"],
             widget_type=data["widget_type"],
             config=data["config"],
-            user_id=request.current_user["cognito_user_id"],
+            user_id=current_user_id(),
             is_public=data.get("is_public", False),
             tags=data.get("tags", []),
             version=data.get("version", "1.0.0"),
@@ -270,20 +214,9 @@ def get_widget(widget_id):
         if not widget:
             return jsonify({"error": "Widget not found"}), 404
 
-        # Check if user can access this widget
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                result = auth_service.verify_token(token)
-                if result["success"]:
-                    # User can access their own widgets or public widgets
-                    if widget["user_id"] == result["user_data"][
-                        "cognito_user_id"
-                    ] or widget.get("is_public", False):
-                        return jsonify({"widget": widget}), 200
-            except:
-                pass
+        # User can access their own widgets or public widgets
+        if current_user_id() and widget["user_id"] == current_user_id():
+            return jsonify({"widget": widget}), 200
 
         # Check if widget is public
         if widget.get("is_public", False):
@@ -303,7 +236,7 @@ def get_collections():
     try:
         collection_model = Collection()
         collections = collection_model.get_collections_by_user(
-            request.current_user["cognito_user_id"]
+            current_user_id()
         )
         return jsonify({"collections": collections}), 200
 
@@ -323,11 +256,16 @@ def create_collection():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
 
+        try:
+            Collection.validate_items(data["items"])
+        except ValueError as e:
+            return jsonify({"error": f"Invalid items: {e}"}), 400
+
         collection_model = Collection()
         collection_data = collection_model.create_collection(
             name=data["name"],
             description=data["description"],
-            user_id=request.current_user["cognito_user_id"],
+            user_id=current_user_id(),
             items=data["items"],
             is_public=data.get("is_public", False),
             tags=data.get("tags", []),
@@ -359,9 +297,12 @@ def get_collection(collection_id):
             return jsonify({"error": "Collection not found"}), 404
 
         # Check if user owns this collection
-        if collection["user_id"] != request.current_user["cognito_user_id"]:
+        if collection["user_id"] != current_user_id():
             return jsonify({"error": "Unauthorized"}), 403
 
+        if request.args.get("hydrate", "false").lower() == "true":
+            collection["resolved_items"] = collection_model.get_collection_items(collection)
+
         return jsonify({"collection": collection}), 200
 
     except Exception as e:
@@ -5,40 +5,16 @@ Gamification Routes for Prismo Backend
 API routes for gamification features including notifications, streaks, badges, and user preferences.
 """
 
-from functools import wraps
 from flask import Blueprint, jsonify, request
-from app.orm import orm, PaginationParams
-from app.auth_service import auth_service
+from app.orm import orm
+from app.pagination import next_cursor, page_params
+from app.identity import current_user_id, require_auth
 from datetime import datetime, timedelta
 import traceback
 
 # Gamification routes blueprint
 gamification_bp = Blueprint("gamification", __name__, url_prefix="/gamification")
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
-
 # ============================================================================
 # NOTIFICATIONS
 # ============================================================================
@@ -48,33 +24,25 @@ def require_auth(f):
 def get_notifications():
     """Get user notifications"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         notification_type = request.args.get('notification_type')
         is_read = request.args.get('is_read')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if notification_type:
-            filter_conditions.append("notification_type = :notification_type")
-            expression_values[":notification_type"] = notification_type
+            conditions["notification_type"] = notification_type
         
         if is_read is not None:
-            filter_conditions.append("is_read = :is_read")
-            expression_values[":is_read"] = is_read.lower() == 'true'
+            conditions["is_read"] = is_read.lower() == 'true'
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.notifications.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.notifications.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "notifications": [notification.to_dict() for notification in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get notifications: {e}"}), 500
@@ -85,7 +53,7 @@ def create_notification():
     """Create notification"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         notification_data = {
             "user_id": user_id,
@@ -133,28 +101,21 @@ def delete_notification(notification_id):
 def get_streaks():
     """Get user streaks"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         streak_type = request.args.get('streak_type')
         limit = int(request.args.get('limit', 10))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if streak_type:
-            filter_conditions.append("streak_type = :streak_type")
-            expression_values[":streak_type"] = streak_type
-        
-        filter_expression = " AND ".join(filter_conditions)
+            conditions["streak_type"] = streak_type
         
-        result = orm.streaks.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.streaks.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "streaks": [streak.to_dict() for streak in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get streaks: {e}"}), 500
@@ -165,7 +126,7 @@ def create_streak():
     """Create or update streak"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         streak_data = {
             "user_id": user_id,
@@ -201,28 +162,21 @@ def update_streak(streak_id):
 def get_badges():
     """Get user badges"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         badge_type = request.args.get('badge_type')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if badge_type:
-            filter_conditions.append("badge_type = :badge_type")
-            expression_values[":badge_type"] = badge_type
-        
-        filter_expression = " AND ".join(filter_conditions)
+            conditions["badge_type"] = badge_type
         
-        result = orm.badges.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.badges.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "badges": [badge.to_dict() for badge in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get badges: {e}"}), 500
@@ -233,7 +187,7 @@ def create_badge():
     """Create badge"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         badge_data = {
             "user_id": user_id,
@@ -272,7 +226,7 @@ def get_badge(badge_id):
 def get_user_preferences():
     """Get user preferences"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         preferences = orm.user_preferences.get_by_key({"user_id": user_id})
         if not preferences:
@@ -288,7 +242,7 @@ def create_user_preferences():
     """Create user preferences"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         preferences_data = {
             "user_id": user_id,
@@ -311,7 +265,7 @@ def update_user_preferences():
     """Update user preferences"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         updated_preferences = orm.user_preferences.update(user_id, data)
         return jsonify({"preferences": updated_preferences.to_dict()}), 200
@@ -327,7 +281,7 @@ def update_user_preferences():
 def get_accessibility_settings():
     """Get accessibility settings"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         settings = orm.accessibility_settings.get_by_key({"user_id": user_id})
         if not settings:
@@ -343,7 +297,7 @@ def create_accessibility_settings():
     """Create accessibility settings"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         settings_data = {
             "user_id": user_id,
@@ -368,7 +322,7 @@ def update_accessibility_settings():
     """Update accessibility settings"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         updated_settings = orm.accessibility_settings.update(user_id, data)
         return jsonify({"accessibility": updated_settings.to_dict()}), 200
@@ -390,14 +344,16 @@ def get_version_history():
         if attempt_id:
             result = orm.version_history.query(
                 index_name="attempt-id-index",
-                key_condition={"attempt_id": attempt_id}
+                key_condition={"attempt_id": attempt_id},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.version_history.scan(pagination=PaginationParams(limit=limit))
+            result = orm.version_history.scan(pagination=page_params(limit))
         
         return jsonify({
             "versions": [version.to_dict() for version in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get version history: {e}"}), 500
@@ -431,24 +387,27 @@ def create_version_history():
 def get_coach_chat():
     """Get coach chat messages"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         session_id = request.args.get('session_id')
         limit = int(request.args.get('limit', 50))
         
         if session_id:
             result = orm.coach_chat.query(
                 index_name="session-id-index",
-                key_condition={"session_id": session_id}
+                key_condition={"session_id": session_id},
+                pagination=page_params(limit)
             )
         else:
             result = orm.coach_chat.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         return jsonify({
             "messages": [message.to_dict() for message in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get coach chat: {e}"}), 500
@@ -459,7 +418,7 @@ def create_coach_chat():
     """Create coach chat message"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         message_data = {
             "user_id": user_id,
@@ -484,33 +443,25 @@ def create_coach_chat():
 def get_walkthrough_sessions():
     """Get walkthrough sessions"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         step_id = request.args.get('step_id')
         session_status = request.args.get('session_status')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if step_id:
-            filter_conditions.append("step_id = :step_id")
-            expression_values[":step_id"] = step_id
+            conditions["step_id"] = step_id
         
         if session_status:
-            filter_conditions.append("session_status = :session_status")
-            expression_values[":session_status"] = session_status
+            conditions["session_status"] = session_status
         
-        filter_expression = " AND ".join(filter_conditions)
-        
-        result = orm.walkthrough_sessions.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.walkthrough_sessions.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "sessions": [session.to_dict() for session in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get walkthrough sessions: {e}"}), 500
@@ -521,7 +472,7 @@ def create_walkthrough_session():
     """Create walkthrough session"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         session_data = {
             "user_id": user_id,
@@ -546,33 +497,25 @@ def create_walkthrough_session():
 def get_micro_assessments():
     """Get micro assessments"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         skill_tag = request.args.get('skill_tag')
         assessment_type = request.args.get('assessment_type')
         limit = int(request.args.get('limit', 50))
         
-        filter_conditions = ["user_id = :user_id"]
-        expression_values = {":user_id": user_id}
+        conditions = {"user_id": user_id}
         
         if skill_tag:
-            filter_conditions.append("skill_tag = :skill_tag")
-            expression_values[":skill_tag"] = skill_tag
+            conditions["skill_tag"] = skill_tag
         
         if assessment_type:
-            filter_conditions.append("assessment_type = :assessment_type")
-            expression_values[":assessment_type"] = assessment_type
-        
-        filter_expression = " AND ".join(filter_conditions)
+            conditions["assessment_type"] = assessment_type
         
-        result = orm.micro_assessments.scan(
-            filter_expression=filter_expression,
-            expression_values=expression_values,
-            pagination=PaginationParams(limit=limit)
-        )
+        result = orm.micro_assessments.find(conditions, pagination=page_params(limit))
         
         return jsonify({
             "assessments": [assessment.to_dict() for assessment in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get micro assessments: {e}"}), 500
@@ -583,7 +526,7 @@ def create_micro_assessment():
     """Create micro assessment"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         assessment_data = {
             "user_id": user_id,
@@ -2,6 +2,7 @@ import os
 import traceback
 from datetime import datetime
 
+from app.admin_routes import require_admin_auth
 from app.aws_config import aws_config
 from flask import Blueprint, jsonify
 
@@ -137,6 +138,80 @@ def health_claude():
         )
 
 
+@health_bp.route("/cache")
+def health_cache():
+    """Read-through entity cache and token cache hit/miss counters"""
+    try:
+        from app.auth_service import token_cache
+        from app.orm import orm
+
+        return jsonify(
+            {
+                "status": "healthy",
+                "service": "entity-cache",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "tables": orm.cache_stats(),
+                "auth_tokens": token_cache.stats(),
+            }
+        )
+    except Exception as e:
+        return (
+            jsonify(
+                {
+                    "status": "unhealthy",
+                    "service": "entity-cache",
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "error": str(e),
+                }
+            ),
+            500,
+        )
+
+
+@health_bp.route("/metrics")
+@require_admin_auth
+def health_metrics():
+    """ORM cost per table, operation and route"""
+    try:
+        from app.sandbox import pool_stats
+        from app.storage import buffer_stats, metrics
+
+        return jsonify(
+            {
+                "status": "healthy",
+                "service": "orm-metrics",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "enabled": metrics.enabled,
+                "slow_query_ms": metrics.slow_ms,
+                "operations": metrics.snapshot(),
+                "write_buffers": buffer_stats(),
+                "python_pool": pool_stats(),
+            }
+        )
+    except Exception as e:
+        return (
+            jsonify(
+                {
+                    "status": "unhealthy",
+                    "service": "orm-metrics",
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "error": str(e),
+                }
+            ),
+            500,
+        )
+
+
+@health_bp.route("/metrics/reset", methods=["POST"])
+@require_admin_auth
+def reset_health_metrics():
+    """Clear the ORM cost counters"""
+    from app.storage import metrics
+
+    metrics.reset()
+    return jsonify({"message": "ORM metrics reset"}), 200
+
+
 def check_dynamodb_health():
     """Check DynamoDB connectivity and table status"""
     try:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Request Identity
+
+One before_request hook verifies the bearer token, if the request has one,
+and leaves the caller on ``g.identity``; every route reads it from there
+instead of verifying the token again. The caller's id is the key of their
+user record (the sub, or the Cognito username of older federated users),
+resolved once per token and cached with it. The record itself is read
+from DynamoDB the first time a route uses ``g.identity.user``, so routes
+that only need the user id don't fetch it on every request.
+"""
+
+from functools import wraps
+from typing import Any, Dict, Optional
+
+from flask import g, jsonify, request
+
+from app.auth_service import auth_service
+
+
+class Identity:
+    """The verified caller of the current request"""
+
+    def __init__(self, result: Dict[str, Any]):
+        self.user_id = _user_id(result)
+        self.username = result.get("username")
+        self.claims = result.get("claims") or {}
+        self._user = result.get("user_data")
+        # Cognito fallbacks return the record along with the identity
+        self._loaded = "user_data" in result
+
+    @property
+    def user(self) -> Optional[Dict[str, Any]]:
+        """The caller's user record, loaded on first use"""
+        if not self._loaded:
+            self._user = auth_service.load_user(self.user_id, self.username)
+            self._loaded = True
+        return self._user
+
+
+def _user_id(result: Dict[str, Any]) -> Optional[str]:
+    # Rows are owned by the user record's key, which isn't always the sub
+    user_id = (result.get("user_data") or {}).get("cognito_user_id") or result.get("user_id")
+    if user_id:
+        return user_id
+    # Cognito get_user responses carry the sub as an attribute
+    for attr in (result.get("cognito_user") or {}).get("UserAttributes", []):
+        if attr.get("Name") == "sub":
+            return attr.get("Value")
+    return None
+
+
+def load_identity():
+    """before_request hook: resolve the caller once per request"""
+    g.identity = None
+    g.auth_error = None
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
+        g.auth_error = "Authorization header required"
+        return None
+
+    parts = auth_header.split(" ")
+    if len(parts) < 2 or not parts[1]:
+        g.auth_error = "Invalid authorization header format"
+        return None
+
+    try:
+        result = auth_service.resolve_identity(parts[1])
+    except Exception as e:
+        g.auth_error = f"Authentication error: {e}"
+        return None
+    if not result.get("success"):
+        g.auth_error = result.get("error") or "Invalid token"
+        return None
+
+    identity = Identity(result)
+    if not identity.user_id:
+        g.auth_error = "User ID not found"
+        return None
+    g.identity = identity
+    return None
+
+
+def current_user_id() -> Optional[str]:
+    """Id of the authenticated caller, or None"""
+    identity = g.get("identity")
+    return identity.user_id if identity else None
+
+
+def current_user() -> Optional[Dict[str, Any]]:
+    """User record of the authenticated caller, or None"""
+    identity = g.get("identity")
+    return identity.user if identity else None
+
+
+def require_auth(f):
+    """Decorator to require authentication"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if g.get("identity") is None:
+            return jsonify({"error": g.get("auth_error") or "Authorization header required"}), 401
+        return f(*args, **kwargs)
+
+    return decorated_function
@@ -5,10 +5,10 @@ Learning System Routes for Prismo Backend
 API routes for the core learning system including modules, attempts, mastery, and feedback.
 """
 
-from functools import wraps
 from flask import Blueprint, jsonify, request
-from app.orm import orm, PaginationParams
-from app.auth_service import auth_service
+from app.orm import orm
+from app.pagination import next_cursor, page_params
+from app.identity import current_user_id, require_auth
 from app.claude_routes import get_claude_response
 from datetime import datetime
 import traceback
@@ -17,30 +17,6 @@ import json
 # Learning routes blueprint
 learning_bp = Blueprint("learning", __name__, url_prefix="/learning")
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return jsonify({"error": "Authorization header required"}), 401
-
-        try:
-            token = auth_header.split(" ")[1]
-            result = auth_service.verify_token(token)
-            if not result["success"]:
-                return jsonify({"error": result["error"]}), 401
-
-            request.current_user = result["user_data"]
-            return f(*args, **kwargs)
-
-        except IndexError:
-            return jsonify({"error": "Invalid authorization header format"}), 401
-        except Exception as e:
-            return jsonify({"error": f"Authentication error: {e}"}), 401
-
-    return decorated_function
-
 # ============================================================================
 # MODULES
 # ============================================================================
@@ -50,26 +26,30 @@ def require_auth(f):
 def get_modules():
     """Get learning modules"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         module_type = request.args.get('module_type')
         limit = int(request.args.get('limit', 100))  # Increased default limit
+        # Optional projection, e.g. ?fields=id,name,created_at to skip module content
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or None
         
         print(f"[Get Modules] user_id: {user_id}, module_type: {module_type}, limit: {limit}")
         
         if user_id:
             try:
-                result = orm.modules.query_by_user_id(
-                    user_id=user_id,
-                    limit=limit
+                result = orm.modules.find(
+                    {"user_id": user_id},
+                    pagination=page_params(limit),
+                    fields=fields
                 )
-                modules = result if isinstance(result, list) else []
+                modules = result.items
             except Exception as query_error:
                 print(f"[Get Modules] Query by user_id failed: {query_error}, falling back to scan")
                 # Fallback to scan if query fails
                 result = orm.modules.scan(
                     filter_expression="user_id = :user_id",
                     expression_values={":user_id": user_id},
-                    limit=limit
+                    pagination=page_params(limit),
+                    fields=fields
                 )
                 modules = result.items if hasattr(result, 'items') else []
         else:
@@ -85,7 +65,8 @@ def get_modules():
             result = orm.modules.scan(
                 filter_expression=filter_expression,
                 expression_values=expression_values if expression_values else None,
-                limit=limit
+                pagination=page_params(limit),
+                fields=fields
             )
             modules = result.items if hasattr(result, 'items') else []
         
@@ -104,7 +85,8 @@ def get_modules():
         
         return jsonify({
             "modules": modules_list,
-            "count": len(modules_list)
+            "count": len(modules_list),
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         print(f"[Get Modules] Error: {e}")
@@ -118,7 +100,7 @@ def create_module():
     """Create learning module"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         module_data = {
             "user_id": user_id,
@@ -170,7 +152,7 @@ def delete_module(module_id):
             return jsonify({"error": "Module not found"}), 404
         
         # Check if user owns this module
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         if module.user_id != user_id:
             return jsonify({"error": "Unauthorized"}), 403
         
@@ -189,7 +171,7 @@ def delete_module(module_id):
 def get_attempts():
     """Get learning attempts"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         lab_id = request.args.get('lab_id')
         status = request.args.get('status')
         limit = int(request.args.get('limit', 50))
@@ -197,12 +179,14 @@ def get_attempts():
         if lab_id:
             result = orm.attempts.query(
                 index_name="lab-id-index",
-                key_condition={"lab_id": lab_id}
+                key_condition={"lab_id": lab_id},
+                pagination=page_params(limit)
             )
         else:
             result = orm.attempts.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         # Filter by status if provided
@@ -213,7 +197,8 @@ def get_attempts():
         
         return jsonify({
             "attempts": [attempt.to_dict() for attempt in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get attempts: {e}"}), 500
@@ -224,7 +209,7 @@ def create_attempt():
     """Create learning attempt"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         attempt_data = {
             "user_id": user_id,
@@ -273,7 +258,7 @@ def update_attempt(attempt_id):
 def get_mastery():
     """Get mastery records"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         skill_tag = request.args.get('skill_tag')
         level = request.args.get('level')
         limit = int(request.args.get('limit', 50))
@@ -281,12 +266,14 @@ def get_mastery():
         if skill_tag:
             result = orm.mastery.query(
                 index_name="skill-tag-index",
-                key_condition={"skill_tag": skill_tag}
+                key_condition={"skill_tag": skill_tag},
+                pagination=page_params(limit)
             )
         else:
             result = orm.mastery.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         # Filter by level if provided
@@ -297,7 +284,8 @@ def get_mastery():
         
         return jsonify({
             "mastery": [mastery.to_dict() for mastery in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get mastery: {e}"}), 500
@@ -308,7 +296,7 @@ def create_mastery():
     """Create mastery record"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         mastery_data = {
             "user_id": user_id,
@@ -343,24 +331,27 @@ def update_mastery(mastery_id):
 def get_feedback():
     """Get feedback records"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         widget_id = request.args.get('widget_id')
         limit = int(request.args.get('limit', 50))
         
         if widget_id:
             result = orm.feedback.query(
                 index_name="widget-id-index",
-                key_condition={"widget_id": widget_id}
+                key_condition={"widget_id": widget_id},
+                pagination=page_params(limit)
             )
         else:
             result = orm.feedback.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         return jsonify({
             "feedback": [feedback.to_dict() for feedback in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get feedback: {e}"}), 500
@@ -371,7 +362,7 @@ def create_feedback():
     """Create feedback record"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         feedback_data = {
             "user_id": user_id,
@@ -396,24 +387,27 @@ def create_feedback():
 def get_learning_paths():
     """Get learning paths"""
     try:
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         path_type = request.args.get('path_type')
         limit = int(request.args.get('limit', 50))
         
         if path_type:
             result = orm.learning_paths.query(
                 index_name="path-type-index",
-                key_condition={"path_type": path_type}
+                key_condition={"path_type": path_type},
+                pagination=page_params(limit)
             )
         else:
             result = orm.learning_paths.query(
                 index_name="user-id-index",
-                key_condition={"user_id": user_id}
+                key_condition={"user_id": user_id},
+                pagination=page_params(limit)
             )
         
         return jsonify({
             "paths": [path.to_dict() for path in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get learning paths: {e}"}), 500
@@ -424,7 +418,7 @@ def create_learning_path():
     """Create learning path"""
     try:
         data = request.get_json()
-        user_id = request.current_user.get("cognito_user_id")
+        user_id = current_user_id()
         
         path_data = {
             "user_id": user_id,
@@ -456,14 +450,16 @@ def get_skill_tags():
         if category:
             result = orm.skill_tags.query(
                 index_name="category-index",
-                key_condition={"category": category}
+                key_condition={"category": category},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.skill_tags.scan(pagination=PaginationParams(limit=limit))
+            result = orm.skill_tags.scan(pagination=page_params(limit))
         
         return jsonify({
             "skill_tags": [tag.to_dict() for tag in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get skill tags: {e}"}), 500
@@ -503,14 +499,16 @@ def get_difficulty_levels():
         if level:
             result = orm.difficulty_levels.query(
                 index_name="level-index",
-                key_condition={"level": int(level)}
+                key_condition={"level": int(level)},
+                pagination=page_params(limit)
             )
         else:
-            result = orm.difficulty_levels.scan(pagination=PaginationParams(limit=limit))
+            result = orm.difficulty_levels.scan(pagination=page_params(limit))
         
         return jsonify({
             "difficulty_levels": [level.to_dict() for level in result.items],
-            "count": result.count
+            "count": result.count,
+            "next_cursor": next_cursor(result)
         }), 200
     except Exception as e:
         return jsonify({"error": f"Failed to get difficulty levels: {e}"}), 500
@@ -554,20 +552,8 @@ def get_lab_recommendations():
     Returns recommended labs (existing or topics to generate)
     """
     try:
-        print(f"[Recommendations] current_user type: {type(request.current_user)}")
-        print(f"[Recommendations] current_user: {request.current_user}")
-        
-        # Safely extract user_id
-        if request.current_user is None:
-            return jsonify({"error": "User not authenticated"}), 401
-            
-        user_id = request.current_user.get("cognito_user_id")
-        print(f"[Recommendations] user_id: {user_id}, type: {type(user_id)}")
-        
-        # Ensure user_id is a string
-        if not user_id or not isinstance(user_id, str):
-            print(f"[Recommendations] ERROR: Invalid user_id. current_user keys: {request.current_user.keys() if isinstance(request.current_user, dict) else 'not a dict'}")
-            return jsonify({"error": "Invalid user data"}), 401
+        user_id = current_user_id()
+        print(f"[Recommendations] user_id: {user_id}")
         
         data = request.get_json() or {}
         count = data.get("count", 3)
@@ -713,19 +699,19 @@ Respond in valid JSON format like this:
                 "source": "existing_labs"
             }), 200
         
-        # Get module details for completed labs
+        # Get module details for completed labs in one batch read
         completed_modules = []
-        for session in completed_sessions[:10]:  # Limit to last 10 for context
-            try:
-                module = orm.modules.get(session.module_id)
-                if module:
-                    completed_modules.append({
-                        "title": module.content.get("title", module.name),
-                        "skills": module.content.get("skills", module.tags),
-                        "difficulty": module.content.get("difficulty", 2)
-                    })
-            except:
-                continue
+        try:
+            recent_module_ids = [session.module_id for session in completed_sessions[:10]]  # Limit to last 10 for context
+            for module in orm.modules.batch_get(recent_module_ids, preserve_order=True):
+                content = module.content or {}
+                completed_modules.append({
+                    "title": content.get("title", module.name),
+                    "skills": content.get("skills", module.tags),
+                    "difficulty": content.get("difficulty", 2)
+                })
+        except Exception as e:
+            print(f"[Recommendations] Error loading completed modules: {e}")
         
         # Build AI prompt
         system_prompt = """You are an expert learning path advisor for coding education. 
@@ -136,11 +136,10 @@ class Lab(BaseModel):
     
     def get_public_labs(self) -> List[Dict[str, Any]]:
         """Get all public labs"""
-        result = self.orm.scan(
+        return [item.to_dict() for item in self.orm.iter_scan(
             filter_expression='is_public = :is_public',
             expression_values={':is_public': True}
-        )
-        return [item.to_dict() for item in result.items]
+        )]
 
 class Widget(BaseModel):
     """Widget model for DynamoDB - Enhanced with ORM"""
@@ -172,26 +171,40 @@ class Widget(BaseModel):
     
     def get_public_widgets(self) -> List[Dict[str, Any]]:
         """Get all public widgets"""
-        result = self.orm.scan(
+        return [item.to_dict() for item in self.orm.iter_scan(
             filter_expression='is_public = :is_public',
             expression_values={':is_public': True}
-        )
-        return [item.to_dict() for item in result.items]
+        )]
 
 class Collection(BaseModel):
     """Collection model for DynamoDB - Enhanced with ORM"""
     
+    # Kinds of record a collection item can reference
+    ITEM_TYPES = ('lab', 'widget')
+    
     def __init__(self):
         super().__init__('collections')
     
+    @classmethod
+    def validate_items(cls, items: Any):
+        """Raise ValueError unless items is a list of {'type': 'lab'|'widget', 'id': str}"""
+        if not isinstance(items, list):
+            raise ValueError("items must be a list")
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or item.get('type') not in cls.ITEM_TYPES:
+                raise ValueError(f"items[{index}] must have a type of {' or '.join(cls.ITEM_TYPES)}")
+            if not isinstance(item.get('id'), str) or not item['id']:
+                raise ValueError(f"items[{index}] must have a string id")
+    
     def create_collection(self, name: str, description: str, user_id: str, 
                          items: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
-        """Create a new collection"""
+        """Create a new collection of {'type': 'lab'|'widget', 'id': ...} items"""
+        self.validate_items(items)
         collection_data = {
             'name': name,
             'description': description,
             'user_id': user_id,
-            'items': items,  # List of lab/widget IDs
+            'items': items,  # List of lab/widget references
             'is_public': kwargs.get('is_public', False),
             'tags': kwargs.get('tags', [])
         }
@@ -204,3 +217,30 @@ class Collection(BaseModel):
             key_condition={"user_id": user_id}
         )
         return [item.to_dict() for item in result.items]
+    
+    def get_collection_items(self, collection: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Resolve a collection's lab/widget references with one batch read per table
+        
+        Items that aren't {'type': 'lab'|'widget', 'id': ...} references, as
+        collections written before validate_items may hold, are left out.
+        """
+        item_orms = {'lab': orm.labs, 'widget': orm.widgets}
+        references = [
+            item for item in collection.get('items', [])
+            if isinstance(item, dict) and item.get('type') in item_orms and isinstance(item.get('id'), str)
+        ]
+        ids_by_type: Dict[str, List[str]] = {}
+        for item in references:
+            ids_by_type.setdefault(item['type'], []).append(item['id'])
+        
+        records = {}
+        for item_type, ids in ids_by_type.items():
+            for record in item_orms[item_type].batch_get(ids):
+                records[(item_type, record.id)] = record.to_dict()
+        
+        resolved = []
+        for item in references:
+            record = records.get((item['type'], item['id']))
+            if record:
+                resolved.append({**item, 'record': record})
+        return resolved
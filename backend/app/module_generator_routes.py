@@ -9,16 +9,13 @@ import json
 import os
 from datetime import datetime
 from flask import Blueprint, jsonify, request
-from app.auth_service import CognitoAuthService
+from app.identity import current_user_id
 from app.ace_engine import ace_engine
 import traceback
 
 # Create blueprint
 module_generator_bp = Blueprint("module_generator", __name__)
 
-# Initialize auth service
-auth_service = CognitoAuthService()
-
 
 def save_module_to_filesystem(module: dict, module_id: str):
     """
@@ -73,56 +70,6 @@ def save_module_to_filesystem(module: dict, module_id: str):
         traceback.print_exc()
 
 
-def get_user_id_from_token():
-    """Extract user ID from JWT token in Authorization header"""
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        print("DEBUG: No Authorization header or invalid format")
-        return None
-    
-    token = auth_header.split(" ")[1]
-    result = auth_service.verify_token(token)
-    
-    print(f"DEBUG: Token verification result: {result}")
-    
-    # Check if result is None first
-    if result is None:
-        print(f"DEBUG: Token verification returned None")
-        return None
-    
-    if not result.get("success"):
-        print(f"DEBUG: Token verification failed: {result.get('error')}")
-        return None
-    
-    # Try multiple possible user ID fields
-    user_data = result.get("user_data") or {}
-    user_id = (
-        result.get("user_id") or 
-        result.get("cognito_user_id") or
-        user_data.get("cognito_user_id") or
-        user_data.get("id")
-    )
-    
-    # If no user_id found, try to extract from cognito_user attributes
-    if not user_id:
-        cognito_user = result.get("cognito_user")
-        if cognito_user and isinstance(cognito_user, dict):
-            # Extract 'sub' from UserAttributes
-            user_attributes = cognito_user.get("UserAttributes", [])
-            for attr in user_attributes:
-                if attr.get("Name") == "sub":
-                    user_id = attr.get("Value")
-                    print(f"DEBUG: Extracted user ID from cognito_user attributes: {user_id}")
-                    break
-    
-    if user_id:
-        print(f"DEBUG: Extracted user ID: {user_id}")
-        return user_id
-    
-    print(f"DEBUG: No user ID found in token verification result")
-    return None
-
-
 @module_generator_bp.route("/api/modules/generate", methods=["POST"])
 def generate_module():
     """
@@ -150,7 +97,7 @@ def generate_module():
         print("="*80)
         
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         
         if not user_id:
             print("ERROR: Authentication failed - no user ID")
@@ -292,7 +239,7 @@ def generate_personalized_module():
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
@@ -4,46 +4,31 @@ Module Session Routes
 Handles tracking of when users start, progress through, and complete modules.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 from decimal import Decimal
 import json
-from app.orm import orm, ModuleSession
-from app.auth_service import CognitoAuthService
+import uuid
+import zlib
+from app.orm import orm, ModuleSession, TransactionCancelledError, UnitOfWork
+from app.ace_engine import ace_engine
+from app.pagination import next_cursor, page_params
+from app.identity import current_user_id
 
 # Create blueprint
 module_session_bp = Blueprint("module_sessions", __name__)
 
-# Initialize auth service
-auth_service = CognitoAuthService()
+# Attributes returned by session listings; skips the interactions payload
+SESSION_SUMMARY_FIELDS = [
+    'id', 'user_id', 'module_id', 'status', 'started_at', 'last_activity_at',
+    'completed_at', 'time_spent', 'progress', 'current_step', 'total_steps',
+    'interaction_count', 'created_at', 'updated_at'
+]
 
-
-def get_user_id_from_token() -> Optional[str]:
-    """Extract user ID from JWT token in Authorization header"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-    
-    token = auth_header.split(' ')[1]
-    try:
-        # Verify token and get user info
-        user_info = auth_service.verify_token(token)
-        if user_info and 'success' in user_info and user_info['success']:
-            # Try multiple possible user ID fields
-            user_id = (
-                user_info.get('user_id') or 
-                user_info.get('cognito_user_id') or
-                user_info.get('user_data', {}).get('cognito_user_id') or
-                user_info.get('user_data', {}).get('id') or
-                user_info.get('cognito_user', {}).get('Username')
-            )
-            print(f"[Auth Debug] Extracted user_id: {user_id} from token")
-            return user_id
-    except Exception as e:
-        print(f"Error verifying token: {e}")
-    
-    return None
+# Limits for /interactions/batch
+MAX_INTERACTION_BATCH = 500
+MAX_INTERACTION_BATCH_BYTES = 5 * 1024 * 1024
 
 
 @module_session_bp.route("/module-sessions/start", methods=["POST"])
@@ -73,7 +58,7 @@ def start_module_session():
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
@@ -138,32 +123,15 @@ def start_module_session():
 def track_interaction(session_id: str):
     """Track a widget interaction for a module session"""
     try:
-        # Get user from token
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({
-                "success": False,
-                "error": "Authentication required"
-            }), 401
-        
-        token = auth_header.split(' ')[1]
-        user_info = auth_service.verify_token(token)
-        
-        if not user_info.get('success'):
-            return jsonify({
-                "success": False,
-                "error": "Invalid token"
-            }), 401
-        
-        user_id = user_info.get('user_id') or user_info.get('cognito_user', {}).get('Username')
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
-                "error": "User ID not found"
+                "error": "Authentication required"
             }), 401
         
-        # Get session
-        session = orm.module_sessions.get_by_id(session_id)
+        # Get session (ownership only, not the full record)
+        session = orm.module_sessions.get_by_id(session_id, fields=['id', 'user_id'])
         if not session:
             return jsonify({
                 "success": False,
@@ -202,31 +170,209 @@ def track_interaction(session_id: str):
             "data": data.get('data', {})
         }
         
-        # Get existing interactions or create new array
-        existing_interactions = []
-        if session.interactions:
-            try:
-                existing_interactions = json.loads(session.interactions)
-            except json.JSONDecodeError:
-                existing_interactions = []
+        # Store the event as its own item, then bump the session counter;
+        # both writes are constant size however long the session runs
+        orm.session_interactions.append(build_interaction_event(session_id, interaction))
+        updated_session = orm.module_sessions.atomic_update(
+            {'id': session_id},
+            set_fields={'last_activity_at': interaction['timestamp']},
+            add={'interaction_count': 1},
+            condition_expression="attribute_exists(id)"
+        )
+        
+        return jsonify({
+            "success": True,
+            "interaction": interaction,
+            "total_interactions": int(updated_session.interaction_count)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+def build_interaction_event(session_id: str, interaction: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn an interaction into a session-interactions item"""
+    return {
+        **interaction,
+        # DynamoDB rejects floats, so numbers in the payload become Decimals
+        "data": json.loads(json.dumps(interaction.get("data") or {}), parse_float=Decimal),
+        "session_id": session_id,
+        "event_key": f"{interaction['timestamp']}#{uuid.uuid4().hex[:8]}"
+    }
+
+
+def read_request_json() -> Any:
+    """Parse the JSON body, inflating it first if sent with Content-Encoding: gzip"""
+    raw = request.get_data()
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        raw = inflater.decompress(raw, MAX_INTERACTION_BATCH_BYTES + 1)
+        if len(raw) > MAX_INTERACTION_BATCH_BYTES or inflater.unconsumed_tail:
+            raise ValueError("Decompressed body too large")
+    return json.loads(raw)
+
+
+@module_session_bp.route('/module-sessions/<session_id>/interactions/batch', methods=['POST'])
+def track_interactions_batch(session_id: str):
+    """
+    Track many widget interactions for a module session in one request
+    
+    Request body (optionally gzip-compressed with Content-Encoding: gzip):
+    {
+        "interactions": [
+            {"widget_id": "...", "widget_type": "...", "action": "...",
+             "timestamp": "...",  // optional, when the event happened
+             "data": {...}}       // optional
+        ]
+    }
+    A bare JSON array of interactions is also accepted.
+    
+    Returns:
+    {
+        "success": true,
+        "recorded": 12,
+        "failed": 0,
+        "total_interactions": 140
+    }
+    """
+    try:
+        user_id = current_user_id()
+        if not user_id:
+            return jsonify({
+                "success": False,
+                "error": "Unauthorized - valid token required"
+            }), 401
+        
+        try:
+            payload = read_request_json()
+        except (ValueError, zlib.error) as e:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid request body: {e}"
+            }), 400
+        
+        interactions = payload.get('interactions') if isinstance(payload, dict) else payload
+        if not isinstance(interactions, list) or not interactions:
+            return jsonify({
+                "success": False,
+                "error": "interactions must be a non-empty array"
+            }), 400
+        
+        if len(interactions) > MAX_INTERACTION_BATCH:
+            return jsonify({
+                "success": False,
+                "error": f"At most {MAX_INTERACTION_BATCH} interactions per batch"
+            }), 400
         
-        # Append new interaction
-        existing_interactions.append(interaction)
+        required_fields = ['widget_id', 'widget_type', 'action']
+        for index, data in enumerate(interactions):
+            missing = [field for field in required_fields if not isinstance(data, dict) or field not in data]
+            if missing:
+                return jsonify({
+                    "success": False,
+                    "error": f"Interaction {index} missing required field: {missing[0]}"
+                }), 400
+        
+        # One ownership check for the whole batch
+        session = orm.module_sessions.get_by_id(session_id, fields=['id', 'user_id'])
+        if not session:
+            return jsonify({
+                "success": False,
+                "error": "Session not found"
+            }), 404
+        
+        if session.user_id != user_id:
+            return jsonify({
+                "success": False,
+                "error": "Unauthorized"
+            }), 403
         
-        # Update session with new interactions
         now = datetime.utcnow().isoformat() + "Z"
-        updates = {
-            'interactions': json.dumps(existing_interactions),
-            'last_activity_at': now,
-            'updated_at': now
-        }
+        events = [
+            build_interaction_event(session_id, {
+                "widget_id": data['widget_id'],
+                "widget_type": data['widget_type'],
+                "action": data['action'],
+                "timestamp": str(data.get('timestamp') or now),
+                "data": data.get('data', {})
+            })
+            for data in interactions
+        ]
         
-        updated_session = orm.module_sessions.update(session_id, updates)
+        result = orm.session_interactions.batch_put(events)
+        
+        updated_session = orm.module_sessions.atomic_update(
+            {'id': session_id},
+            set_fields={'last_activity_at': now},
+            add={'interaction_count': result.succeeded},
+            condition_expression="attribute_exists(id)"
+        )
+        
+        return jsonify({
+            "success": not result.failed,
+            "recorded": result.succeeded,
+            "failed": len(result.failed),
+            "total_interactions": int(updated_session.interaction_count)
+        }), 200 if not result.failed else 207
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@module_session_bp.route('/module-sessions/<session_id>/interactions', methods=['GET'])
+def get_session_interactions(session_id: str):
+    """
+    Get a page of a session's interaction events, oldest first
+    
+    Query params:
+    - limit: Max events to return (default 100, max 500)
+    - cursor: next_cursor from the previous page
+    
+    Returns:
+    {
+        "success": true,
+        "interactions": [...],
+        "next_cursor": "opaque cursor or null"
+    }
+    """
+    try:
+        user_id = current_user_id()
+        if not user_id:
+            return jsonify({
+                "success": False,
+                "error": "Unauthorized - valid token required"
+            }), 401
+        
+        session = orm.module_sessions.get_by_id(session_id, fields=['id', 'user_id'])
+        if not session:
+            return jsonify({
+                "success": False,
+                "error": "Session not found"
+            }), 404
+        
+        if session.user_id != user_id:
+            return jsonify({
+                "success": False,
+                "error": "Unauthorized"
+            }), 403
+        
+        limit = request.args.get('limit', 100, type=int)
+        
+        result = orm.session_interactions.query(
+            key_condition={'session_id': session_id},
+            pagination=page_params(limit)
+        )
         
         return jsonify({
             "success": True,
-            "interaction": interaction,
-            "total_interactions": len(existing_interactions)
+            "interactions": [event.to_dict() for event in result.items],
+            "next_cursor": next_cursor(result)
         })
         
     except Exception as e:
@@ -258,7 +404,7 @@ def update_module_session(session_id: str):
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
@@ -340,7 +486,7 @@ def get_module_session(session_id: str):
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
@@ -383,18 +529,19 @@ def get_user_module_sessions(user_id: str):
     - status: filter by status (started, in_progress, completed, abandoned)
     - module_id: filter by specific module
     - limit: number of results (default 50)
-    - offset: pagination offset (default 0)
+    - cursor: next_cursor from the previous page
     
     Returns:
     {
         "success": true,
         "sessions": [ ... ],
-        "total": 10
+        "total": 10,
+        "next_cursor": "opaque cursor or null"
     }
     """
     try:
         # Get requesting user ID from token
-        requesting_user_id = get_user_id_from_token()
+        requesting_user_id = current_user_id()
         
         print(f"[Get User Sessions] Requested user_id: {user_id}")
         print(f"[Get User Sessions] Token user_id: {requesting_user_id}")
@@ -422,7 +569,6 @@ def get_user_module_sessions(user_id: str):
         status = request.args.get('status')
         module_id = request.args.get('module_id')
         limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
         
         # Build query
         query_params = {'user_id': user_id}
@@ -431,22 +577,18 @@ def get_user_module_sessions(user_id: str):
         if module_id:
             query_params['module_id'] = module_id
         
-        # Query sessions
-        sessions = orm.module_sessions.query_by_user_id(
-            user_id=user_id,
-            status=status,
-            module_id=module_id,
-            limit=limit
+        # Query sessions, projecting away the interactions payload
+        result = orm.module_sessions.find(
+            query_params,
+            pagination=page_params(limit),
+            fields=SESSION_SUMMARY_FIELDS
         )
         
-        # Apply pagination
-        total = len(sessions)
-        sessions = sessions[offset:offset + limit]
-        
         return jsonify({
             "success": True,
-            "sessions": [session.to_dict() for session in sessions],
-            "total": total
+            "sessions": [session.to_dict() for session in result.items],
+            "total": result.count,
+            "next_cursor": next_cursor(result)
         })
         
     except Exception as e:
@@ -461,6 +603,9 @@ def complete_module_session(session_id: str):
     """
     Mark a module session as completed
     
+    The session, learner profile, skill tree and completion streak are
+    written together in one transaction.
+    
     Request body:
     {
         "final_time_spent": 1800,  // optional
@@ -475,7 +620,7 @@ def complete_module_session(session_id: str):
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
@@ -512,15 +657,44 @@ def complete_module_session(session_id: str):
         if 'final_time_spent' in data:
             updates['time_spent'] = data['final_time_spent']
         
-        # Update session
-        updated_session = orm.module_sessions.update(session_id, updates)
+        module = orm.modules.get_by_id(session.module_id, fields=['tags']) if session.module_id else None
         
-        # TODO: Update learner profile and skill tree here
-        # This would integrate with the ACE engine
+        # A cancellation caused by another write (a concurrent interaction, or
+        # another completion creating the streak) is retried once with fresh reads
+        for attempt in range(2):
+            try:
+                with orm.transaction() as uow:
+                    # Completing twice must not count the module twice
+                    session_write = len(uow)
+                    uow.update(orm.module_sessions, {'id': session_id}, set_fields=updates,
+                               condition_expression="#cs <> :completed",
+                               condition_names={'#cs': 'status'},
+                               condition_values={':completed': 'completed'})
+                    ace_engine.stage_module_completion(
+                        uow, user_id,
+                        module_skills=list(getattr(module, 'tags', None) or []),
+                        completed=True,
+                        time_taken=int(updates.get('time_spent') or session.time_spent or 0),
+                        score=data.get('final_score', 0.0)
+                    )
+                    stage_completion_streak(uow, user_id, now)
+                break
+            except TransactionCancelledError as e:
+                if e.code(session_write) == 'ConditionalCheckFailed':
+                    return jsonify({
+                        "success": False,
+                        "error": "Session is already completed"
+                    }), 409
+                if attempt == 1:
+                    codes = ', '.join(sorted({r.get('Code') for r in e.reasons} - {'None', None}))
+                    return jsonify({
+                        "success": False,
+                        "error": f"Session completion conflicted with another update ({codes}), please retry"
+                    }), 409
         
         return jsonify({
             "success": True,
-            "session": updated_session.to_dict()
+            "session": {**session.to_dict(), **updates}
         })
         
     except Exception as e:
@@ -530,6 +704,42 @@ def complete_module_session(session_id: str):
         }), 500
 
 
+def stage_completion_streak(uow: UnitOfWork, user_id: str, now: str):
+    """Extend the user's module completion streak as part of a unit of work"""
+    streak = orm.streaks.find_one({'user_id': user_id, 'streak_type': 'module_completion'})
+    today = now[:10]
+    
+    if not streak:
+        uow.put(orm.streaks, {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'streak_type': 'module_completion',
+            'current_streak': 1,
+            'longest_streak': 1,
+            'last_activity': now,
+            'streak_start_date': now,
+            'created_at': now,
+            'updated_at': now
+        })
+        return
+    
+    last_day = (streak.last_activity or '')[:10]
+    yesterday = (datetime.fromisoformat(today) - timedelta(days=1)).date().isoformat()
+    if last_day == today:
+        current, start = int(streak.current_streak), streak.streak_start_date
+    elif last_day == yesterday:
+        current, start = int(streak.current_streak) + 1, streak.streak_start_date
+    else:
+        current, start = 1, now
+    
+    uow.update(orm.streaks, {'id': streak.id}, set_fields={
+        'current_streak': current,
+        'longest_streak': max(current, int(streak.longest_streak or 0)),
+        'last_activity': now,
+        'streak_start_date': start
+    })
+
+
 @module_session_bp.route("/module-sessions/<session_id>/abandon", methods=["POST"])
 def abandon_module_session(session_id: str):
     """
@@ -543,7 +753,7 @@ def abandon_module_session(session_id: str):
     """
     try:
         # Get user ID from token
-        user_id = get_user_id_from_token()
+        user_id = current_user_id()
         if not user_id:
             return jsonify({
                 "success": False,
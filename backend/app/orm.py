@@ -6,19 +6,85 @@ A comprehensive ORM for DynamoDB operations with type safety,
 query optimization, and relationship management.
 """
 
+import copy
 import json
+import queue
+import random
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union, Type, TypeVar, Generic
-from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, Type, TypeVar, Generic
+from dataclasses import dataclass, asdict, field, fields as dataclass_fields, is_dataclass
 from enum import Enum
 from decimal import Decimal
 import boto3
 from botocore.exceptions import ClientError
 from app.aws_config import aws_config
+from app.storage import (
+    COMPRESSED, OFFLOADED, InstrumentedTable, WriteBehindBuffer, bind_route, compressed_fields,
+    get_backend, is_packed, offloaded_fields, pack, unpack, unpack_item
+)
+from app.table_schemas import get_table_schema, key_attributes
 
 T = TypeVar('T')
 
+# DynamoDB per-request item limits
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+TRANSACT_WRITE_LIMIT = 100
+
+# Table holding the materialized item counters of counted tables
+COUNTERS_TABLE = "counters"
+
+def _backoff(attempt: int, base: float = 0.05, cap: float = 2.0):
+    """Sleep with capped exponential backoff and full jitter"""
+    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+def _to_dynamo_number(value: Any) -> Any:
+    """Convert floats to Decimal, which is the only float type boto3 accepts"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return value
+
+def build_projection(fields: List[str]) -> Tuple[str, Dict[str, str]]:
+    """Build a ProjectionExpression with every path segment escaped
+    
+    ``fields`` are attribute names or dotted paths into maps, e.g.
+    ``["id", "status", "content.title"]``. Returns the expression and the
+    ExpressionAttributeNames it needs, so reserved words are always safe.
+    """
+    names = {}
+    placeholders = {}
+    paths = []
+    for field_path in fields:
+        segments = []
+        for segment in field_path.split('.'):
+            if segment not in placeholders:
+                placeholders[segment] = f"#proj{len(placeholders)}"
+                names[placeholders[segment]] = segment
+            segments.append(placeholders[segment])
+        paths.append(".".join(segments))
+    return ", ".join(paths), names
+
+def project_item(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Apply a projection to an already-fetched item"""
+    projected: Dict[str, Any] = {}
+    for field_path in fields:
+        segments = field_path.split('.')
+        source, target = item, projected
+        for segment in segments[:-1]:
+            if not isinstance(source, dict) or segment not in source:
+                break
+            source = source[segment]
+            target = target.setdefault(segment, {})
+        else:
+            if isinstance(source, dict) and segments[-1] in source:
+                target[segments[-1]] = source[segments[-1]]
+    return projected
+
 class QueryOperator(Enum):
     """DynamoDB query operators"""
     EQ = "="
@@ -34,6 +100,28 @@ class QueryOperator(Enum):
     IN = "in"
     NOT_IN = "not_in"
 
+class ConditionalCheckError(Exception):
+    """A conditional write found the item in an unexpected state"""
+
+class TransactionCancelledError(ConditionalCheckError):
+    """A transaction was cancelled; ``reasons`` holds one code per write"""
+    
+    def __init__(self, message: str, reasons: Optional[List[Dict[str, Any]]] = None, offset: int = 0):
+        super().__init__(message)
+        self.reasons = reasons or []
+        # Staged position of reasons[0] when a UnitOfWork was split
+        self.offset = offset
+    
+    def code(self, position: int) -> Optional[str]:
+        """Cancellation code of the write staged at ``position``, if it was sent"""
+        index = position - self.offset
+        if 0 <= index < len(self.reasons):
+            return self.reasons[index].get('Code')
+        return None
+
+class UnknownTableError(AttributeError):
+    """A table handle was requested that PrismoORM does not declare"""
+
 @dataclass
 class QueryCondition:
     """Represents a query condition"""
@@ -57,6 +145,20 @@ class QueryResult:
     last_evaluated_key: Optional[Dict[str, Any]] = None
     scanned_count: int = 0
 
+@dataclass
+class QueryPlan:
+    """How a set of equality conditions will be served"""
+    operation: str  # 'query' or 'scan'
+    index_name: Optional[str] = None  # None means the base table
+    key_attributes: List[str] = field(default_factory=list)
+    filter_attributes: List[str] = field(default_factory=list)
+
+@dataclass
+class BatchWriteResult:
+    """Result of a bulk write with per-item failures"""
+    succeeded: int = 0
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+
 class BaseModel:
     """Base model class for all ORM models"""
     
@@ -64,14 +166,58 @@ class BaseModel:
         for key, value in kwargs.items():
             setattr(self, key, value)
     
+    def __getattr__(self, name: str) -> Any:
+        # Compressed attributes are decoded on first access
+        packed = self.__dict__.get('_packed')
+        if packed and name in packed:
+            value = unpack(packed[name])
+            setattr(self, name, value)
+            packed.pop(name, None)
+            return value
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert model to dictionary"""
-        return {k: v for k, v in self.__dict__.items() if v is not None}
+        for name in list(self.__dict__.get('_packed') or ()):
+            getattr(self, name)
+        return {k: v for k, v in self.__dict__.items() if v is not None and k != '_packed'}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
         """Create model from dictionary"""
-        return cls(**data)
+        packed = {k: v for k, v in data.items() if is_packed(v)}
+        if packed:
+            data = {k: None if k in packed else v for k, v in data.items()}
+        
+        if not is_dataclass(cls):
+            instance = cls(**data)
+        else:
+            # Attributes the dataclass doesn't declare (e.g. version counters) are kept as extras
+            declared = {f.name for f in dataclass_fields(cls)}
+            instance = cls(**{k: v for k, v in data.items() if k in declared})
+            for key, value in data.items():
+                if key not in declared:
+                    setattr(instance, key, value)
+        return instance._stash_packed(packed)
+    
+    @classmethod
+    def from_partial_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
+        """Create a model holding only the projected attributes
+        
+        Skips __init__ so required dataclass fields may be absent; to_dict()
+        then returns just the attributes that were fetched.
+        """
+        instance = cls.__new__(cls)
+        instance.__dict__.update(data)
+        return instance._stash_packed({k: v for k, v in data.items() if is_packed(v)})
+    
+    def _stash_packed(self, packed: Dict[str, Any]) -> 'BaseModel':
+        """Keep compressed values aside until they are first read"""
+        if packed:
+            for name in packed:
+                self.__dict__.pop(name, None)
+            self.__dict__['_packed'] = dict(packed)
+        return self
     
     def save(self) -> 'BaseModel':
         """Save model to database"""
@@ -87,17 +233,130 @@ class BaseModel:
         """Delete model from database"""
         return self.__class__.delete_by_id(self.id)
 
+class EntityCache:
+    """Bounded, thread-safe LRU cache of raw items with a per-entry TTL"""
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached item, or None on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            item = entry[1]
+        return copy.deepcopy(item)
+    
+    def set(self, key: tuple, item: Dict[str, Any], ttl: Optional[float] = None):
+        """Cache a copy of an item, evicting the least recently used entry"""
+        item = copy.deepcopy(item)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), item)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key: tuple):
+        """Drop a cached item"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all cached items"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for tuning the cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
 class DynamoDBORM:
     """DynamoDB ORM with CRUD operations"""
     
-    def __init__(self, table_name: str, model_class: Type[BaseModel]):
+    def __init__(self, table_name: str, model_class: Type[BaseModel],
+                 cache_size: int = 0, cache_ttl: float = 30.0, counted: bool = False,
+                 buffered: bool = False):
+        self.table_type = table_name
         self.table_name = aws_config.get_table_name(table_name)
         self.model_class = model_class
-        self.dynamodb_resource = aws_config.dynamodb_resource
-        self.table = self.dynamodb_resource.Table(self.table_name)
+        self.backend = get_backend()
+        # Records latency, consumed capacity and scan efficiency per call
+        self.table = InstrumentedTable(self.backend.table(self.table_name), self.table_name)
+        # (index_name, hash_key, range_key) for the base table and each GSI
+        self.key_sources = self._load_key_sources(table_name)
+        # Optional read-through cache for get_by_id/get_by_key (per process)
+        self.cache = EntityCache(cache_size, cache_ttl) if cache_size > 0 else None
+        # Attributes stored as compressed binary or offloaded, see app.storage.codec
+        self.compressed = compressed_fields(model_class)
+        self.offloaded = offloaded_fields(model_class)
+        # Maintain item counters in the counters table on create and delete
+        self.counted = counted
+        self._counters = None
+        # Queue create_deferred() writes and batch them in the background
+        self.buffer = None
+        if buffered and aws_config.write_buffer_enabled:
+            self.buffer = WriteBehindBuffer(
+                self.table_name, self._write_buffered,
+                flush_items=aws_config.write_buffer_flush_items,
+                flush_interval=aws_config.write_buffer_flush_interval,
+                max_pending=aws_config.write_buffer_max_pending,
+                put_timeout=aws_config.write_buffer_put_timeout,
+                max_retries=aws_config.write_buffer_max_retries
+            )
     
     def create(self, data: Dict[str, Any]) -> BaseModel:
         """Create a new record"""
+        self._stamp(data)
+        
+        try:
+            self._put_item(data)
+            return self.model_class.from_dict(data)
+        except ClientError as e:
+            raise Exception(f"Failed to create record: {e}")
+    
+    def create_deferred(self, data: Dict[str, Any]) -> BaseModel:
+        """Create a new record through the write-behind buffer
+        
+        Returns as soon as the record is queued; it becomes readable once the
+        buffer flushes. Meant for append-only events with fresh ids. Tables
+        without a buffer, and a buffer that stays full, write synchronously.
+        """
+        self._stamp(data)
+        if self.buffer is not None and self.buffer.submit(data):
+            return self.model_class.from_dict(data)
+        
+        try:
+            self._put_item(data)
+            return self.model_class.from_dict(data)
+        except ClientError as e:
+            raise Exception(f"Failed to create record: {e}")
+    
+    @staticmethod
+    def _stamp(data: Dict[str, Any]):
+        """Fill in the id and timestamps of a new record"""
         if 'id' not in data:
             data['id'] = str(uuid.uuid4())
         
@@ -106,32 +365,118 @@ class DynamoDBORM:
         
         if 'updated_at' not in data:
             data['updated_at'] = datetime.utcnow().isoformat()
+    
+    def _put_item(self, item: Dict[str, Any]):
+        """Write an item as-is, counting it if it didn't exist before"""
+        if not self.counted:
+            self.table.put_item(Item=self._pack(item))
+        else:
+            response = self.table.put_item(Item=self._pack(item), ReturnValues='ALL_OLD')
+            if 'Attributes' not in response:
+                self._adjust_counters(item, 1)
+        self._invalidate_item(item)
+    
+    def append(self, item: Dict[str, Any]) -> BaseModel:
+        """Insert an immutable event item as-is, failing if its key is taken"""
+        put_params = {'Item': self._pack(item)}
+        if self.key_sources:
+            put_params['ConditionExpression'] = "attribute_not_exists(#pk)"
+            put_params['ExpressionAttributeNames'] = {'#pk': self.key_sources[0][1]}
         
         try:
-            self.table.put_item(Item=data)
-            return self.model_class.from_dict(data)
+            self.table.put_item(**put_params)
+            self._adjust_counters(item, 1)
+            return self.model_class.from_dict(item)
         except ClientError as e:
-            raise Exception(f"Failed to create record: {e}")
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise ConditionalCheckError(f"Item already exists in {self.table_name}")
+            raise Exception(f"Failed to append record: {e}")
     
-    def get_by_id(self, id: str) -> Optional[BaseModel]:
+    def get_by_id(self, id: str, fields: Optional[List[str]] = None) -> Optional[BaseModel]:
         """Get record by ID"""
+        return self.get_by_key({'id': id}, fields=fields)
+    
+    def get_by_key(self, key: Dict[str, Any], fields: Optional[List[str]] = None) -> Optional[BaseModel]:
+        """Get record by key, optionally projecting only ``fields``"""
+        if self.cache is not None:
+            cached = self.cache.get(self._key_signature(key))
+            if cached is not None:
+                if fields:
+                    return self._to_model(project_item(cached, fields), fields)
+                return self.model_class.from_dict(cached)
+        
+        get_params = {'Key': key}
+        # A cached table reads the whole item so later reads of any fields hit
+        if self.cache is None:
+            self._apply_projection(get_params, fields)
+        
         try:
-            response = self.table.get_item(Key={'id': id})
+            response = self.table.get_item(**get_params)
             if 'Item' in response:
-                return self.model_class.from_dict(response['Item'])
+                item = response['Item']
+                if self.cache is not None:
+                    self.cache.set(self._key_signature(key), item)
+                    if fields:
+                        item = project_item(item, fields)
+                return self._to_model(item, fields)
             return None
         except ClientError as e:
             raise Exception(f"Failed to get record: {e}")
     
-    def get_by_key(self, key: Dict[str, Any]) -> Optional[BaseModel]:
-        """Get record by key"""
-        try:
-            response = self.table.get_item(Key=key)
-            if 'Item' in response:
-                return self.model_class.from_dict(response['Item'])
+    def _apply_projection(self, params: Dict[str, Any], fields: Optional[List[str]]):
+        """Add a ProjectionExpression for ``fields`` to request params"""
+        if not fields:
+            return
+        projection, names = build_projection(fields)
+        params['ProjectionExpression'] = projection
+        params['ExpressionAttributeNames'] = {**params.get('ExpressionAttributeNames', {}), **names}
+    
+    def _to_model(self, item: Dict[str, Any], fields: Optional[List[str]] = None) -> BaseModel:
+        """Build a full model, or a partial one when a projection was used"""
+        if fields:
+            return self.model_class.from_partial_dict(item)
+        return self.model_class.from_dict(item)
+    
+    def _pack(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of ``data`` with the model's compressed attributes packed"""
+        if not self.compressed or not self.compressed.intersection(data):
+            return data
+        return {
+            k: pack(v, aws_config.field_compression_min_bytes, aws_config.field_compression,
+                    offload_bytes=aws_config.object_offload_min_bytes if k in self.offloaded else None)
+            if k in self.compressed else v
+            for k, v in data.items()
+        }
+    
+    def _invalidate(self, key: Dict[str, Any]):
+        """Drop a record from the read-through cache after a write"""
+        if self.cache is not None:
+            self.cache.invalidate(self._key_signature(key))
+    
+    def _refresh(self, key: Dict[str, Any], item: Dict[str, Any]):
+        """Replace a cached record with the item a write returned"""
+        if self.cache is not None:
+            self.cache.set(self._key_signature(key), item)
+    
+    def _invalidate_item(self, item: Dict[str, Any]):
+        """Drop the cached record an item was written over"""
+        key = self._key_of(item)
+        if key is not None:
+            self._invalidate(key)
+    
+    def _key_names(self) -> List[str]:
+        """The table's key attributes (``id`` when its schema is unknown)"""
+        if not self.key_sources:
+            return ['id']
+        _, hash_key, range_key = self.key_sources[0]
+        return [attr for attr in (hash_key, range_key) if attr]
+    
+    def _key_of(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The key of an item, or None if it lacks a key attribute"""
+        names = self._key_names()
+        if not all(name in item for name in names):
             return None
-        except ClientError as e:
-            raise Exception(f"Failed to get record: {e}")
+        return {name: item[name] for name in names}
     
     def update(self, id: str, updates: Dict[str, Any]) -> Optional[BaseModel]:
         """Update record by ID"""
@@ -143,10 +488,11 @@ class DynamoDBORM:
         expression_values = {}
         
         # Build expression attribute names for reserved keywords
+        packed_updates = self._pack(updates)
         for key in updates.keys():
             if key in reserved_keywords:
                 expression_names[f"#{key}"] = key
-            expression_values[f":{key}"] = updates[key]
+            expression_values[f":{key}"] = packed_updates[key]
         
         # Build update expression with proper attribute names
         update_parts = []
@@ -170,44 +516,181 @@ class DynamoDBORM:
                 update_params['ExpressionAttributeNames'] = expression_names
             
             response = self.table.update_item(**update_params)
+            self._invalidate_item(response['Attributes'])
             return self.model_class.from_dict(response['Attributes'])
         except ClientError as e:
+            self._invalidate({'id': id})
             raise Exception(f"Failed to update record: {e}")
     
-    def delete_by_id(self, id: str) -> bool:
-        """Delete record by ID"""
+    def atomic_update(self, key: Dict[str, Any],
+                      set_fields: Optional[Dict[str, Any]] = None,
+                      add: Optional[Dict[str, Union[int, float, Decimal]]] = None,
+                      defaults: Optional[Dict[str, Any]] = None,
+                      condition_expression: Optional[str] = None,
+                      condition_names: Optional[Dict[str, str]] = None,
+                      condition_values: Optional[Dict[str, Any]] = None) -> BaseModel:
+        """Apply SET, ADD and if_not_exists updates in a single UpdateItem
+        
+        ``add`` counters are incremented server-side (a missing attribute
+        counts as zero) and ``defaults`` are only written when the attribute
+        is absent, so the call doubles as an upsert that needs no prior read.
+        Raises ConditionalCheckError when ``condition_expression`` fails.
+        """
+        defaults = {'created_at': datetime.utcnow().isoformat(), **(defaults or {})}
+        update_params = self._update_params(key, set_fields, add, defaults, condition_expression,
+                                            condition_names, condition_values)
+        update_params['ReturnValues'] = "ALL_NEW"
+        
         try:
-            self.table.delete_item(Key={'id': id})
-            return True
+            response = self.table.update_item(**update_params)
+            # created_at only takes our default when the update created the item
+            if response['Attributes'].get('created_at') == defaults['created_at'] and 'created_at' not in (set_fields or {}):
+                self._adjust_counters(response['Attributes'], 1)
+            # ALL_NEW is the whole item, so the next read of it is a hit
+            self._refresh(key, response['Attributes'])
+            return self.model_class.from_dict(response['Attributes'])
         except ClientError as e:
-            raise Exception(f"Failed to delete record: {e}")
+            self._invalidate(key)
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise ConditionalCheckError(f"Condition failed updating {self.table_name} {key}")
+            raise Exception(f"Failed to update record: {e}")
+    
+    def _update_params(self, key: Dict[str, Any],
+                       set_fields: Optional[Dict[str, Any]] = None,
+                       add: Optional[Dict[str, Union[int, float, Decimal]]] = None,
+                       defaults: Optional[Dict[str, Any]] = None,
+                       condition_expression: Optional[str] = None,
+                       condition_names: Optional[Dict[str, str]] = None,
+                       condition_values: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """UpdateItem parameters for SET, ADD and if_not_exists updates"""
+        set_fields = self._pack({**(set_fields or {}), 'updated_at': datetime.utcnow().isoformat()})
+        add = add or {}
+        defaults = self._pack(defaults or {})
+        
+        names = dict(condition_names or {})
+        values = {k: _to_dynamo_number(v) for k, v in (condition_values or {}).items()}
+        
+        def placeholders(attr: str, value: Any) -> Tuple[str, str]:
+            n = len(values)
+            names[f"#u{n}"] = attr
+            values[f":u{n}"] = _to_dynamo_number(value)
+            return f"#u{n}", f":u{n}"
+        
+        set_parts = []
+        for attr, value in set_fields.items():
+            if attr in key or attr in add:
+                continue
+            name, placeholder = placeholders(attr, value)
+            set_parts.append(f"{name} = {placeholder}")
+        for attr, value in defaults.items():
+            if attr in key or attr in add or attr in set_fields:
+                continue
+            name, placeholder = placeholders(attr, value)
+            set_parts.append(f"{name} = if_not_exists({name}, {placeholder})")
+        add_parts = []
+        for attr, value in add.items():
+            name, placeholder = placeholders(attr, value)
+            add_parts.append(f"{name} {placeholder}")
+        
+        update_expression = "SET " + ", ".join(set_parts)
+        if add_parts:
+            update_expression += " ADD " + ", ".join(add_parts)
+        
+        update_params = {
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values
+        }
+        if condition_expression:
+            update_params['ConditionExpression'] = condition_expression
+        return update_params
+
+    def increment(self, key: Dict[str, Any],
+                  counters: Dict[str, Union[int, float, Decimal]],
+                  **kwargs) -> BaseModel:
+        """Atomically add to numeric counters, creating the record if needed"""
+        return self.atomic_update(key, add=counters, **kwargs)
+    
+    def update_with_version(self, key: Dict[str, Any],
+                            mutate: Callable[[Dict[str, Any]], Dict[str, Any]],
+                            version_attr: str = 'version',
+                            max_retries: int = 5) -> BaseModel:
+        """Read-modify-write guarded by a version attribute
+        
+        ``mutate`` receives the current item (empty if absent) and returns the
+        attributes to set. The write only succeeds if the version is unchanged
+        since the read; on conflict the read and ``mutate`` are retried.
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.table.get_item(Key=key, ConsistentRead=True)
+            except ClientError as e:
+                raise Exception(f"Failed to get record: {e}")
+            
+            current = unpack_item(response.get('Item', {}))
+            version = current.get(version_attr)
+            updates = dict(mutate(current))
+            updates[version_attr] = (version or 0) + 1
+            
+            if version is None:
+                condition, condition_values = "attribute_not_exists(#ver)", {}
+            else:
+                condition, condition_values = "#ver = :expected_ver", {':expected_ver': version}
+            
+            try:
+                return self.atomic_update(
+                    key,
+                    set_fields=updates,
+                    condition_expression=condition,
+                    condition_names={'#ver': version_attr},
+                    condition_values=condition_values
+                )
+            except ConditionalCheckError:
+                if attempt == max_retries:
+                    break
+                print(f"DEBUG ORM: Version conflict on {self.table_name} {key}, "
+                      f"retry {attempt + 1}/{max_retries}")
+                _backoff(attempt)
+        
+        raise ConditionalCheckError(
+            f"Failed to update {self.table_name} {key} after {max_retries} version conflicts")
+    
+    def delete_by_id(self, id: str) -> bool:
+        """Delete record by ID"""
+        return self.delete_by_key({'id': id})
     
     def delete_by_key(self, key: Dict[str, Any]) -> bool:
         """Delete record by key"""
         try:
-            self.table.delete_item(Key=key)
+            if not self.counted:
+                self.table.delete_item(Key=key)
+            else:
+                response = self.table.delete_item(Key=key, ReturnValues='ALL_OLD')
+                if 'Attributes' in response:
+                    self._adjust_counters(response['Attributes'], -1)
+            self._invalidate(key)
             return True
         except ClientError as e:
             raise Exception(f"Failed to delete record: {e}")
     
     def query(self, 
               index_name: Optional[str] = None,
-              key_condition: Optional[Dict[str, Any]] = None,
+              key_condition: Optional[Union[str, Dict[str, Any]]] = None,
               filter_expression: Optional[str] = None,
               expression_values: Optional[Dict[str, Any]] = None,
-              pagination: Optional[PaginationParams] = None) -> QueryResult:
-        """Query records with optional filtering and pagination"""
+              pagination: Optional[PaginationParams] = None,
+              fields: Optional[List[str]] = None) -> QueryResult:
+        """Query records with optional filtering, projection and pagination
+        
+        ``key_condition`` is either a KeyConditionExpression string or a dict
+        of attribute equalities, which is routed to the matching key or index.
+        """
         
         query_params = {
             'Limit': pagination.limit if pagination else 50
         }
         
-        if index_name:
-            query_params['IndexName'] = index_name
-        
-        if key_condition:
-            query_params['KeyConditionExpression'] = key_condition
-        
         if filter_expression:
             query_params['FilterExpression'] = filter_expression
         
@@ -220,9 +703,12 @@ class DynamoDBORM:
         if pagination and not pagination.scan_index_forward:
             query_params['ScanIndexForward'] = False
         
+        operation = self._route(query_params, index_name, key_condition)
+        self._apply_projection(query_params, fields)
+        
         try:
-            response = self.table.query(**query_params)
-            items = [self.model_class.from_dict(item) for item in response.get('Items', [])]
+            response = operation(**query_params)
+            items = [self._to_model(item, fields) for item in response.get('Items', [])]
             
             return QueryResult(
                 items=items,
@@ -234,7 +720,8 @@ class DynamoDBORM:
             raise Exception(f"Failed to query records: {e}")
     
     def query_by_user_id(self, user_id: str, status: Optional[str] = None, 
-                        module_id: Optional[str] = None, limit: int = 50) -> List[BaseModel]:
+                        module_id: Optional[str] = None, limit: int = 50,
+                        fields: Optional[List[str]] = None) -> List[BaseModel]:
         """Query sessions by user_id with optional status and module_id filters"""
         try:
             # Use the user-id-index (only supports user_id as key condition)
@@ -267,8 +754,10 @@ class DynamoDBORM:
             if expression_names:
                 query_params['ExpressionAttributeNames'] = expression_names
             
+            self._apply_projection(query_params, fields)
+            
             response = self.table.query(**query_params)
-            return [self.model_class.from_dict(item) for item in response.get('Items', [])]
+            return [self._to_model(item, fields) for item in response.get('Items', [])]
             
         except ClientError as e:
             raise Exception(f"Failed to query by user_id: {e}")
@@ -277,8 +766,9 @@ class DynamoDBORM:
              filter_expression: Optional[str] = None,
              expression_values: Optional[Dict[str, Any]] = None,
              pagination: Optional[PaginationParams] = None,
-             limit: int = 100) -> QueryResult:
-        """Scan records with optional filtering and pagination"""
+             limit: int = 100,
+             fields: Optional[List[str]] = None) -> QueryResult:
+        """Scan records with optional filtering, projection and pagination"""
         
         scan_params = {
             'Limit': pagination.limit if pagination else limit
@@ -293,11 +783,13 @@ class DynamoDBORM:
         if pagination and pagination.last_evaluated_key:
             scan_params['ExclusiveStartKey'] = pagination.last_evaluated_key
         
+        self._apply_projection(scan_params, fields)
+        
         try:
             print(f"DEBUG ORM: Scanning table {self.table_name} with params: {scan_params}")
             response = self.table.scan(**scan_params)
             print(f"DEBUG ORM: Scan response count: {response.get('Count', 0)}")
-            items = [self.model_class.from_dict(item) for item in response.get('Items', [])]
+            items = [self._to_model(item, fields) for item in response.get('Items', [])]
             
             return QueryResult(
                 items=items,
@@ -309,43 +801,554 @@ class DynamoDBORM:
             print(f"ERROR ORM: Failed to scan records: {e}")
             raise Exception(f"Failed to scan records: {e}")
     
-    def batch_get(self, keys: List[Dict[str, Any]]) -> List[BaseModel]:
-        """Batch get multiple records"""
+    def find(self, conditions: Dict[str, Any],
+             pagination: Optional[PaginationParams] = None,
+             fields: Optional[List[str]] = None) -> QueryResult:
+        """Find records matching attribute equalities using the best key or index"""
+        return self.query(key_condition=conditions, pagination=pagination, fields=fields)
+    
+    def iter_find(self, conditions: Dict[str, Any],
+                  page_size: int = 100,
+                  max_items: Optional[int] = None,
+                  fields: Optional[List[str]] = None) -> Iterator[BaseModel]:
+        """Lazily find all records matching attribute equalities"""
+        return self.iter_query(key_condition=conditions, page_size=page_size,
+                               max_items=max_items, fields=fields)
+    
+    def find_one(self, conditions: Dict[str, Any],
+                 fields: Optional[List[str]] = None) -> Optional[BaseModel]:
+        """Find the first record matching attribute equalities"""
+        return next(self.iter_find(conditions, max_items=1, fields=fields), None)
+    
+    def plan(self, conditions: Dict[str, Any], index_name: Optional[str] = None) -> QueryPlan:
+        """Pick the base table key or GSI that serves equality ``conditions``
+        
+        A key source applies when its hash key is among the conditions. Ties
+        prefer ``index_name``, then sources whose range key is also covered,
+        then the base table. Remaining conditions become a filter. When no
+        source applies the plan falls back to a scan, logged unless it is
+        an intentionally unfiltered listing.
+        """
+        best = None
+        for source, hash_key, range_key in self.key_sources:
+            if hash_key not in conditions:
+                continue
+            score = (source == index_name, range_key in conditions, source is None)
+            if best is None or score > best[0]:
+                best = (score, source, hash_key, range_key)
+        
+        if best is None:
+            if conditions:
+                print(f"WARNING ORM: No key or index on {self.table_name} covers "
+                      f"{sorted(conditions)}, falling back to scan")
+            return QueryPlan(operation='scan', filter_attributes=list(conditions))
+        
+        _, source, hash_key, range_key = best
+        key_attrs = [hash_key] + ([range_key] if range_key in conditions else [])
+        return QueryPlan(
+            operation='query',
+            index_name=source,
+            key_attributes=key_attrs,
+            filter_attributes=[attr for attr in conditions if attr not in key_attrs]
+        )
+    
+    def _route(self, params: Dict[str, Any], index_name: Optional[str],
+               key_condition: Optional[Union[str, Dict[str, Any]]]) -> Callable:
+        """Add key condition params and return the table operation to call"""
+        if not isinstance(key_condition, dict):
+            if index_name:
+                params['IndexName'] = index_name
+            if key_condition:
+                params['KeyConditionExpression'] = key_condition
+            return self.table.query
+        
+        plan = self.plan(key_condition, index_name)
+        names, values = {}, {}
+        
+        def clause(attrs: List[str]) -> str:
+            parts = []
+            for attr in attrs:
+                n = len(names)
+                names[f"#c{n}"] = attr
+                values[f":c{n}"] = key_condition[attr]
+                parts.append(f"#c{n} = :c{n}")
+            return " AND ".join(parts)
+        
+        if plan.index_name:
+            params['IndexName'] = plan.index_name
+        if plan.key_attributes:
+            params['KeyConditionExpression'] = clause(plan.key_attributes)
+        if plan.filter_attributes:
+            planned_filter = clause(plan.filter_attributes)
+            if params.get('FilterExpression'):
+                planned_filter = f"({planned_filter}) AND ({params['FilterExpression']})"
+            params['FilterExpression'] = planned_filter
+        if names:
+            params['ExpressionAttributeNames'] = {**params.get('ExpressionAttributeNames', {}), **names}
+            params['ExpressionAttributeValues'] = {**params.get('ExpressionAttributeValues', {}), **values}
+        
+        if plan.operation == 'scan':
+            params.pop('ScanIndexForward', None)
+            return self.table.scan
+        return self.table.query
+    
+    @staticmethod
+    def _load_key_sources(table_type: str) -> List[Tuple[Optional[str], str, Optional[str]]]:
+        """Key schema of the base table and each GSI from the table registry"""
+        schema = get_table_schema(table_type)
+        if schema is None:
+            return []
+        sources = [(None, *key_attributes(schema['key_schema']))]
+        for index in schema.get('global_secondary_indexes', []):
+            sources.append((index['IndexName'], *key_attributes(index['KeySchema'])))
+        return sources
+    
+    def iter_query(self,
+                   index_name: Optional[str] = None,
+                   key_condition: Optional[Union[str, Dict[str, Any]]] = None,
+                   filter_expression: Optional[str] = None,
+                   expression_values: Optional[Dict[str, Any]] = None,
+                   page_size: int = 100,
+                   max_items: Optional[int] = None,
+                   scan_index_forward: bool = True,
+                   start_key: Optional[Dict[str, Any]] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[BaseModel]:
+        """Lazily query all matching records, following LastEvaluatedKey page by page"""
+        query_params = {'Limit': page_size}
+        
+        if filter_expression:
+            query_params['FilterExpression'] = filter_expression
+        
+        if expression_values:
+            query_params['ExpressionAttributeValues'] = expression_values
+        
+        if not scan_index_forward:
+            query_params['ScanIndexForward'] = False
+        
+        operation = self._route(query_params, index_name, key_condition)
+        self._apply_projection(query_params, fields)
+        
+        for item in self._paginate(operation, query_params, max_items, start_key):
+            yield self._to_model(item, fields)
+    
+    def iter_scan(self,
+                  filter_expression: Optional[str] = None,
+                  expression_values: Optional[Dict[str, Any]] = None,
+                  page_size: int = 100,
+                  max_items: Optional[int] = None,
+                  start_key: Optional[Dict[str, Any]] = None,
+                  fields: Optional[List[str]] = None) -> Iterator[BaseModel]:
+        """Lazily scan all matching records, following LastEvaluatedKey page by page"""
+        scan_params = {'Limit': page_size}
+        
+        if filter_expression:
+            scan_params['FilterExpression'] = filter_expression
+        
+        if expression_values:
+            scan_params['ExpressionAttributeValues'] = expression_values
+        
+        self._apply_projection(scan_params, fields)
+        
+        for item in self._paginate(self.table.scan, scan_params, max_items, start_key):
+            yield self._to_model(item, fields)
+    
+    def parallel_scan(self,
+                      filter_expression: Optional[str] = None,
+                      expression_values: Optional[Dict[str, Any]] = None,
+                      total_segments: Optional[int] = None,
+                      max_workers: Optional[int] = None,
+                      page_size: int = 100,
+                      checkpoints: Optional[Dict[int, Optional[Dict[str, Any]]]] = None,
+                      on_checkpoint: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None,
+                      fields: Optional[List[str]] = None) -> Iterator[BaseModel]:
+        """Scan the table as parallel segments and stream the merged results
+        
+        Each segment is scanned by a worker from a bounded thread pool using
+        DynamoDB's Segment/TotalSegments. Items are yielded in arrival order.
+        
+        ``checkpoints`` maps a segment number to the LastEvaluatedKey to resume
+        from; a segment mapped to None is treated as already finished.
+        ``on_checkpoint(segment, last_key)`` is called after every page of a
+        segment has been yielded, with ``last_key`` None once it completes.
+        """
+        total_segments = total_segments or aws_config.dynamodb_scan_segments
+        max_workers = max_workers or total_segments
+        checkpoints = checkpoints or {}
+        
+        scan_params = {'TableName': self.table_name, 'Limit': page_size}
+        
+        if filter_expression:
+            scan_params['FilterExpression'] = filter_expression
+        
+        if expression_values:
+            scan_params['ExpressionAttributeValues'] = expression_values
+        
+        self._apply_projection(scan_params, fields)
+        
+        pending = [
+            segment for segment in range(total_segments)
+            if segment not in checkpoints or checkpoints[segment] is not None
+        ]
+        if not pending:
+            return
+        
+        # A small bounded buffer applies backpressure to the workers
+        pages: queue.Queue = queue.Queue(maxsize=max_workers * 2)
+        stop = threading.Event()
+        client = self.table.meta.client
+        
+        def put(entry) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def scan_segment(segment: int):
+            last_key = checkpoints.get(segment)
+            try:
+                while not stop.is_set():
+                    page_params = dict(scan_params, Segment=segment, TotalSegments=total_segments)
+                    if last_key:
+                        page_params['ExclusiveStartKey'] = last_key
+                    response = client.scan(**page_params)
+                    last_key = response.get('LastEvaluatedKey')
+                    if not put((segment, response.get('Items', []), last_key, None)) or not last_key:
+                        return
+            except Exception as e:
+                put((segment, [], None, e))
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"scan-{self.table_name}")
         try:
-            response = self.dynamodb.batch_get_item(
-                RequestItems={
-                    self.table_name: {
-                        'Keys': keys
-                    }
-                }
-            )
+            for segment in pending:
+                executor.submit(bind_route(scan_segment), segment)
             
-            items = response.get('Responses', {}).get(self.table_name, [])
-            return [self.model_class.from_dict(item) for item in items]
-        except ClientError as e:
-            raise Exception(f"Failed to batch get records: {e}")
+            remaining = len(pending)
+            while remaining:
+                segment, items, last_key, error = pages.get()
+                if error is not None:
+                    raise Exception(f"Failed to scan segment {segment}: {error}")
+                
+                for item in items:
+                    yield self._to_model(item, fields)
+                
+                if on_checkpoint:
+                    on_checkpoint(segment, last_key)
+                if not last_key:
+                    remaining -= 1
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _paginate(self, operation, params: Dict[str, Any],
+                  max_items: Optional[int] = None,
+                  start_key: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield raw items from a query/scan operation one page at a time
+        
+        Only the current page is held in memory. Iteration stops once the
+        table is exhausted or ``max_items`` items have been yielded.
+        """
+        if max_items is not None and max_items <= 0:
+            return
+        
+        yielded = 0
+        last_key = start_key
+        while True:
+            page_params = dict(params)
+            if last_key:
+                page_params['ExclusiveStartKey'] = last_key
+            
+            try:
+                response = operation(**page_params)
+            except ClientError as e:
+                raise Exception(f"Failed to paginate records: {e}")
+            
+            for item in response.get('Items', []):
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+            
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+    
+    def batch_get(self, keys: List[Union[str, Dict[str, Any]]],
+                  preserve_order: bool = False,
+                  max_workers: int = 4,
+                  max_retries: int = 5,
+                  fields: Optional[List[str]] = None) -> List[BaseModel]:
+        """Batch get multiple records
+        
+        Keys may be key dicts or plain ids. They are de-duplicated, split into
+        BatchGetItem requests of 100 and fetched concurrently; UnprocessedKeys
+        are retried with exponential backoff. With ``preserve_order`` the
+        results follow the input key order, otherwise arrival order. Missing
+        records are omitted. ``fields`` always includes the key attributes.
+        """
+        unique_keys = {}
+        for key in keys:
+            if not isinstance(key, dict):
+                key = {'id': key}
+            unique_keys.setdefault(self._key_signature(key), key)
+        
+        if not unique_keys:
+            return []
+        
+        key_list = list(unique_keys.values())
+        key_names = list(key_list[0].keys())
+        chunks = [key_list[i:i + BATCH_GET_LIMIT] for i in range(0, len(key_list), BATCH_GET_LIMIT)]
+        
+        projection = {}
+        if fields:
+            self._apply_projection(projection, list(dict.fromkeys(key_names + list(fields))))
+        
+        if len(chunks) == 1:
+            raw_items = self._batch_get_chunk(chunks[0], max_retries, projection)
+        else:
+            raw_items = []
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                for chunk_items in executor.map(bind_route(lambda chunk: self._batch_get_chunk(chunk, max_retries, projection)), chunks):
+                    raw_items.extend(chunk_items)
+        
+        if preserve_order:
+            by_key = {
+                self._key_signature({name: item.get(name) for name in key_names}): item
+                for item in raw_items
+            }
+            raw_items = [by_key[sig] for sig in unique_keys if sig in by_key]
+        
+        return [self._to_model(item, fields) for item in raw_items]
+    
+    def _batch_get_chunk(self, keys: List[Dict[str, Any]], max_retries: int,
+                         projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch up to 100 keys, retrying UnprocessedKeys with backoff"""
+        client = self.table.meta.client
+        request_items = {self.table_name: {'Keys': keys, **(projection or {})}}
+        items = []
+        attempt = 0
+        
+        while request_items:
+            try:
+                response = client.batch_get_item(RequestItems=request_items)
+            except ClientError as e:
+                raise Exception(f"Failed to batch get records: {e}")
+            
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request_items = response.get('UnprocessedKeys') or {}
+            
+            if request_items:
+                if attempt >= max_retries:
+                    unprocessed = len(request_items.get(self.table_name, {}).get('Keys', []))
+                    raise Exception(f"Failed to batch get records: {unprocessed} keys still unprocessed after {max_retries} retries")
+                _backoff(attempt)
+                attempt += 1
+        
+        return items
+    
+    @staticmethod
+    def _key_signature(key: Dict[str, Any]) -> tuple:
+        """Hashable signature for a key dict"""
+        return tuple(sorted((name, str(value)) for name, value in key.items()))
     
     def batch_write(self, items: List[Dict[str, Any]], operation: str = 'put') -> bool:
         """Batch write multiple records"""
+        if self.counted:
+            if operation == 'put':
+                result = self.batch_put(items)
+            else:
+                result = self.batch_delete([self._key_of(item) for item in items])
+            if result.failed:
+                raise Exception(f"Failed to batch write records: {len(result.failed)} of {len(items)} failed")
+            return True
+        
         try:
             with self.table.batch_writer() as batch:
                 for item in items:
+                    self._invalidate_item(item)
                     if operation == 'put':
-                        batch.put_item(Item=item)
+                        batch.put_item(Item=self._pack(item))
                     elif operation == 'delete':
-                        batch.delete_item(Key={'id': item['id']})
+                        batch.delete_item(Key=self._key_of(item))
             
             return True
         except ClientError as e:
             raise Exception(f"Failed to batch write records: {e}")
     
+    def batch_delete(self, keys: List[Union[str, Dict[str, Any]]],
+                     max_workers: int = 4,
+                     max_retries: int = 5) -> BatchWriteResult:
+        """Delete many records with BatchWriteItem
+        
+        Keys may be key dicts or plain ids. Deletes are sent in chunks of 25,
+        chunks run concurrently, and UnprocessedItems are retried with
+        backoff. Keys that still fail are reported individually.
+        """
+        unique_keys = {}
+        for key in keys:
+            if not isinstance(key, dict):
+                key = {'id': key}
+            unique_keys.setdefault(self._key_signature(key), key)
+        
+        for key in unique_keys.values():
+            self._invalidate(key)
+        
+        requests = [{'DeleteRequest': {'Key': key}} for key in unique_keys.values()]
+        result = self._run_batch_writes(requests, max_workers, max_retries, counted=self.counted)
+        result.failed = [
+            {'key': requests[position]['DeleteRequest']['Key'], 'error': error}
+            for position, error in result.failed
+        ]
+        return result
+    
+    def batch_put(self, items: List[Dict[str, Any]],
+                  max_workers: int = 4,
+                  max_retries: int = 5) -> BatchWriteResult:
+        """Put many items with BatchWriteItem
+        
+        Items are written as-is in chunks of 25, chunks run concurrently, and
+        UnprocessedItems are retried with backoff. Items that still fail are
+        reported individually.
+        """
+        return self._batch_put_items(items, max_workers, max_retries, counted=self.counted)
+    
+    def _batch_put_items(self, items: List[Dict[str, Any]], max_workers: int,
+                         max_retries: int, counted: bool = False) -> BatchWriteResult:
+        """BatchWriteItem puts, counting new items only if ``counted``"""
+        result = self._put_items(items, max_workers, max_retries, counted)
+        result.failed = [{'item': items[position], 'error': error} for position, error in result.failed]
+        return result
+    
+    def _put_items(self, items: List[Dict[str, Any]], max_workers: int,
+                   max_retries: int, counted: bool = False) -> BatchWriteResult:
+        """_batch_put_items with ``failed`` left as (position, error) pairs"""
+        for item in items:
+            self._invalidate_item(item)
+        
+        requests = [{'PutRequest': {'Item': self._pack(item)}} for item in items]
+        return self._run_batch_writes(requests, max_workers, max_retries, counted=counted)
+    
+    def _write_buffered(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flush a write-behind batch; returns the items that failed"""
+        result = self._put_items(items, max_workers=4, max_retries=5)
+        failed = {position for position, _ in result.failed}
+        if self.counted:
+            # Deferred records are new, so every written item adds one
+            deltas: Dict[str, int] = {}
+            for position, item in enumerate(items):
+                if position not in failed:
+                    for counter_id in self._counter_ids(item):
+                        deltas[counter_id] = deltas.get(counter_id, 0) + 1
+            self._add_to_counters(deltas)
+        return [items[position] for position in sorted(failed)]
+    
+    def _run_batch_writes(self, requests: List[Dict[str, Any]], max_workers: int,
+                          max_retries: int, counted: bool = False) -> BatchWriteResult:
+        """Send write requests in concurrent chunks of 25
+        
+        With ``counted`` each chunk also adjusts the maintained counters.
+        ``failed`` holds (position in ``requests``, error) pairs for the
+        caller to shape.
+        """
+        result = BatchWriteResult()
+        if not requests:
+            return result
+        
+        write_chunk = self._counted_write_chunk if counted else self._batch_write_chunk
+        starts = range(0, len(requests), BATCH_WRITE_LIMIT)
+        chunks = [requests[start:start + BATCH_WRITE_LIMIT] for start in starts]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            for start, chunk, failures in zip(starts, chunks, executor.map(bind_route(lambda chunk: write_chunk(chunk, max_retries)), chunks)):
+                result.succeeded += len(chunk) - len(failures)
+                result.failed.extend((start + position, error) for position, error in failures)
+        
+        return result
+    
+    def _counted_write_chunk(self, requests: List[Dict[str, Any]], max_retries: int) -> List[tuple]:
+        """Write up to 25 requests, then apply one counter delta per counter
+        
+        BatchWriteItem can't say which puts were new or which deletes removed
+        an item, so the chunk's keys (and owners) are read first. A write that
+        races the read may be miscounted until rebuild_counters().
+        """
+        keys = [
+            request['DeleteRequest']['Key'] if 'DeleteRequest' in request
+            else self._key_of(request['PutRequest']['Item'])
+            for request in requests
+        ]
+        projection = {'ConsistentRead': True}
+        self._apply_projection(projection, self._key_names() + ['user_id'])
+        try:
+            existing = {
+                self._key_signature(self._key_of(item)): item
+                for item in self._batch_get_chunk([key for key in keys if key], max_retries, projection)
+            }
+        except Exception as e:
+            return [(position, str(e)) for position in range(len(requests))]
+        
+        failures = self._batch_write_chunk(requests, max_retries)
+        failed = {position for position, _ in failures}
+        deltas: Dict[str, int] = {}
+        for position, (request, key) in enumerate(zip(requests, keys)):
+            if position in failed or key is None:
+                continue
+            old = existing.get(self._key_signature(key))
+            if 'PutRequest' in request and old is None:
+                item, delta = request['PutRequest']['Item'], 1
+            elif 'DeleteRequest' in request and old is not None:
+                item, delta = old, -1
+            else:
+                continue
+            for counter_id in self._counter_ids(item):
+                deltas[counter_id] = deltas.get(counter_id, 0) + delta
+        self._add_to_counters({counter_id: delta for counter_id, delta in deltas.items() if delta})
+        return failures
+    
+    def _batch_write_chunk(self, requests: List[Dict[str, Any]], max_retries: int) -> List[tuple]:
+        """Send up to 25 write requests, retrying UnprocessedItems with backoff
+        
+        Returns (position, error) pairs for the requests that did not
+        succeed. UnprocessedItems are new copies of the requests, so they are
+        matched back by key, which is unique within a BatchWriteItem call.
+        """
+        client = self.table.meta.client
+        positions = {self._request_signature(request): position for position, request in enumerate(requests)}
+        pending = requests
+        attempt = 0
+        
+        while pending:
+            try:
+                response = client.batch_write_item(RequestItems={self.table_name: pending})
+            except ClientError as e:
+                return [(positions[self._request_signature(request)], str(e)) for request in pending]
+            
+            pending = (response.get('UnprocessedItems') or {}).get(self.table_name, [])
+            
+            if pending:
+                if attempt >= max_retries:
+                    return [(positions[self._request_signature(request)], f"Unprocessed after {max_retries} retries")
+                            for request in pending]
+                _backoff(attempt)
+                attempt += 1
+        
+        return []
+    
+    def _request_signature(self, request: Dict[str, Any]) -> tuple:
+        """Signature of the key a BatchWriteItem request writes"""
+        if 'DeleteRequest' in request:
+            return self._key_signature(request['DeleteRequest']['Key'])
+        return self._key_signature(self._key_of(request['PutRequest']['Item']) or {})
+    
     def count(self, filter_expression: Optional[str] = None, 
               expression_values: Optional[Dict[str, Any]] = None) -> int:
-        """Count records with optional filtering"""
-        scan_params = {
-            'TableName': self.table_name,
-            'Select': 'COUNT'
-        }
+        """Exact count with optional filtering
+        
+        Reads every page of the table; prefer item_count() or
+        approximate_count() where a maintained or estimated count will do.
+        """
+        scan_params = {'Select': 'COUNT'}
         
         if filter_expression:
             scan_params['FilterExpression'] = filter_expression
@@ -353,12 +1356,97 @@ class DynamoDBORM:
         if expression_values:
             scan_params['ExpressionAttributeValues'] = expression_values
         
+        total = 0
         try:
-            response = self.table.scan(**scan_params)
-            return response.get('Count', 0)
+            while True:
+                response = self.table.scan(**scan_params)
+                total += response.get('Count', 0)
+                if not response.get('LastEvaluatedKey'):
+                    return total
+                scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
         except ClientError as e:
             raise Exception(f"Failed to count records: {e}")
     
+    def approximate_count(self) -> int:
+        """DescribeTable ItemCount, which DynamoDB refreshes about every six hours"""
+        try:
+            response = self.table.meta.client.describe_table(TableName=self.table_name)
+            return int(response['Table'].get('ItemCount', 0))
+        except ClientError as e:
+            raise Exception(f"Failed to describe table: {e}")
+    
+    def counter_id(self, user_id: Optional[str] = None) -> str:
+        """Key of this table's item counter, or of one user's items in it"""
+        return f"{self.table_type}#user#{user_id}" if user_id else self.table_type
+    
+    def item_count(self, user_id: Optional[str] = None) -> Optional[int]:
+        """Maintained item count, or None if the counter was never written"""
+        try:
+            response = self._counter_table().get_item(Key={'counter_id': self.counter_id(user_id)})
+        except ClientError as e:
+            raise Exception(f"Failed to read counter: {e}")
+        item = response.get('Item')
+        return int(item.get('count', 0)) if item else None
+    
+    def rebuild_counters(self) -> int:
+        """Recount the table with a parallel scan and overwrite its counters
+        
+        Backfills counters for existing data and repairs drift. Writes made
+        while the scan runs may be missed. Returns the table's item count.
+        """
+        per_user: Dict[str, int] = {}
+        total = 0
+        for item in self.parallel_scan(fields=['user_id']):
+            total += 1
+            user_id = getattr(item, 'user_id', None)
+            if user_id:
+                per_user[user_id] = per_user.get(user_id, 0) + 1
+        
+        counts = {self.counter_id(): total}
+        counts.update({self.counter_id(user_id): n for user_id, n in per_user.items()})
+        now = datetime.utcnow().isoformat()
+        try:
+            with self._counter_table().batch_writer() as batch:
+                for counter_id, n in counts.items():
+                    batch.put_item(Item={'counter_id': counter_id, 'count': n, 'updated_at': now})
+        except ClientError as e:
+            raise Exception(f"Failed to rebuild counters: {e}")
+        return total
+    
+    def _counter_table(self):
+        """Table holding the counters, opened on first use"""
+        if self._counters is None:
+            name = aws_config.get_table_name(COUNTERS_TABLE)
+            self._counters = InstrumentedTable(self.backend.table(name), name)
+        return self._counters
+    
+    def _counter_ids(self, item: Dict[str, Any]) -> List[str]:
+        """Counters an item counts towards: the table's and its owner's"""
+        counter_ids = [self.counter_id()]
+        if item.get('user_id'):
+            counter_ids.append(self.counter_id(item['user_id']))
+        return counter_ids
+    
+    def _adjust_counters(self, item: Dict[str, Any], delta: int):
+        """Add delta to the table's counter and to the owning user's counter"""
+        if self.counted:
+            self._add_to_counters({counter_id: delta for counter_id in self._counter_ids(item)})
+    
+    def _add_to_counters(self, deltas: Dict[str, int]):
+        """ADD each delta to its counter"""
+        now = datetime.utcnow().isoformat()
+        for counter_id, delta in deltas.items():
+            try:
+                self._counter_table().update_item(
+                    Key={'counter_id': counter_id},
+                    UpdateExpression="ADD #count :delta SET updated_at = :now",
+                    ExpressionAttributeNames={'#count': 'count'},
+                    ExpressionAttributeValues={':delta': delta, ':now': now}
+                )
+            except ClientError as e:
+                # The write itself succeeded; a missed count is repaired by rebuild_counters()
+                print(f"WARNING ORM: Failed to update counter {counter_id}: {e}")
+    
     def exists(self, id: str) -> bool:
         """Check if record exists"""
         try:
@@ -370,6 +1458,143 @@ class DynamoDBORM:
         except ClientError as e:
             raise Exception(f"Failed to check if record exists: {e}")
 
+# Transactions
+class UnitOfWork:
+    """Writes to one or more tables, committed together with TransactWriteItems
+    
+    Stage writes with put(), update(), delete() and check(), then commit().
+    Used as a context manager it commits when the block exits cleanly and
+    discards the staged writes on an exception. Up to 100 writes commit as
+    one atomic request. Larger units are split into several transactions,
+    each atomic on its own, so the commit as a whole is not: if a later
+    transaction fails, the earlier ones stay applied. DynamoDB rejects two
+    writes to the same item in one transaction.
+    
+    On counted tables puts must create new items and deletes must remove
+    existing ones (conditions are added for this), so the maintained counts
+    can be adjusted after the commit.
+    """
+    
+    def __init__(self):
+        self._writes: List[Dict[str, Any]] = []
+        self._effects: List[Tuple['DynamoDBORM', Dict[str, Any], Dict[str, Any], int]] = []
+    
+    def __len__(self) -> int:
+        return len(self._writes)
+    
+    def __enter__(self) -> 'UnitOfWork':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        return False
+    
+    def put(self, handle: 'DynamoDBORM', item: Dict[str, Any]) -> 'UnitOfWork':
+        """Stage a put of an item as-is"""
+        params = {'TableName': handle.table_name, 'Item': handle._pack(item)}
+        key = {attr: item[attr] for attr in handle._key_names() if attr in item}
+        delta = 0
+        if handle.counted and handle.key_sources:
+            params['ConditionExpression'] = "attribute_not_exists(#pk)"
+            params['ExpressionAttributeNames'] = {'#pk': handle.key_sources[0][1]}
+            delta = 1
+        self._stage('Put', params, handle, key, item, delta)
+        return self
+    
+    def update(self, handle: 'DynamoDBORM', key: Dict[str, Any],
+               set_fields: Optional[Dict[str, Any]] = None,
+               add: Optional[Dict[str, Union[int, float, Decimal]]] = None,
+               defaults: Optional[Dict[str, Any]] = None,
+               condition_expression: Optional[str] = None,
+               condition_names: Optional[Dict[str, str]] = None,
+               condition_values: Optional[Dict[str, Any]] = None) -> 'UnitOfWork':
+        """Stage an update, with the same arguments as DynamoDBORM.atomic_update
+        
+        As there, a missing item is created, with ``created_at`` defaulting
+        to now. Updates don't change maintained counts.
+        """
+        defaults = {'created_at': datetime.utcnow().isoformat(), **(defaults or {})}
+        params = handle._update_params(key, set_fields, add, defaults, condition_expression,
+                                       condition_names, condition_values)
+        self._stage('Update', {'TableName': handle.table_name, **params}, handle, key, {}, 0)
+        return self
+    
+    def delete(self, handle: 'DynamoDBORM', key: Dict[str, Any],
+               condition_expression: Optional[str] = None,
+               condition_names: Optional[Dict[str, str]] = None,
+               condition_values: Optional[Dict[str, Any]] = None,
+               user_id: Optional[str] = None) -> 'UnitOfWork':
+        """Stage a delete by key
+        
+        On counted tables pass the item's ``user_id`` to adjust its owner's
+        count as well as the table's.
+        """
+        params = {'TableName': handle.table_name, 'Key': key}
+        names = dict(condition_names or {})
+        expressions = [condition_expression] if condition_expression else []
+        delta = 0
+        if handle.counted and handle.key_sources:
+            names['#pk'] = handle.key_sources[0][1]
+            expressions.append("attribute_exists(#pk)")
+            delta = -1
+        self._add_condition(params, expressions, names, condition_values)
+        self._stage('Delete', params, handle, key, {'user_id': user_id} if user_id else {}, delta)
+        return self
+    
+    def check(self, handle: 'DynamoDBORM', key: Dict[str, Any], condition_expression: str,
+              condition_names: Optional[Dict[str, str]] = None,
+              condition_values: Optional[Dict[str, Any]] = None) -> 'UnitOfWork':
+        """Require a condition on an item that is not written"""
+        params = {'TableName': handle.table_name, 'Key': key}
+        self._add_condition(params, [condition_expression], dict(condition_names or {}), condition_values)
+        self._stage('ConditionCheck', params, handle, key, {}, 0)
+        return self
+    
+    def commit(self):
+        """Send the staged writes; raises TransactionCancelledError if a condition fails"""
+        writes, effects = self._writes, self._effects
+        self._writes, self._effects = [], []
+        if not writes:
+            return
+        
+        client = effects[0][0].table.meta.client
+        for start in range(0, len(writes), TRANSACT_WRITE_LIMIT):
+            chunk = writes[start:start + TRANSACT_WRITE_LIMIT]
+            chunk_effects = effects[start:start + TRANSACT_WRITE_LIMIT]
+            try:
+                client.transact_write_items(TransactItems=chunk, ClientRequestToken=str(uuid.uuid4()))
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'TransactionCanceledException':
+                    reasons = e.response.get('CancellationReasons', [])
+                    raise TransactionCancelledError(f"Transaction cancelled: {e}", reasons, offset=start)
+                raise Exception(f"Failed to commit transaction: {e}")
+            finally:
+                for handle, key, _, _ in chunk_effects:
+                    handle._invalidate(key)
+            
+            # Counted as soon as they're applied, in case a later transaction fails
+            for handle, _, item, delta in chunk_effects:
+                if delta:
+                    handle._adjust_counters(item, delta)
+    
+    def _stage(self, action: str, params: Dict[str, Any], handle: 'DynamoDBORM',
+               key: Dict[str, Any], item: Dict[str, Any], delta: int):
+        self._writes.append({action: params})
+        self._effects.append((handle, key, item, delta))
+    
+    @staticmethod
+    def _add_condition(params: Dict[str, Any], expressions: List[str],
+                       names: Dict[str, str], values: Optional[Dict[str, Any]]):
+        if not expressions:
+            return
+        params['ConditionExpression'] = " AND ".join(f"({expression})" for expression in expressions) \
+            if len(expressions) > 1 else expressions[0]
+        if names:
+            params['ExpressionAttributeNames'] = names
+        if values:
+            params['ExpressionAttributeValues'] = {k: _to_dynamo_number(v) for k, v in values.items()}
+
 # Model Definitions
 @dataclass
 class User(BaseModel):
@@ -434,7 +1659,7 @@ class Module(BaseModel):
     user_id: str
     name: str
     module_type: str
-    content: Dict[str, Any]
+    content: Dict[str, Any] = field(metadata=OFFLOADED)
     is_public: bool
     tags: List[str]
     created_at: str
@@ -491,59 +1716,188 @@ class ModuleSession(BaseModel):
     progress: Decimal = Decimal('0.0')  # 0.0 to 1.0
     current_step: int = 1
     total_steps: int = 1
-    interactions: Optional[str] = None  # JSON string storing array of interaction events
+    interactions: Optional[str] = field(default=None, metadata=COMPRESSED)  # Legacy JSON array; events now live in session-interactions
+    interaction_count: int = 0
     created_at: str = ""
     updated_at: str = ""
 
+@dataclass
+class SessionInteraction(BaseModel):
+    """Single widget interaction event within a module session"""
+    session_id: str
+    event_key: str  # "<timestamp>#<suffix>", sorts events by time
+    widget_id: str
+    widget_type: str
+    action: str
+    timestamp: str
+    data: Optional[Dict[str, Any]] = None
+
 # ORM Instances
+@dataclass(frozen=True)
+class TableSpec:
+    """How PrismoORM builds the handle for one table"""
+    table_type: str
+    model_class: Type[BaseModel] = BaseModel
+    cached: bool = False  # Use the read-through entity cache
+    counted: bool = False  # Maintain item counters on create and delete
+    buffered: bool = False  # Batch create_deferred() writes in a write-behind buffer
+
+# Every table handle on PrismoORM, keyed by attribute name
+TABLE_REGISTRY: Dict[str, TableSpec] = {
+    # Core models
+    "users": TableSpec("users", User, cached=True, counted=True),
+    "labs": TableSpec("labs", Lab, counted=True),
+    "widgets": TableSpec("widgets", Widget, counted=True),
+    "collections": TableSpec("collections", Collection, counted=True),
+    "modules": TableSpec("modules", Module, counted=True),
+    "attempts": TableSpec("attempts", Attempt, counted=True),
+    "mastery": TableSpec("mastery", Mastery, counted=True),
+    "feedback": TableSpec("feedback", Feedback, counted=True),
+    "module_sessions": TableSpec("module-sessions", ModuleSession, cached=True),
+    "session_interactions": TableSpec("session-interactions", SessionInteraction),
+
+    # Analytics models
+    "widget_selection": TableSpec("widget-selection", buffered=True),
+    "feedback_generated": TableSpec("feedback-generated", buffered=True),
+    "learning_sessions": TableSpec("learning-sessions"),
+    "skill_progress": TableSpec("skill-progress"),
+    "widget_performance": TableSpec("widget-performance"),
+    "widget_usage": TableSpec("widget-usage"),
+
+    # Content models
+    "skill_tags": TableSpec("skill-tags"),
+    "difficulty_levels": TableSpec("difficulty-levels"),
+    "learning_paths": TableSpec("learning-paths"),
+    "educator_content": TableSpec("educator-content"),
+
+    # Advanced models
+    "lab_templates": TableSpec("lab-templates"),
+    "widget_registry": TableSpec("widget-registry"),
+    "lab_steps": TableSpec("lab-steps"),
+    "hints": TableSpec("hints"),
+    "user_preferences": TableSpec("user-preferences"),
+    "notifications": TableSpec("notifications", counted=True),
+    "streaks": TableSpec("streaks", counted=True),
+    "badges": TableSpec("badges", counted=True),
+    "version_history": TableSpec("version-history"),
+    "coach_chat": TableSpec("coach-chat"),
+    "walkthrough_sessions": TableSpec("walkthrough-sessions"),
+    "micro_assessments": TableSpec("micro-assessments"),
+    "sandbox_sessions": TableSpec("sandbox-sessions"),
+    "review_sessions": TableSpec("review-sessions"),
+    "accessibility_settings": TableSpec("accessibility-settings"),
+    "api_usage": TableSpec("api-usage", buffered=True),
+    "error_logs": TableSpec("error-logs", counted=True, buffered=True),
+    "system_config": TableSpec("system-config", counted=True),
+
+    # System models
+    "counters": TableSpec(COUNTERS_TABLE),
+}
+
 class PrismoORM:
-    """Main ORM class with all model instances"""
+    """Main ORM class with all model instances
+    
+    Table handles are built on first access from TABLE_REGISTRY, so
+    importing the ORM does no per-table work.
+    """
     
     def __init__(self):
         self.table_prefix = aws_config.dynamodb_table_prefix
+        self._tables: Dict[str, DynamoDBORM] = {}
+        self._tables_lock = threading.Lock()
+    
+    def __getattr__(self, name: str) -> DynamoDBORM:
+        # Only reached when normal lookup fails, i.e. for table handles
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.table(name)
+    
+    def __dir__(self) -> List[str]:
+        return sorted(set(super().__dir__()) | set(TABLE_REGISTRY))
+    
+    def table(self, name: str) -> DynamoDBORM:
+        """Get the handle for a declared table, creating it on first use"""
+        instance = self._tables.get(name)
+        if instance is not None:
+            return instance
         
-        # Core models
-        self.users = DynamoDBORM("users", User)
-        self.labs = DynamoDBORM("labs", Lab)
-        self.widgets = DynamoDBORM("widgets", Widget)
-        self.collections = DynamoDBORM("collections", Collection)
-        self.modules = DynamoDBORM("modules", Module)
-        self.attempts = DynamoDBORM("attempts", Attempt)
-        self.mastery = DynamoDBORM("mastery", Mastery)
-        self.feedback = DynamoDBORM("feedback", Feedback)
-        self.module_sessions = DynamoDBORM("module-sessions", ModuleSession)
-        
-        # Analytics models
-        self.widget_selection = DynamoDBORM("widget-selection", BaseModel)
-        self.feedback_generated = DynamoDBORM("feedback-generated", BaseModel)
-        self.learning_sessions = DynamoDBORM("learning-sessions", BaseModel)
-        self.skill_progress = DynamoDBORM("skill-progress", BaseModel)
-        
-        # Content models
-        self.skill_tags = DynamoDBORM("skill-tags", BaseModel)
-        self.difficulty_levels = DynamoDBORM("difficulty-levels", BaseModel)
-        self.learning_paths = DynamoDBORM("learning-paths", BaseModel)
-        self.educator_content = DynamoDBORM("educator-content", BaseModel)
-        
-        # Advanced models
-        self.lab_templates = DynamoDBORM("lab-templates", BaseModel)
-        self.widget_registry = DynamoDBORM("widget-registry", BaseModel)
-        self.lab_steps = DynamoDBORM("lab-steps", BaseModel)
-        self.hints = DynamoDBORM("hints", BaseModel)
-        self.user_preferences = DynamoDBORM("user-preferences", BaseModel)
-        self.notifications = DynamoDBORM("notifications", BaseModel)
-        self.streaks = DynamoDBORM("streaks", BaseModel)
-        self.badges = DynamoDBORM("badges", BaseModel)
-        self.version_history = DynamoDBORM("version-history", BaseModel)
-        self.coach_chat = DynamoDBORM("coach-chat", BaseModel)
-        self.walkthrough_sessions = DynamoDBORM("walkthrough-sessions", BaseModel)
-        self.micro_assessments = DynamoDBORM("micro-assessments", BaseModel)
-        self.sandbox_sessions = DynamoDBORM("sandbox-sessions", BaseModel)
-        self.review_sessions = DynamoDBORM("review-sessions", BaseModel)
-        self.accessibility_settings = DynamoDBORM("accessibility-settings", BaseModel)
-        self.api_usage = DynamoDBORM("api-usage", BaseModel)
-        self.error_logs = DynamoDBORM("error-logs", BaseModel)
-        self.system_config = DynamoDBORM("system-config", BaseModel)
+        spec = TABLE_REGISTRY.get(name)
+        if spec is None:
+            raise UnknownTableError(
+                f"Table '{name}' is not declared in TABLE_REGISTRY; "
+                f"add a TableSpec for it (and a schema in app/table_schemas.py)"
+            )
+        
+        with self._tables_lock:
+            instance = self._tables.get(name)
+            if instance is None:
+                cache_options = {}
+                if spec.cached:
+                    cache_options = {'cache_size': aws_config.entity_cache_size,
+                                     'cache_ttl': aws_config.entity_cache_ttl}
+                instance = DynamoDBORM(spec.table_type, spec.model_class, counted=spec.counted,
+                                       buffered=spec.buffered, **cache_options)
+                self._tables[name] = instance
+        return instance
+    
+    def transaction(self) -> UnitOfWork:
+        """New unit of work; use as ``with orm.transaction() as uow:``"""
+        return UnitOfWork()
+    
+    def item_counts(self, names: List[str], user_id: Optional[str] = None,
+                    mode: str = 'counter') -> Dict[str, Any]:
+        """Item counts for several tables, without scanning in the default mode
+        
+        ``counter`` reads the maintained counters in one BatchGetItem and
+        falls back to ``approximate`` (DescribeTable) for tables whose counter
+        was never written; ``exact`` scans. With ``user_id`` only that user's
+        items are counted, which ``approximate`` can't do.
+        """
+        handles = {name: self.table(name) for name in names}
+        counts: Dict[str, Any] = {}
+        
+        if mode == 'counter':
+            keys = [{'counter_id': handle.counter_id(user_id)} for handle in handles.values()]
+            if user_id:
+                keys += [{'counter_id': handle.counter_id()} for handle in handles.values()]
+            stored = {
+                item.counter_id: int(item.count)
+                for item in self.counters.batch_get(keys)
+            }
+            for name, handle in handles.items():
+                if handle.counter_id(user_id) in stored:
+                    counts[name] = stored[handle.counter_id(user_id)]
+                elif user_id and handle.counter_id() in stored:
+                    counts[name] = 0  # Table is counted; this user has no items
+                elif not user_id:
+                    counts[name] = self._safe_count(handle.approximate_count)
+                else:
+                    counts[name] = None
+            return counts
+        
+        for name, handle in handles.items():
+            if mode == 'approximate':
+                counts[name] = None if user_id else self._safe_count(handle.approximate_count)
+            elif user_id:
+                counts[name] = self._safe_count(lambda: handle.count("user_id = :user_id", {":user_id": user_id}))
+            else:
+                counts[name] = self._safe_count(handle.count)
+        return counts
+    
+    @staticmethod
+    def _safe_count(count: Callable[[], int]) -> Any:
+        try:
+            return count()
+        except Exception as e:
+            return f"Error: {e}"
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Read-through cache counters for every table that has a cache"""
+        return {
+            instance.table_name: instance.cache.stats()
+            for instance in list(self._tables.values())
+            if instance.cache is not None
+        }
 
 # Global ORM instance
 orm = PrismoORM()
@@ -567,11 +1921,10 @@ def get_labs_by_user(user_id: str) -> List[Lab]:
 
 def get_public_labs() -> List[Lab]:
     """Get public labs"""
-    result = orm.labs.scan(
+    return list(orm.labs.iter_scan(
         filter_expression="is_public = :is_public",
         expression_values={":is_public": True}
-    )
-    return result.items
+    ))
 
 def get_widgets_by_user(user_id: str) -> List[Widget]:
     """Get widgets by user ID"""
@@ -583,11 +1936,10 @@ def get_widgets_by_user(user_id: str) -> List[Widget]:
 
 def get_public_widgets() -> List[Widget]:
     """Get public widgets"""
-    result = orm.widgets.scan(
+    return list(orm.widgets.iter_scan(
         filter_expression="is_public = :is_public",
         expression_values={":is_public": True}
-    )
-    return result.items
+    ))
 
 def get_collections_by_user(user_id: str) -> List[Collection]:
     """Get collections by user ID"""
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cursor Pagination
+
+List routes return ``next_cursor``, an opaque token wrapping DynamoDB's
+LastEvaluatedKey, and accept it back as ``?cursor=`` to continue from
+where the previous page stopped. Cursors are HMAC-signed with SECRET_KEY
+and bound to the caller, the route, its path arguments and its filters, so
+a client can't forge a start key or replay a cursor against another query
+or another user's data. ``load_cursor`` must run after ``load_identity``.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional
+
+from flask import current_app, g, jsonify, request
+
+from app.identity import current_user_id
+from app.orm import PaginationParams, QueryResult
+from app.storage.codec import decode_value, encode_value
+
+# Query args that don't change which items a page holds
+PAGING_ARGS = {'cursor', 'limit'}
+
+# Cursors older than this are rejected (seconds)
+CURSOR_TTL = 24 * 60 * 60
+
+
+class InvalidCursorError(ValueError):
+    """A cursor was malformed, tampered with, expired or used on another query"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _signature(payload: str, scope: str) -> str:
+    secret = current_app.config['SECRET_KEY'].encode('utf-8')
+    digest = hmac.new(secret, f"{scope}|{payload}".encode('utf-8'), hashlib.sha256).digest()
+    return _b64encode(digest[:18])
+
+
+def request_scope() -> str:
+    """What a cursor is bound to: caller, endpoint, path arguments and filter args"""
+    filters = sorted((k, v) for k, v in request.args.items(multi=True) if k not in PAGING_ARGS)
+    view_args = sorted((request.view_args or {}).items())
+    return json.dumps([current_user_id(), request.endpoint, view_args, filters], separators=(',', ':'))
+
+
+def encode_cursor(last_key: Optional[Dict[str, Any]], scope: str) -> Optional[str]:
+    """Opaque signed cursor for a LastEvaluatedKey, or None on the last page"""
+    if not last_key:
+        return None
+    body = json.dumps({'k': encode_value(last_key), 'e': int(time.time()) + CURSOR_TTL},
+                      separators=(',', ':'))
+    payload = _b64encode(body.encode('utf-8'))
+    return f"{payload}.{_signature(payload, scope)}"
+
+
+def decode_cursor(cursor: str, scope: str) -> Dict[str, Any]:
+    """LastEvaluatedKey from a cursor made by encode_cursor for the same scope"""
+    try:
+        payload, signature = cursor.split('.', 1)
+        if not hmac.compare_digest(signature, _signature(payload, scope)):
+            raise InvalidCursorError("Cursor signature does not match this query")
+        body = json.loads(_b64decode(payload))
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError("Malformed cursor")
+
+    if body.get('e', 0) < time.time():
+        raise InvalidCursorError("Cursor has expired")
+    return decode_value(body['k'])
+
+
+def load_cursor():
+    """before_request hook: validate ?cursor= once, before any route runs"""
+    g.cursor_key = None
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return None
+    try:
+        g.cursor_key = decode_cursor(cursor, request_scope())
+    except InvalidCursorError as e:
+        return jsonify({"error": f"Invalid cursor: {e}"}), 400
+    return None
+
+
+def page_params(limit: int, max_limit: int = 500) -> PaginationParams:
+    """PaginationParams for this request, starting after its cursor if any"""
+    return PaginationParams(
+        limit=max(1, min(limit, max_limit)),
+        last_evaluated_key=getattr(g, 'cursor_key', None)
+    )
+
+
+def next_cursor(result: QueryResult) -> Optional[str]:
+    """Cursor for the page after ``result`` in this request's scope"""
+    return encode_cursor(result.last_evaluated_key, request_scope())
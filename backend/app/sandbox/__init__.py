@@ -0,0 +1,29 @@
+"""
+Code Execution Sandbox
+
+PythonWorkerPool (pool) runs /claude/execute-code Python programs in
+pre-forked workers started from a warm template process (python_worker),
+under CPU-time, memory and output rlimits. get_python_pool() returns the
+process-wide pool configured by the PYTHON_POOL_* settings, or None when
+it is disabled or the platform can't run it.
+
+The test harnesses (harness) run all of a submission's test cases from one
+process with a single compile, forking per test.
+"""
+
+from .harness import TestRun, run_cpp_tests, run_python_tests
+from .pool import (
+    ExecutionTimeout, PoolUnavailableError, PythonWorkerPool, get_python_pool, pool_stats, pool_supported
+)
+
+__all__ = [
+    'ExecutionTimeout',
+    'PoolUnavailableError',
+    'PythonWorkerPool',
+    'TestRun',
+    'get_python_pool',
+    'pool_stats',
+    'pool_supported',
+    'run_cpp_tests',
+    'run_python_tests',
+]
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test Harnesses
+
+A test case's input is appended to the submission, and run_test_cases used
+to compile and start every such test program from scratch. The harnesses
+build the submission once and run all the tests from one process, each in
+a forked child with its own timeout, captured output and timing:
+
+- Python: python_harness runs the submission once, in a pool worker or a
+  python3 process, and forks per test to run the appended input.
+- C++: when every input defines its own main() and the submission doesn't,
+  the submission and all inputs compile as one program, each input's main
+  renamed, under a driver main that forks per test.
+
+A harness returns None when a submission doesn't fit it or fails to build;
+the caller then runs each test program separately, as before.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .pool import ExecutionTimeout, PoolUnavailableError, get_python_pool
+
+HARNESS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python_harness.py')
+
+# Bound on the JSON a Python harness prints, split between its tests' output
+PYTHON_RESULTS_BYTES = 512 * 1024
+
+MAIN_PATTERN = re.compile(r'\bmain\s*\(')
+
+CPP_DRIVER = r'''
+#include <chrono>
+#include <csignal>
+#include <cstdio>
+#include <cstdlib>
+#include <iostream>
+#include <string>
+#include <fcntl.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+static int prismo_call(int (*test)()) { return test(); }
+
+static int prismo_call(int (*test)(int, char**)) {
+    static char name[] = "program";
+    static char* argv[] = {name, nullptr};
+    return test(1, argv);
+}
+
+static void prismo_run(int index, int (*test)(), long timeout_ms, const std::string& dir, std::FILE* results) {
+    std::string path = dir + "/" + std::to_string(index);
+    std::cout.flush();
+    std::fflush(nullptr);
+    auto start = std::chrono::steady_clock::now();
+    pid_t pid = fork();
+    if (pid == 0) {
+        int out = open((path + ".out").c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0600);
+        int err = open((path + ".err").c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0600);
+        dup2(out, 1);
+        dup2(err, 2);
+        close(out);
+        close(err);
+        itimerval timer{};
+        timer.it_value.tv_sec = timeout_ms / 1000;
+        timer.it_value.tv_usec = (timeout_ms % 1000) * 1000;
+        setitimer(ITIMER_REAL, &timer, nullptr);
+        std::exit(test());
+    }
+    int status = 0;
+    waitpid(pid, &status, 0);
+    auto elapsed = std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now() - start);
+    int timed_out = WIFSIGNALED(status) && WTERMSIG(status) == SIGALRM;
+    int code = WIFEXITED(status) ? WEXITSTATUS(status) : -WTERMSIG(status);
+    std::fprintf(results, "%d %d %d %lld\n", index, code, timed_out, (long long) elapsed.count());
+}
+
+int main(int argc, char** argv) {
+    long timeout_ms = std::atol(argv[1]);
+    std::string dir = argv[2];
+    std::FILE* results = std::fopen((dir + "/results").c_str(), "w");
+'''
+
+
+@dataclass
+class TestRun:
+    """Outcome of one test program, as execute_* functions report it"""
+    output: Optional[str]
+    error: Optional[str]
+    time_ms: float = 0.0
+
+
+def _timeout_error(timeout: float) -> str:
+    return f"Error: Code execution timed out ({timeout:g} second limit)"
+
+
+def _to_runs(results: list, timeout: float) -> List[TestRun]:
+    runs = []
+    for result in results:
+        if result['timedOut']:
+            runs.append(TestRun(None, _timeout_error(timeout), result['time']))
+        else:
+            error = result['stderr'] if result['returncode'] != 0 else None
+            runs.append(TestRun(result['stdout'], error, result['time']))
+    return runs
+
+
+def run_python_tests(code: str, inputs: List[str], timeout: float = 5.0) -> Optional[List[TestRun]]:
+    """Run every input against a Python submission in one harness process"""
+    if not inputs:
+        return []
+
+    with open(HARNESS_SCRIPT, 'r', encoding='utf-8') as f:
+        harness = f.read()
+    limit = max(1024, PYTHON_RESULTS_BYTES // (4 * len(inputs) + 2))
+    program = f"{harness}\nrun_tests({code!r}, {inputs!r}, {timeout!r}, {limit!r})\n"
+    total_timeout = timeout * (len(inputs) + 1) + 2
+
+    try:
+        stdout, returncode = _run_python(program, total_timeout)
+        if returncode != 0:
+            return None
+        results = json.loads(stdout)
+    except (ExecutionTimeout, subprocess.TimeoutExpired, OSError, ValueError) as e:
+        print(f"WARNING: Python test harness failed, running tests separately: {e}")
+        return None
+    return _to_runs(results, timeout)
+
+
+def _run_python(program: str, timeout: float):
+    pool = get_python_pool()
+    if pool is not None:
+        try:
+            stdout, _, returncode = pool.run(program, timeout=timeout)
+            return stdout, returncode
+        except PoolUnavailableError as e:
+            print(f"WARNING: Python worker pool unavailable, using a subprocess: {e}")
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(program)
+        temp_file = f.name
+    try:
+        result = subprocess.run(['python3', temp_file], capture_output=True, text=True, timeout=timeout)
+        return result.stdout, result.returncode
+    finally:
+        os.unlink(temp_file)
+
+
+def run_cpp_tests(code: str, inputs: List[str], timeout: float = 5.0) -> Optional[List[TestRun]]:
+    """Run every input against a C++ submission with one compile, or None if they don't fit"""
+    if not inputs or MAIN_PATTERN.search(code) or not all(MAIN_PATTERN.search(i) for i in inputs):
+        return None
+
+    parts = [code]
+    for index, test_input in enumerate(inputs):
+        parts += [f"#define main prismo_test_{index}", test_input, "#undef main"]
+    parts.append(CPP_DRIVER)
+    parts += [
+        f"    prismo_run({index}, [] {{ return prismo_call(prismo_test_{index}); }}, timeout_ms, dir, results);"
+        for index in range(len(inputs))
+    ]
+    parts.append("    std::fclose(results);\n    return 0;\n}\n")
+
+    temp_dir = tempfile.mkdtemp(prefix='prismo-cpp-')
+    try:
+        source_file = os.path.join(temp_dir, 'harness.cpp')
+        executable_file = os.path.join(temp_dir, 'harness')
+        with open(source_file, 'w') as f:
+            f.write('\n'.join(parts))
+
+        # -Werror=return-type: a renamed main has no implicit return 0, so those run separately
+        compile_result = subprocess.run(
+            ['g++', '-std=c++17', '-Werror=return-type', source_file, '-o', executable_file],
+            capture_output=True, text=True, timeout=10
+        )
+        if compile_result.returncode != 0:
+            return None
+        run_result = subprocess.run(
+            [executable_file, str(int(timeout * 1000)), temp_dir],
+            capture_output=True, text=True, timeout=timeout * len(inputs) + 5
+        )
+        if run_result.returncode != 0:
+            return None
+
+        runs = []
+        with open(os.path.join(temp_dir, 'results')) as f:
+            for line in f:
+                index, returncode, timed_out, micros = (int(value) for value in line.split())
+                if timed_out:
+                    runs.append(TestRun(None, _timeout_error(timeout), micros / 1000))
+                    continue
+                with open(os.path.join(temp_dir, f"{index}.out"), errors='replace') as out:
+                    output = out.read()
+                with open(os.path.join(temp_dir, f"{index}.err"), errors='replace') as err:
+                    error = err.read() if returncode != 0 else None
+                runs.append(TestRun(output, error, micros / 1000))
+        return runs if len(runs) == len(inputs) else None
+    except (subprocess.TimeoutExpired, OSError, ValueError) as e:
+        print(f"WARNING: C++ test harness failed, running tests separately: {e}")
+        return None
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Warm Python Worker Pool
+
+Starting ``python3`` for every /claude/execute-code run costs more than the
+typical student program. The pool starts one template process
+(python_worker.py) that has already loaded the interpreter and common
+modules, and keeps ``size`` workers forked from it waiting for code. A run
+takes an idle worker, sends the program over the worker's socket and reads
+back its output; a background thread forks replacements.
+
+Workers run programs under CPU-time, memory and output rlimits, in their
+own process group, and are killed when a run passes ``timeout``. After
+``max_jobs`` runs (1 by default, so every program gets a fresh process) a
+worker exits and is replaced. The template and workers get a minimal
+environment, so programs can't read the server's credentials.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from app.aws_config import aws_config
+
+from .python_worker import HEADER, recv_exact, recv_message, send_message
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python_worker.py')
+
+
+class PoolUnavailableError(Exception):
+    """The worker template or a worker could not be started"""
+
+
+class ExecutionTimeout(Exception):
+    """A program ran past the pool's timeout and was killed"""
+
+
+class _Worker:
+    __slots__ = ('pid', 'sock', 'jobs')
+
+    def __init__(self, pid: int, sock: socket.socket):
+        self.pid = pid
+        self.sock = sock
+        self.jobs = 0
+
+
+class PythonWorkerPool:
+    """Pre-forked, rlimited Python processes that run one program at a time"""
+
+    def __init__(self, size: int = 4, max_jobs: int = 1, timeout: float = 5.0, cpu_seconds: int = 5,
+                 memory_mb: int = 512, output_bytes: int = 1024 * 1024, python: str = 'python3'):
+        self.size = size
+        self.max_jobs = max(1, max_jobs)
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.output_bytes = output_bytes
+        self.python = python
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        # Guards the template process and its control socket
+        self._spawn_lock = threading.Lock()
+        self._template = None
+        self._control = None
+        self._scratch = None
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._stats = {'runs': 0, 'warm': 0, 'cold': 0, 'timeouts': 0, 'crashes': 0,
+                       'spawned': 0, 'template_starts': 0}
+
+    def start(self):
+        """Start forking workers in the background"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refill, name="python-pool", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def run(self, code: str, timeout: Optional[float] = None) -> Tuple[str, str, int]:
+        """Run a program; (stdout, stderr, returncode)"""
+        timeout = timeout or self.timeout
+        for _ in range(2):
+            worker, warm = self._acquire()
+            try:
+                send_message(worker.sock, {'code': code})
+                break
+            except OSError:
+                # The worker died while idle; take another one
+                self._discard(worker)
+        else:
+            raise PoolUnavailableError("No Python worker accepted the program")
+
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['warm' if warm else 'cold'] += 1
+
+        worker.sock.settimeout(timeout)
+        try:
+            reply = recv_message(worker.sock)
+        except socket.timeout:
+            self._discard(worker, kill=True)
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise ExecutionTimeout(f"Code execution timed out ({timeout:g} second limit)")
+        except (EOFError, OSError):
+            # Killed by an rlimit (or exited) before it could report
+            self._discard(worker)
+            with self._lock:
+                self._stats['crashes'] += 1
+            return '', "Program was terminated; it may have exceeded its CPU or memory limit", -signal.SIGKILL
+
+        worker.jobs += 1
+        if worker.jobs < self.max_jobs:
+            worker.sock.settimeout(None)
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            # The worker exits by itself after its last job
+            worker.sock.close()
+        return reply['stdout'], reply['stderr'], reply['returncode']
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'size': self.size, 'max_jobs': self.max_jobs, 'idle': len(self._idle), **self._stats}
+
+    def close(self):
+        """Stop all workers and the template"""
+        self._closed = True
+        self._wake.set()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for worker in idle:
+            # An idle worker exits when its socket closes
+            worker.sock.close()
+        with self._spawn_lock:
+            self._stop_template()
+
+    def _acquire(self) -> Tuple[_Worker, bool]:
+        with self._lock:
+            worker = self._idle.popleft() if self._idle else None
+        self.start()
+        if worker is not None:
+            return worker, True
+        return self._spawn(), False
+
+    def _discard(self, worker: _Worker, kill: bool = False):
+        if kill:
+            try:
+                os.killpg(worker.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        worker.sock.close()
+
+    def _refill(self):
+        while not self._closed:
+            self._wake.wait(timeout=30)
+            self._wake.clear()
+            while not self._closed:
+                with self._lock:
+                    if len(self._idle) >= self.size:
+                        break
+                try:
+                    worker = self._spawn()
+                except PoolUnavailableError as e:
+                    print(f"WARNING: Python worker pool can't start workers: {e}")
+                    time.sleep(5)
+                    break
+                with self._lock:
+                    self._idle.append(worker)
+
+    def _spawn(self) -> _Worker:
+        with self._spawn_lock:
+            if self._closed:
+                raise PoolUnavailableError("Python worker pool is closed")
+            error = None
+            for _ in range(2):
+                self._start_template()
+                ours, theirs = socket.socketpair()
+                try:
+                    socket.send_fds(self._control, [b'F'], [theirs.fileno()])
+                    pid, = HEADER.unpack(recv_exact(self._control, HEADER.size))
+                except (OSError, EOFError) as e:
+                    # The template died; start a new one and try again
+                    ours.close()
+                    self._stop_template()
+                    error = e
+                    continue
+                finally:
+                    theirs.close()
+                with self._lock:
+                    self._stats['spawned'] += 1
+                return _Worker(pid, ours)
+            raise PoolUnavailableError(f"Failed to fork a Python worker: {error}")
+
+    def _start_template(self):
+        if self._template is not None and self._template.poll() is None:
+            return
+        self._stop_template()
+        self._scratch = tempfile.mkdtemp(prefix='prismo-python-')
+        settings = {
+            'max_jobs': self.max_jobs,
+            'cpu_seconds': self.cpu_seconds,
+            'memory_mb': self.memory_mb,
+            'output_bytes': self.output_bytes,
+        }
+        env = {'PATH': os.environ.get('PATH', '/usr/bin:/bin'), 'LANG': 'C.UTF-8', 'TMPDIR': self._scratch}
+        ours, theirs = socket.socketpair()
+        try:
+            self._template = subprocess.Popen(
+                [self.python, '-I', WORKER_SCRIPT, str(theirs.fileno()), json.dumps(settings)],
+                pass_fds=[theirs.fileno()], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                cwd=self._scratch, env=env, start_new_session=True
+            )
+        except OSError as e:
+            ours.close()
+            raise PoolUnavailableError(f"Failed to start {self.python}: {e}")
+        finally:
+            theirs.close()
+        # Covers the template's startup imports on the first fork
+        ours.settimeout(10)
+        self._control = ours
+        with self._lock:
+            self._stats['template_starts'] += 1
+
+    def _stop_template(self):
+        if self._control is not None:
+            # The template exits when the control socket closes
+            self._control.close()
+            self._control = None
+        if self._template is not None:
+            try:
+                self._template.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self._template.kill()
+                self._template.wait()
+            self._template = None
+        if self._scratch is not None:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
+
+
+def pool_supported() -> bool:
+    """Whether this platform can run the pool (fork, RLIMIT_AS, fd passing)"""
+    return sys.platform.startswith('linux') and hasattr(socket, 'send_fds')
+
+
+_pool: Optional[PythonWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_python_pool() -> Optional[PythonWorkerPool]:
+    """The process-wide pool, or None when disabled or unsupported"""
+    global _pool
+    if not aws_config.python_pool_enabled or not pool_supported():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PythonWorkerPool(
+                size=aws_config.python_pool_size,
+                max_jobs=aws_config.python_pool_max_jobs,
+                timeout=aws_config.python_pool_timeout,
+                cpu_seconds=aws_config.python_pool_cpu_seconds,
+                memory_mb=aws_config.python_pool_memory_mb,
+                output_bytes=aws_config.python_pool_output_bytes
+            )
+            _pool.start()
+        return _pool
+
+
+def pool_stats() -> Optional[Dict[str, Any]]:
+    """Counters of the pool, or None if it hasn't been started"""
+    return _pool.stats() if _pool is not None else None
+
+
+def _close_pool():
+    if _pool is not None:
+        _pool.close()
+
+
+atexit.register(_close_pool)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Python Test Harness
+
+A test appends its input to the submission, so each test program is the
+submission followed by a snippet. Instead of running every test program
+from scratch, the harness runs the submission once and forks a child per
+test that runs only the snippet, with the submission's definitions and
+output already in place. Each child has its own timeout and captured
+output, and is timed.
+
+The source of this file is sent to a pool worker (or a python3 process)
+followed by a call to run_tests(), so it may only use the standard library.
+It writes one JSON list of results to stdout.
+"""
+
+import builtins
+import json
+import linecache
+import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+SOURCE_NAME = 'main.py'
+
+
+def _execute(source: str, namespace: dict) -> int:
+    try:
+        exec(compile(source, SOURCE_NAME, 'exec'), namespace)
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+
+
+def _flush():
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+
+def _redirect(stdout, stderr):
+    _flush()
+    os.dup2(stdout.fileno(), 1)
+    os.dup2(stderr.fileno(), 2)
+
+
+def _read(f, limit: int) -> str:
+    f.seek(0)
+    return f.read(limit).decode('utf-8', errors='replace')
+
+
+def _wait(pid: int, timeout: float):
+    """(returncode, timed out) of a test child, killing it at the deadline"""
+    deadline = time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status), False
+        if time.monotonic() >= deadline:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return -signal.SIGKILL, True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.01)
+
+
+def run_tests(code: str, snippets: list, timeout: float, limit: int):
+    results_fd = os.dup(1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    # Line numbers as in the appended program; the snippet starts on a new line
+    offset = code.count('\n') + 1
+    base_out, base_err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    _redirect(base_out, base_err)
+    sys.argv = [SOURCE_NAME]
+    namespace = {'__name__': '__main__', '__file__': SOURCE_NAME, '__builtins__': builtins}
+    linecache.cache[SOURCE_NAME] = (len(code), None, code.splitlines(True), SOURCE_NAME)
+    base_code = _execute(code, namespace)
+    _flush()
+    base_output = _read(base_out, limit)
+    if base_code:
+        # Every test program fails the way the submission does
+        failed = {'stdout': base_output, 'stderr': _read(base_err, limit), 'returncode': base_code,
+                  'timedOut': False, 'time': 0.0}
+        _write_results(results_fd, [failed] * len(snippets))
+        return
+
+    results = []
+    for snippet in snippets:
+        source = f"{code}\n{snippet}"
+        linecache.cache[SOURCE_NAME] = (len(source), None, source.splitlines(True), SOURCE_NAME)
+        out, err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(results_fd)
+            _redirect(out, err)
+            returncode = _execute('\n' * offset + snippet, namespace)
+            _flush()
+            os._exit(returncode & 0xFF)
+        returncode, timed_out = _wait(pid, timeout)
+        results.append({
+            'stdout': base_output + _read(out, limit),
+            'stderr': _read(err, limit),
+            'returncode': returncode,
+            'timedOut': timed_out,
+            'time': (time.perf_counter() - start) * 1000,
+        })
+        out.close()
+        err.close()
+    _write_results(results_fd, results)
+
+
+def _write_results(fd: int, results: list):
+    with open(fd, 'wb') as f:
+        f.write(json.dumps(results, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Python Worker Template
+
+Started by PythonWorkerPool as ``python3 -I python_worker.py <fd> <settings>``
+with a minimal environment, so this file may only use the standard library.
+
+The template imports the modules student programs commonly use and then
+waits on its control socket. Each message carries one end of a socketpair;
+the template forks a worker that inherits it and replies with the worker's
+pid. Forking from the warm template skips interpreter startup and those
+imports. A worker runs up to ``max_jobs`` programs sent over its socket,
+each under CPU, memory and file size rlimits with stdout and stderr
+captured, and then exits.
+"""
+
+import builtins
+import json
+import linecache
+import math
+import os
+import resource
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import traceback
+
+# Loaded once in the template, so every worker starts with them imported
+PRELOAD = (
+    'array', 'bisect', 'collections', 'copy', 'dataclasses', 'datetime', 'decimal', 'enum',
+    'fractions', 'functools', 'heapq', 'itertools', 'math', 'operator', 'random', 're',
+    'statistics', 'string', 'textwrap', 'time', 'typing',
+)
+
+SOURCE_NAME = 'main.py'
+
+# Length prefix of messages, and the template's pid replies
+HEADER = struct.Struct('!I')
+
+
+def send_message(sock: socket.socket, message: dict):
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError("Socket closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    size, = HEADER.unpack(recv_exact(sock, HEADER.size))
+    return json.loads(recv_exact(sock, size))
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _read(f, limit: int) -> str:
+    f.seek(0)
+    return f.read(limit).decode('utf-8', errors='replace')
+
+
+def run_job(code: str, settings: dict) -> dict:
+    """Run one program in this process; its output and exit status"""
+    # Each job gets cpu_seconds on top of what the worker has used so far
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + settings['cpu_seconds'])
+    resource.setrlimit(resource.RLIMIT_CPU, (min(soft, hard), hard))
+
+    stdout = tempfile.TemporaryFile()
+    stderr = tempfile.TemporaryFile()
+    os.dup2(stdout.fileno(), 1)
+    os.dup2(stderr.fileno(), 2)
+
+    # Tracebacks show source lines as they would for a script file
+    linecache.cache[SOURCE_NAME] = (len(code), None, code.splitlines(True), SOURCE_NAME)
+    sys.argv = [SOURCE_NAME]
+    namespace = {'__name__': '__main__', '__file__': SOURCE_NAME, '__builtins__': builtins}
+    try:
+        exec(compile(code, SOURCE_NAME, 'exec'), namespace)
+        returncode = 0
+    except SystemExit as e:
+        returncode = _exit_code(e.code)
+    except BaseException as e:
+        # Leave out this function's frame, as the traceback of a script would
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        returncode = 1
+
+    for stream in (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    limit = settings['output_bytes']
+    return {'stdout': _read(stdout, limit), 'stderr': _read(stderr, limit), 'returncode': returncode}
+
+
+def run_worker(sock: socket.socket, settings: dict):
+    # Own process group, so the pool can kill the worker and anything it starts
+    os.setsid()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # Oversized output fails the write instead of killing the worker
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+
+    memory = settings['memory_mb'] * 1024 * 1024
+    output = settings['output_bytes']
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    # The hard CPU limit covers every job the worker may run; run_job lowers the soft one
+    cpu = settings['cpu_seconds']
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu + 1, (cpu + 1) * settings['max_jobs'] + 1))
+
+    for _ in range(settings['max_jobs']):
+        try:
+            job = recv_message(sock)
+        except (EOFError, OSError):
+            return
+        send_message(sock, run_job(job['code'], settings))
+
+
+def main():
+    control = socket.socket(fileno=int(sys.argv[1]))
+    settings = json.loads(sys.argv[2])
+    for name in PRELOAD:
+        __import__(name)
+    sys.stdout.reconfigure(encoding='utf-8', errors='backslashreplace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='backslashreplace')
+    # Workers are reaped automatically; the pool only ever kills them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    while True:
+        try:
+            message, fds, _, _ = socket.recv_fds(control, 1, 1)
+        except OSError:
+            return
+        if not message:
+            return  # The pool closed the control socket
+        if not fds:
+            continue
+
+        pid = os.fork()
+        if pid == 0:
+            control.close()
+            status = 0
+            try:
+                run_worker(socket.socket(fileno=fds[0]), settings)
+            except BaseException:
+                status = 1
+            os._exit(status)
+        os.close(fds[0])
+        control.sendall(HEADER.pack(pid))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Storage Backends
+
+DynamoDBORM reads and writes through a storage backend chosen with the
+STORAGE_BACKEND setting:
+
+- dynamodb: Amazon DynamoDB (default)
+- memory: in-process tables with GSI emulation, for benchmarks and tests
+- sqlite: durable single-node tables in SQLITE_PATH with real indexes
+
+Large attributes can be compressed (codec) and moved to a content-addressed
+object store (objects) chosen with OBJECT_STORE.
+
+Tables handed to the ORM are wrapped in InstrumentedTable, which records
+per-operation costs in ``metrics``. Append-only tables can queue writes in
+a WriteBehindBuffer (buffer) that batches them in the background.
+"""
+
+import threading
+from typing import Optional
+
+from app.aws_config import aws_config
+
+from .base import StorageBackend, LocalBackend, LocalTable
+from .dynamodb import DynamoDBBackend
+from .memory import MemoryBackend
+from .sqlite import SQLiteBackend
+from .objects import ObjectStore, S3ObjectStore, FileObjectStore, get_object_store, set_object_store
+from .codec import (
+    COMPRESSED, OFFLOADED, compressed_fields, is_packed, offloaded_fields, pack, unpack, unpack_item
+)
+from .metrics import InstrumentedTable, OperationMetrics, bind_route, metrics
+from .buffer import WriteBehindBuffer, buffer_stats, flush_all
+
+__all__ = [
+    'StorageBackend',
+    'LocalBackend',
+    'LocalTable',
+    'MemoryBackend',
+    'SQLiteBackend',
+    'DynamoDBBackend',
+    'ObjectStore',
+    'S3ObjectStore',
+    'FileObjectStore',
+    'get_object_store',
+    'set_object_store',
+    'COMPRESSED',
+    'OFFLOADED',
+    'compressed_fields',
+    'offloaded_fields',
+    'is_packed',
+    'pack',
+    'unpack',
+    'unpack_item',
+    'InstrumentedTable',
+    'OperationMetrics',
+    'bind_route',
+    'metrics',
+    'WriteBehindBuffer',
+    'buffer_stats',
+    'flush_all',
+    'get_backend',
+    'set_backend'
+]
+
+_backend: Optional[StorageBackend] = None
+_lock = threading.Lock()
+
+
+def create_backend(kind: str, table_prefix: str, sqlite_path: str) -> StorageBackend:
+    """Build a backend by its STORAGE_BACKEND name"""
+    if kind == 'memory':
+        return MemoryBackend(table_prefix)
+    if kind == 'sqlite':
+        return SQLiteBackend(table_prefix, sqlite_path)
+    if kind == 'dynamodb':
+        return DynamoDBBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND {kind!r}; expected dynamodb, memory or sqlite")
+
+
+def get_backend() -> StorageBackend:
+    """The process-wide backend, created from aws_config on first use"""
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = create_backend(aws_config.storage_backend,
+                                      aws_config.dynamodb_table_prefix,
+                                      aws_config.sqlite_path)
+        return _backend
+
+
+def set_backend(backend: StorageBackend):
+    """Swap the backend, e.g. to a MemoryBackend in benchmarks; affects ORMs built afterwards"""
+    global _backend
+    with _lock:
+        _backend = backend
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Storage Backend Interface
+
+DynamoDBORM talks to tables through the boto3 Table API. A storage backend
+hands out objects with that API: real DynamoDB tables, or local tables that
+emulate the subset the ORM uses (get/put/update/delete with conditions,
+query and scan with filters, projection and pagination, parallel scan
+segments, batch reads and writes, transactions and DescribeTable).
+"""
+
+import copy
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import ExitStack
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.storage.expressions import (
+    ExpressionError, apply_update, key_equalities, matches, parse_condition,
+    parse_projection, parse_update, project, updated_paths
+)
+from app.table_schemas import get_table_schema, key_attributes
+
+
+class StorageBackend(ABC):
+    """Source of boto3-compatible table objects"""
+
+    name = "base"
+
+    @abstractmethod
+    def table(self, table_name: str) -> Any:
+        """Get the table object for a full (prefixed) table name"""
+
+
+def client_error(code: str, message: str, operation: str) -> ClientError:
+    """Build the ClientError boto3 would raise, so ORM error handling is unchanged"""
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def normalize(value: Any) -> Any:
+    """Coerce a value the way boto3 serializes it (ints become Decimal)"""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {normalize(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value).__name__} for DynamoDB")
+
+
+def sort_value(value: Any) -> tuple:
+    """Order key values the way DynamoDB does: numbers, then strings, then binary"""
+    if value is None:
+        return (0,)
+    if isinstance(value, Decimal):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, bytes(value))
+
+
+class LocalTable(ABC):
+    """boto3 Table emulation shared by the local backends
+
+    Subclasses store raw items and provide ordered iteration over the base
+    table or a GSI. Expression handling, conditions, pagination and batch
+    semantics live here, so every local backend behaves the same.
+    """
+
+    def __init__(self, backend: 'LocalBackend', table_name: str, schema: Dict[str, Any]):
+        self.backend = backend
+        self.name = table_name
+        self.table_name = table_name
+        self.schema = schema
+        self.hash_key, self.range_key = key_attributes(schema['key_schema'])
+        self.indexes = {
+            index['IndexName']: key_attributes(index['KeySchema'])
+            for index in schema.get('global_secondary_indexes', [])
+        }
+        self.lock = threading.RLock()
+        self.meta = SimpleNamespace(client=backend.client)
+
+    def require(self, operation: str):
+        """Local tables with a schema always exist"""
+
+    # Storage primitives
+
+    @abstractmethod
+    def _get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Stored item for a primary key, or None"""
+
+    @abstractmethod
+    def _put(self, item: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+        """Store an item, replacing ``previous`` if it existed"""
+
+    @abstractmethod
+    def _delete(self, item: Dict[str, Any]):
+        """Remove a stored item"""
+
+    @abstractmethod
+    def _iterate(self, index_name: Optional[str], hash_value: Any,
+                 start_key: Optional[Dict[str, Any]], forward: bool) -> Iterator[Dict[str, Any]]:
+        """Items in key order, optionally within one hash value and after ``start_key``"""
+
+    @abstractmethod
+    def _stats(self) -> Tuple[int, int]:
+        """(item count, approximate size in bytes)"""
+
+    # Helpers
+
+    def key_of(self, item: Dict[str, Any], index_name: Optional[str] = None) -> Dict[str, Any]:
+        """Primary key of an item, plus the index key when paging an index"""
+        attrs = [self.hash_key, self.range_key]
+        if index_name:
+            attrs.extend(self.indexes[index_name])
+        return {attr: item[attr] for attr in attrs if attr and attr in item}
+
+    def _check_key(self, key: Dict[str, Any], operation: str) -> Dict[str, Any]:
+        expected = {self.hash_key} | ({self.range_key} if self.range_key else set())
+        if set(key) != expected:
+            raise client_error('ValidationException',
+                               'The provided key element does not match the schema', operation)
+        return normalize(key)
+
+    def _check_condition(self, params: Dict[str, Any], current: Optional[Dict[str, Any]], operation: str):
+        expression = params.get('ConditionExpression')
+        if not expression:
+            return
+        node = self._parse(parse_condition, expression, params, operation)
+        if not matches(node, current or {}):
+            raise client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+    @staticmethod
+    def _parse(parser, expression: str, params: Dict[str, Any], operation: str):
+        try:
+            if parser is parse_projection:
+                return parser(expression, params.get('ExpressionAttributeNames'))
+            return parser(expression, params.get('ExpressionAttributeNames'),
+                          normalize(params.get('ExpressionAttributeValues') or {}))
+        except ExpressionError as e:
+            raise client_error('ValidationException', str(e), operation)
+
+    @staticmethod
+    def _returned(params: Dict[str, Any], old: Optional[Dict[str, Any]],
+                  new: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        mode = params.get('ReturnValues', 'NONE')
+        if mode == 'ALL_OLD' and old:
+            return {'Attributes': copy.deepcopy(old)}
+        if mode in ('ALL_NEW', 'UPDATED_NEW') and new:
+            return {'Attributes': copy.deepcopy(new)}
+        if mode == 'UPDATED_OLD' and old:
+            return {'Attributes': copy.deepcopy(old)}
+        return {}
+
+    # Item operations
+
+    def put_item(self, **params) -> Dict[str, Any]:
+        item = normalize(params['Item'])
+        key = self._check_key({attr: item[attr] for attr in (self.hash_key, self.range_key)
+                               if attr and attr in item}, 'PutItem')
+        with self.lock:
+            current = self._get(key)
+            self._check_condition(params, current, 'PutItem')
+            self._put(item, current)
+        return self._returned(params, current, None)
+
+    def get_item(self, **params) -> Dict[str, Any]:
+        key = self._check_key(params['Key'], 'GetItem')
+        with self.lock:
+            item = self._get(key)
+        if item is None:
+            return {}
+        if params.get('ProjectionExpression'):
+            paths = self._parse(parse_projection, params['ProjectionExpression'], params, 'GetItem')
+            return {'Item': project(item, paths)}
+        return {'Item': copy.deepcopy(item)}
+
+    def update_item(self, **params) -> Dict[str, Any]:
+        key = self._check_key(params['Key'], 'UpdateItem')
+        actions = self._parse(parse_update, params['UpdateExpression'], params, 'UpdateItem')
+        if any(path[0] in key for path in updated_paths(actions)):
+            raise client_error('ValidationException',
+                               'Cannot update attribute that is part of the key', 'UpdateItem')
+        with self.lock:
+            current = self._get(key)
+            self._check_condition(params, current, 'UpdateItem')
+            try:
+                updated = apply_update(current or dict(key), actions)
+            except ExpressionError as e:
+                raise client_error('ValidationException', str(e), 'UpdateItem')
+            self._put(updated, current)
+        return self._returned(params, current, updated)
+
+    def delete_item(self, **params) -> Dict[str, Any]:
+        key = self._check_key(params['Key'], 'DeleteItem')
+        with self.lock:
+            current = self._get(key)
+            self._check_condition(params, current, 'DeleteItem')
+            if current is not None:
+                self._delete(current)
+        return self._returned(params, current, None)
+
+    # Reads
+
+    def query(self, **params) -> Dict[str, Any]:
+        index_name = params.get('IndexName')
+        if index_name and index_name not in self.indexes:
+            raise client_error('ValidationException',
+                               f'The table does not have the specified index: {index_name}', 'Query')
+        hash_key, _ = self.indexes[index_name] if index_name else (self.hash_key, self.range_key)
+
+        key_node = self._parse(parse_condition, params.get('KeyConditionExpression', ''), params, 'Query') \
+            if params.get('KeyConditionExpression') else None
+        equalities = key_equalities(key_node)
+        if hash_key not in equalities:
+            raise client_error('ValidationException',
+                               f'Query condition missed key schema element: {hash_key}', 'Query')
+
+        items = self._iterate(index_name, equalities[hash_key], params.get('ExclusiveStartKey'),
+                              params.get('ScanIndexForward', True))
+        return self._read_page(params, items, key_node, index_name, 'Query')
+
+    def scan(self, **params) -> Dict[str, Any]:
+        index_name = params.get('IndexName')
+        items = self._iterate(index_name, None, params.get('ExclusiveStartKey'), True)
+
+        total_segments = params.get('TotalSegments')
+        if total_segments:
+            segment = params.get('Segment', 0)
+            items = (item for item in items
+                     if zlib.crc32(repr(sorted(self.key_of(item).items())).encode()) % total_segments == segment)
+
+        return self._read_page(params, items, None, index_name, 'Scan')
+
+    def _read_page(self, params: Dict[str, Any], items: Iterator[Dict[str, Any]], key_node,
+                   index_name: Optional[str], operation: str) -> Dict[str, Any]:
+        filter_node = self._parse(parse_condition, params['FilterExpression'], params, operation) \
+            if params.get('FilterExpression') else None
+        projection = self._parse(parse_projection, params['ProjectionExpression'], params, operation) \
+            if params.get('ProjectionExpression') else None
+        limit = params.get('Limit')
+
+        results, scanned, last = [], 0, None
+        for item in items:
+            if not matches(key_node, item):
+                continue
+            if limit is not None and scanned >= limit:
+                break
+            scanned += 1
+            last = item
+            if matches(filter_node, item):
+                results.append(project(item, projection) if projection else copy.deepcopy(item))
+        else:
+            last = None
+
+        response = {'Count': len(results), 'ScannedCount': scanned}
+        if params.get('Select') != 'COUNT':
+            response['Items'] = results
+        if last is not None:
+            response['LastEvaluatedKey'] = self.key_of(last, index_name)
+        return response
+
+    # Batch and metadata
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> 'LocalBatchWriter':
+        return LocalBatchWriter(self)
+
+    def describe(self) -> Dict[str, Any]:
+        count, size = self._stats()
+        description = {
+            'TableName': self.name,
+            'TableStatus': 'ACTIVE',
+            'KeySchema': self.schema['key_schema'],
+            'AttributeDefinitions': self.schema['attribute_definitions'],
+            'ItemCount': count,
+            'TableSizeBytes': size,
+        }
+        if self.indexes:
+            description['GlobalSecondaryIndexes'] = [
+                {**index, 'IndexStatus': 'ACTIVE'} for index in self.schema['global_secondary_indexes']
+            ]
+        return {'Table': description}
+
+
+class LocalBatchWriter:
+    """Context manager matching Table.batch_writer()"""
+
+    def __init__(self, table: LocalTable):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item: Dict[str, Any]):
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key: Dict[str, Any]):
+        self.table.delete_item(Key=Key)
+
+
+class LocalClient:
+    """The low-level client calls the ORM makes through ``table.meta.client``"""
+
+    def __init__(self, backend: 'LocalBackend'):
+        self.backend = backend
+
+    def _table(self, name: str, operation: str) -> LocalTable:
+        table = self.backend.table(name)
+        table.require(operation)
+        return table
+
+    def scan(self, TableName: str, **params) -> Dict[str, Any]:
+        return self._table(TableName, 'Scan').scan(**params)
+
+    def query(self, TableName: str, **params) -> Dict[str, Any]:
+        return self._table(TableName, 'Query').query(**params)
+
+    def describe_table(self, TableName: str) -> Dict[str, Any]:
+        return self._table(TableName, 'DescribeTable').describe()
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        responses = {}
+        for name, request in RequestItems.items():
+            table = self._table(name, 'BatchGetItem')
+            params = {k: v for k, v in request.items() if k != 'Keys'}
+            found = []
+            for key in request['Keys']:
+                item = table.get_item(Key=key, **params).get('Item')
+                if item is not None:
+                    found.append(item)
+            responses[name] = found
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **kwargs) -> Dict[str, Any]:
+        for name, requests in RequestItems.items():
+            table = self._table(name, 'BatchWriteItem')
+            for request in requests:
+                if 'PutRequest' in request:
+                    table.put_item(Item=request['PutRequest']['Item'])
+                else:
+                    table.delete_item(Key=request['DeleteRequest']['Key'])
+        return {'UnprocessedItems': {}}
+
+    def transact_write_items(self, TransactItems: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """All-or-nothing writes: every condition is checked before anything is applied"""
+        actions = []
+        for entry in TransactItems:
+            (action, params), = entry.items()
+            table = self._table(params['TableName'], 'TransactWriteItems')
+            params = {k: v for k, v in params.items() if k != 'TableName'}
+            if action == 'Put':
+                item = params['Item']
+                key = {attr: item[attr] for attr in (table.hash_key, table.range_key) if attr and attr in item}
+            else:
+                key = params['Key']
+            key = table._check_key(key, 'TransactWriteItems')
+            if action == 'Update':
+                # Reject bad updates up front; nothing may be applied if one fails
+                update = table._parse(parse_update, params['UpdateExpression'], params, 'TransactWriteItems')
+                if any(path[0] in key for path in updated_paths(update)):
+                    raise client_error('ValidationException',
+                                       'Cannot update attribute that is part of the key', 'TransactWriteItems')
+            actions.append((action, table, key, params))
+
+        targets = [(table.name, repr(sorted(key.items()))) for _, table, key, _ in actions]
+        if len(set(targets)) != len(targets):
+            raise client_error('ValidationException',
+                               'Transaction request cannot include multiple operations on one item',
+                               'TransactWriteItems')
+
+        # Lock every table in a fixed order so concurrent transactions can't deadlock
+        tables = sorted({table.name: table for _, table, _, _ in actions}.values(), key=lambda t: t.name)
+        with ExitStack() as stack:
+            for table in tables:
+                stack.enter_context(table.lock)
+
+            reasons, failed = [], False
+            for _, table, key, params in actions:
+                try:
+                    table._check_condition(params, table._get(key), 'TransactWriteItems')
+                    reasons.append({'Code': 'None'})
+                except ClientError:
+                    reasons.append({'Code': 'ConditionalCheckFailed',
+                                    'Message': 'The conditional request failed'})
+                    failed = True
+            if failed:
+                codes = ', '.join(reason['Code'] for reason in reasons)
+                raise ClientError({
+                    'Error': {'Code': 'TransactionCanceledException',
+                              'Message': f'Transaction cancelled, please refer cancellation reasons '
+                                         f'for specific reasons [{codes}]'},
+                    'CancellationReasons': reasons
+                }, 'TransactWriteItems')
+
+            for action, table, key, params in actions:
+                params = {k: v for k, v in params.items() if k != 'ConditionExpression'}
+                if action == 'Put':
+                    table.put_item(**params)
+                elif action == 'Update':
+                    table.update_item(**params)
+                elif action == 'Delete':
+                    table.delete_item(**params)
+        return {}
+
+
+class MissingLocalTable:
+    """Placeholder for a table with no schema; fails like DynamoDB on use"""
+
+    def __init__(self, backend: 'LocalBackend', table_name: str):
+        self.name = table_name
+        self.table_name = table_name
+        self.meta = SimpleNamespace(client=backend.client)
+
+    def require(self, operation: str):
+        raise client_error('ResourceNotFoundException',
+                           f'Requested resource not found: Table: {self.name} not found', operation)
+
+    def __getattr__(self, operation: str):
+        def fail(*args, **kwargs):
+            self.require(operation)
+        return fail
+
+
+class LocalBackend(StorageBackend):
+    """Backend whose tables are created on demand from TABLE_SCHEMAS"""
+
+    def __init__(self, table_prefix: str):
+        self.table_prefix = table_prefix
+        self.client = LocalClient(self)
+        self._tables: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _create_table(self, table_name: str, schema: Dict[str, Any]) -> LocalTable:
+        """Open or create storage for one table"""
+
+    def table(self, table_name: str) -> Any:
+        with self._lock:
+            if table_name not in self._tables:
+                table_type = table_name[len(self.table_prefix) + 1:] \
+                    if table_name.startswith(f"{self.table_prefix}-") else table_name
+                schema = get_table_schema(table_type)
+                self._tables[table_name] = self._create_table(table_name, schema) if schema \
+                    else MissingLocalTable(self, table_name)
+            return self._tables[table_name]
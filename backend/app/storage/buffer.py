@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Buffers
+
+Append-only telemetry (analytics events, error logs) doesn't need to be
+durable before the request returns. A WriteBehindBuffer queues such items
+in memory and a background thread writes them with BatchWriteItem, once
+``flush_items`` are waiting or ``flush_interval`` seconds after the oldest
+one arrived, whichever comes first.
+
+Items that fail are retried with backoff up to ``max_retries`` times and
+then dropped with a warning. The queue is bounded: when it's full, submit()
+waits up to ``put_timeout`` and then reports failure, so the caller can
+write synchronously and the producer slows to the pace of the table.
+Buffers are flushed when the process exits; items still queued when a
+process is killed are lost.
+"""
+
+import atexit
+import queue
+import random
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List
+
+
+class WriteBehindBuffer:
+    """Bounded queue of items written to one table in the background"""
+
+    def __init__(self, name: str, write: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 flush_items: int = 100, flush_interval: float = 1.0, max_pending: int = 10000,
+                 put_timeout: float = 0.05, max_retries: int = 3):
+        """``write`` stores a batch and returns the items that failed"""
+        self.name = name
+        self._write = write
+        self.flush_items = flush_items
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._closed = False
+        self._stats = {'submitted': 0, 'written': 0, 'retried': 0, 'dropped': 0, 'rejected': 0, 'flushes': 0}
+        _buffers.add(self)
+
+    def submit(self, item: Dict[str, Any]) -> bool:
+        """Queue an item; False if the buffer stayed full or is closed"""
+        if self._closed:
+            return False
+        self._start()
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            return False
+        with self._lock:
+            self._stats['submitted'] += 1
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self):
+        """Write everything queued so far, in the calling thread"""
+        while True:
+            batch = self._drain(self.flush_items)
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def close(self):
+        """Stop accepting items, flush the rest and wait for in-flight batches"""
+        self._closed = True
+        self.flush()
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'table': self.name, 'pending': self.pending(), **self._stats}
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        # Retrying here, rather than re-queueing, keeps failed items out of the
+        # bounded queue and holds the worker back while the table is throttling
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, min(2.0, 0.1 * (2 ** attempt))))
+            try:
+                failed = self._write(pending)
+            except Exception as e:
+                print(f"WARNING ORM: Write-behind batch for {self.name} failed: {e}")
+                failed = pending
+            with self._lock:
+                self._stats['written'] += len(pending) - len(failed)
+                if failed and attempt < self.max_retries:
+                    self._stats['retried'] += len(failed)
+            pending = failed
+            if not pending:
+                break
+
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['dropped'] += len(pending)
+        if pending:
+            print(f"WARNING ORM: Dropped {len(pending)} write-behind items for {self.name} "
+                  f"after {self.max_retries} retries")
+        for _ in batch:
+            self._queue.task_done()
+
+
+_buffers: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+
+
+def buffer_stats() -> List[Dict[str, Any]]:
+    """Counters of every live buffer"""
+    return sorted((buffer.stats() for buffer in list(_buffers)), key=lambda row: row['table'])
+
+
+def flush_all():
+    """Flush every live buffer, e.g. before shutdown"""
+    for buffer in list(_buffers):
+        try:
+            buffer.flush()
+        except Exception as e:
+            print(f"WARNING ORM: Failed to flush write-behind buffer {buffer.name}: {e}")
+
+
+def _close_all():
+    for buffer in list(_buffers):
+        try:
+            buffer.close()
+        except Exception as e:
+            print(f"WARNING ORM: Failed to flush write-behind buffer {buffer.name} at exit: {e}")
+
+
+atexit.register(_close_all)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Compressed Attribute Codec
+
+Large attributes, such as generated module content, can be stored as
+compressed binary instead of maps or strings. A packed value is a short
+header followed by zstd or zlib compressed JSON, so it is self-describing:
+readers unpack it whenever they see the header, and values written before
+compression was enabled still read as-is.
+
+Models opt in per field with ``field(metadata=COMPRESSED)``. Fields marked
+``OFFLOADED`` are also moved to the object store (app.storage.objects) once
+compressed they still exceed a size threshold; the item then keeps a
+pointer holding the content hash. Packed attributes are opaque to DynamoDB,
+so filters and conditions can't look inside them.
+
+encode_value() and decode_value() carry whole DynamoDB values through JSON,
+for SQLite rows and pagination cursors.
+"""
+
+import base64
+import hashlib
+import json
+import zlib
+from dataclasses import fields as dataclass_fields, is_dataclass
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, Optional
+
+from app.storage.objects import get_object_store
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+# Dataclass field metadata marking an attribute for compression
+COMPRESSED = {'codec': 'compressed'}
+# ...and for moving it to the object store when it is still too large
+OFFLOADED = {'codec': 'compressed', 'offload': True}
+
+_MAGIC = b'\x00PZ'
+_ZLIB = b'z'
+_ZSTD = b's'
+_REF = b'r'  # Followed by the object store key
+
+
+def compressed_fields(model_class: type) -> FrozenSet[str]:
+    """Names of the fields a model stores compressed"""
+    if not is_dataclass(model_class):
+        return frozenset()
+    return frozenset(f.name for f in dataclass_fields(model_class) if f.metadata.get('codec') == 'compressed')
+
+
+def offloaded_fields(model_class: type) -> FrozenSet[str]:
+    """Names of the compressed fields that may move to the object store"""
+    if not is_dataclass(model_class):
+        return frozenset()
+    return frozenset(f.name for f in dataclass_fields(model_class) if f.metadata.get('offload'))
+
+
+def encode_value(value: Any) -> Any:
+    """Tag DynamoDB types so they survive a JSON round trip"""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Decimal):
+        return {"N": str(value)}
+    if isinstance(value, bytes):
+        return {"B": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (set, frozenset)):
+        sample = next(iter(value), "")
+        if isinstance(sample, Decimal):
+            return {"NS": sorted(str(v) for v in value)}
+        if isinstance(sample, bytes):
+            return {"BS": sorted(base64.b64encode(v).decode("ascii") for v in value)}
+        return {"SS": sorted(value)}
+    if isinstance(value, list):
+        return [encode_value(v) for v in value]
+    return {"M": {k: encode_value(v) for k, v in value.items()}}
+
+
+def decode_value(value: Any) -> Any:
+    """Inverse of encode_value"""
+    if not isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    (kind, payload), = value.items()
+    if kind == "N":
+        return Decimal(payload)
+    if kind == "B":
+        return base64.b64decode(payload)
+    if kind == "SS":
+        return set(payload)
+    if kind == "NS":
+        return {Decimal(v) for v in payload}
+    if kind == "BS":
+        return {base64.b64decode(v) for v in payload}
+    return {k: decode_value(v) for k, v in payload.items()}
+
+
+def _tag(value: Any) -> Any:
+    # Keep DynamoDB types that JSON can't represent
+    if isinstance(value, Decimal):
+        return {'__n': str(value)}
+    if isinstance(value, (set, frozenset)):
+        return {'__s': list(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__b': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Unsupported type {type(value).__name__} for a compressed attribute")
+
+
+def _untag(value: Dict[str, Any]) -> Any:
+    if len(value) == 1:
+        if '__n' in value:
+            return Decimal(value['__n'])
+        if '__s' in value:
+            return set(value['__s'])
+        if '__b' in value:
+            return base64.b64decode(value['__b'])
+    return value
+
+
+def is_packed(value: Any) -> bool:
+    """Whether a stored value was written by pack()"""
+    raw = getattr(value, 'value', value)  # boto3 returns Binary wrappers
+    return isinstance(raw, (bytes, bytearray)) and raw[:len(_MAGIC)] == _MAGIC
+
+
+def pack(value: Any, min_bytes: int = 1024, algorithm: str = 'zstd', level: int = 3,
+         offload_bytes: Optional[int] = None) -> Any:
+    """Compress a value, or return it unchanged if it's too small to benefit
+
+    With ``offload_bytes``, a compressed value larger than that is written to
+    the object store (if one is configured) and a pointer is returned.
+    """
+    if value is None or is_packed(value):
+        return value
+    encoded = json.dumps(value, default=_tag, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    if len(encoded) < min_bytes:
+        return value
+    if algorithm == 'zstd' and zstd is not None:
+        packed = _MAGIC + _ZSTD + zstd.compress(encoded, level=level)
+    else:
+        packed = _MAGIC + _ZLIB + zlib.compress(encoded, min(level * 2, 9))
+
+    if offload_bytes is not None and len(packed) > offload_bytes:
+        store = get_object_store()
+        if store is not None:
+            # Keyed by the uncompressed content, so identical values share an object
+            key = hashlib.sha256(encoded).hexdigest()
+            store.put(key, packed)
+            return _MAGIC + _REF + key.encode('ascii')
+    return packed
+
+
+def unpack(value: Any) -> Any:
+    """Inverse of pack(), fetching offloaded values; numbers come back as Decimal"""
+    if not is_packed(value):
+        return value
+    raw = bytes(getattr(value, 'value', value))
+    kind, payload = raw[len(_MAGIC):len(_MAGIC) + 1], raw[len(_MAGIC) + 1:]
+    if kind == _REF:
+        store = get_object_store()
+        if store is None:
+            raise ValueError("Attribute is stored in the object store but OBJECT_STORE is not configured")
+        return unpack(store.get(payload.decode('ascii')))
+    if kind == _ZSTD:
+        if zstd is None:
+            raise ValueError("Attribute is zstd-compressed but compression.zstd is unavailable")
+        encoded = zstd.decompress(payload)
+    elif kind == _ZLIB:
+        encoded = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown compressed attribute format {kind!r}")
+    return json.loads(encoded, parse_float=Decimal, parse_int=Decimal, object_hook=_untag)
+
+
+def unpack_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an item with every packed attribute decoded"""
+    return {k: unpack(v) for k, v in item.items()}
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+DynamoDB Storage Backend
+
+The production backend: boto3 Table resources from aws_config.
+"""
+
+import threading
+from typing import Any
+
+from app.aws_config import aws_config
+from app.storage.base import StorageBackend
+
+
+class ThreadLocalTable:
+    """Table resource resolved per thread
+
+    boto3 resources are not thread-safe, so each thread gets its own Table
+    from its own resource. Every thread's resource wraps the same low-level
+    client (``meta.client``), which is safe to share and pass to worker
+    threads, so all threads use one connection pool.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self._local = threading.local()
+
+    def _table(self) -> Any:
+        table = getattr(self._local, "table", None)
+        if table is None:
+            table = aws_config.dynamodb_resource.Table(self.table_name)
+            self._local.table = table
+        return table
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._table(), name)
+
+
+class DynamoDBBackend(StorageBackend):
+    """Tables served by Amazon DynamoDB"""
+
+    name = "dynamodb"
+
+    def table(self, table_name: str) -> Any:
+        return ThreadLocalTable(table_name)
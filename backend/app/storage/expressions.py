@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+DynamoDB Expression Evaluation
+
+Parses and evaluates condition, key condition, update and projection
+expressions against plain item dicts, for the local storage backends.
+"""
+
+import copy
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r"\s*(?:(?P<num>\d+)|(?P<name>[#:]?[A-Za-z_][A-Za-z0-9_]*)|(?P<op><>|<=|>=|[=<>(),.\[\]+\-]))")
+_COMPARATORS = {'=', '<>', '<', '<=', '>', '>='}
+_MISSING = object()
+
+
+class ExpressionError(ValueError):
+    """Malformed expression or invalid operand types"""
+
+
+def _tokenize(expression: str) -> List[str]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f"Invalid syntax near: {expression[position:position + 20]!r}")
+        tokens.append(match.group('num') or match.group('name') or match.group('op'))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing tuple-based syntax trees"""
+
+    def __init__(self, expression: str, names: Optional[Dict[str, str]],
+                 values: Optional[Dict[str, Any]]):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.names = names or {}
+        self.values = values or {}
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def keyword(self, word: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.upper() == word
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Unexpected end of expression")
+        if expected is not None and token.upper() != expected:
+            raise ExpressionError(f"Expected {expected!r}, got {token!r}")
+        self.position += 1
+        return token
+
+    def done(self):
+        if self.peek() is not None:
+            raise ExpressionError(f"Unexpected token {self.peek()!r}")
+
+    # Conditions
+
+    def condition(self):
+        node = self.conjunction()
+        while self.keyword('OR'):
+            self.take()
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.keyword('AND'):
+            self.take()
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.keyword('NOT'):
+            self.take()
+            return ('not', self.negation())
+        return self.predicate()
+
+    def predicate(self):
+        if self.peek() == '(':
+            self.take('(')
+            node = self.condition()
+            self.take(')')
+            return node
+
+        token = self.peek()
+        if token and token.lower() in ('attribute_exists', 'attribute_not_exists',
+                                       'attribute_type', 'begins_with', 'contains') \
+                and self.peek(1) == '(':
+            function = self.take().lower()
+            self.take('(')
+            args = [self.operand()]
+            while self.peek() == ',':
+                self.take(',')
+                args.append(self.operand())
+            self.take(')')
+            return ('call', function, args)
+
+        left = self.operand()
+        if self.peek() in _COMPARATORS:
+            return ('cmp', self.take(), left, self.operand())
+        if self.keyword('BETWEEN'):
+            self.take()
+            low = self.operand()
+            self.take('AND')
+            return ('between', left, low, self.operand())
+        if self.keyword('IN'):
+            self.take()
+            self.take('(')
+            options = [self.operand()]
+            while self.peek() == ',':
+                self.take(',')
+                options.append(self.operand())
+            self.take(')')
+            return ('in', left, options)
+        raise ExpressionError(f"Expected a comparison after operand, got {self.peek()!r}")
+
+    # Operands
+
+    def operand(self):
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Unexpected end of expression")
+        if token.startswith(':'):
+            self.take()
+            if token not in self.values:
+                raise ExpressionError(f"Value {token} not defined in ExpressionAttributeValues")
+            return ('value', self.values[token])
+        if token.lower() == 'size' and self.peek(1) == '(':
+            self.take()
+            self.take('(')
+            path = self.path()
+            self.take(')')
+            return ('size', path)
+        return self.path()
+
+    def path(self):
+        segments = [self.path_name()]
+        while self.peek() in ('.', '['):
+            if self.take() == '.':
+                segments.append(self.path_name())
+            else:
+                index = self.take()
+                if not index.isdigit():
+                    raise ExpressionError(f"Invalid list index {index!r}")
+                self.take(']')
+                segments.append(int(index))
+        return ('path', tuple(segments))
+
+    def path_name(self) -> str:
+        token = self.take()
+        if token.startswith('#'):
+            if token not in self.names:
+                raise ExpressionError(f"Name {token} not defined in ExpressionAttributeNames")
+            return self.names[token]
+        if token.startswith(':') or not (token[0].isalpha() or token[0] == '_'):
+            raise ExpressionError(f"Invalid attribute name {token!r}")
+        return token
+
+    # Update expressions
+
+    def update(self) -> List[tuple]:
+        actions = []
+        while self.peek() is not None:
+            clause = self.take().upper()
+            while True:
+                if clause == 'SET':
+                    target = self.path()
+                    self.take('=')
+                    actions.append(('set', target, self.set_value()))
+                elif clause == 'REMOVE':
+                    actions.append(('remove', self.path()))
+                elif clause in ('ADD', 'DELETE'):
+                    target = self.path()
+                    actions.append((clause.lower(), target, self.operand()))
+                else:
+                    raise ExpressionError(f"Unknown update clause {clause!r}")
+                if self.peek() != ',':
+                    break
+                self.take(',')
+        if not actions:
+            raise ExpressionError("Empty update expression")
+        return actions
+
+    def set_value(self):
+        node = self.set_operand()
+        if self.peek() in ('+', '-'):
+            return ('arith', self.take(), node, self.set_operand())
+        return node
+
+    def set_operand(self):
+        token = self.peek()
+        if token and token.lower() in ('if_not_exists', 'list_append') and self.peek(1) == '(':
+            function = self.take().lower()
+            self.take('(')
+            first = self.path() if function == 'if_not_exists' else self.set_operand()
+            self.take(',')
+            second = self.set_operand()
+            self.take(')')
+            return (function, first, second)
+        return self.operand()
+
+
+def _resolve(item: Any, segments: tuple) -> Any:
+    current = item
+    for segment in segments:
+        if isinstance(segment, int):
+            if not isinstance(current, list) or segment >= len(current):
+                return _MISSING
+            current = current[segment]
+        else:
+            if not isinstance(current, dict) or segment not in current:
+                return _MISSING
+            current = current[segment]
+    return current
+
+
+def _operand_value(node, item: Dict[str, Any]) -> Any:
+    kind = node[0]
+    if kind == 'value':
+        return node[1]
+    if kind == 'path':
+        return _resolve(item, node[1])
+    if kind == 'size':
+        target = _resolve(item, node[1][1])
+        if target is _MISSING or isinstance(target, (bool, Decimal)) or target is None:
+            return _MISSING
+        return Decimal(len(target))
+    raise ExpressionError(f"Unsupported operand {kind}")
+
+
+def _comparable(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return False
+    for kind in (Decimal, str, bytes):
+        if isinstance(left, kind) and isinstance(right, kind):
+            return True
+    return False
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return op == '<>' and not (left is _MISSING and right is _MISSING)
+    if op == '=':
+        return left == right and type(left) is type(right)
+    if op == '<>':
+        return not (left == right and type(left) is type(right))
+    if not _comparable(left, right):
+        return False
+    return {'<': left < right, '<=': left <= right,
+            '>': left > right, '>=': left >= right}[op]
+
+
+def type_code(value: Any) -> str:
+    """DynamoDB type descriptor of a Python value"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'BOOL'
+    if isinstance(value, Decimal):
+        return 'N'
+    if isinstance(value, str):
+        return 'S'
+    if isinstance(value, (bytes, bytearray)):
+        return 'B'
+    if isinstance(value, list):
+        return 'L'
+    if isinstance(value, dict):
+        return 'M'
+    if isinstance(value, (set, frozenset)):
+        sample = next(iter(value), '')
+        return {'N': 'NS', 'B': 'BS'}.get(type_code(sample), 'SS')
+    raise ExpressionError(f"Unsupported type {type(value).__name__}")
+
+
+def _evaluate(node, item: Dict[str, Any]) -> bool:
+    kind = node[0]
+    if kind == 'and':
+        return _evaluate(node[1], item) and _evaluate(node[2], item)
+    if kind == 'or':
+        return _evaluate(node[1], item) or _evaluate(node[2], item)
+    if kind == 'not':
+        return not _evaluate(node[1], item)
+    if kind == 'cmp':
+        return _compare(node[1], _operand_value(node[2], item), _operand_value(node[3], item))
+    if kind == 'between':
+        value = _operand_value(node[1], item)
+        return _compare('>=', value, _operand_value(node[2], item)) and \
+            _compare('<=', value, _operand_value(node[3], item))
+    if kind == 'in':
+        value = _operand_value(node[1], item)
+        return any(_compare('=', value, _operand_value(option, item)) for option in node[2])
+    if kind == 'call':
+        function, args = node[1], node[2]
+        if function == 'attribute_exists':
+            return _operand_value(args[0], item) is not _MISSING
+        if function == 'attribute_not_exists':
+            return _operand_value(args[0], item) is _MISSING
+        target = _operand_value(args[0], item)
+        argument = _operand_value(args[1], item)
+        if target is _MISSING or argument is _MISSING:
+            return False
+        if function == 'attribute_type':
+            return type_code(target) == argument
+        if function == 'begins_with':
+            return isinstance(target, (str, bytes)) and type(target) is type(argument) \
+                and target.startswith(argument)
+        if function == 'contains':
+            if isinstance(target, (str, bytes)):
+                return type(target) is type(argument) and argument in target
+            if isinstance(target, (set, frozenset, list)):
+                return argument in target
+            return False
+    raise ExpressionError(f"Unsupported condition {kind}")
+
+
+def parse_condition(expression: str, names: Optional[Dict[str, str]] = None,
+                    values: Optional[Dict[str, Any]] = None):
+    """Parse a condition or key condition expression"""
+    parser = _Parser(expression, names, values)
+    node = parser.condition()
+    parser.done()
+    return node
+
+
+def matches(node, item: Dict[str, Any]) -> bool:
+    """Evaluate a parsed condition against an item (None matches everything)"""
+    return node is None or _evaluate(node, item)
+
+
+def key_equalities(node) -> Dict[str, Any]:
+    """Top-level ``attr = :value`` terms of a key condition, by attribute name"""
+    if node is None:
+        return {}
+    if node[0] == 'and':
+        return {**key_equalities(node[1]), **key_equalities(node[2])}
+    if node[0] == 'cmp' and node[1] == '=':
+        left, right = node[2], node[3]
+        if left[0] == 'path' and right[0] == 'value' and len(left[1]) == 1:
+            return {left[1][0]: right[1]}
+        if right[0] == 'path' and left[0] == 'value' and len(right[1]) == 1:
+            return {right[1][0]: left[1]}
+    return {}
+
+
+def parse_projection(expression: str, names: Optional[Dict[str, str]] = None) -> List[tuple]:
+    """Parse a ProjectionExpression into attribute paths"""
+    parser = _Parser(expression, names, None)
+    paths = [parser.path()[1]]
+    while parser.peek() == ',':
+        parser.take(',')
+        paths.append(parser.path()[1])
+    parser.done()
+    return paths
+
+
+def project(item: Dict[str, Any], paths: List[tuple]) -> Dict[str, Any]:
+    """Copy only the projected paths of an item"""
+    projected: Dict[str, Any] = {}
+    for segments in paths:
+        value = _resolve(item, segments)
+        if value is _MISSING:
+            continue
+        target = projected
+        for segment, following in zip(segments, segments[1:]):
+            default = [] if isinstance(following, int) else {}
+            if isinstance(target, list):
+                target.append(default)
+                target = target[-1]
+            else:
+                target = target.setdefault(segment, default)
+        if isinstance(target, list):
+            target.append(copy.deepcopy(value))
+        else:
+            target[segments[-1]] = copy.deepcopy(value)
+    return projected
+
+
+def _set_value(node, item: Dict[str, Any]) -> Any:
+    kind = node[0]
+    if kind == 'if_not_exists':
+        existing = _resolve(item, node[1][1])
+        return existing if existing is not _MISSING else _set_value(node[2], item)
+    if kind == 'list_append':
+        first, second = _set_value(node[1], item), _set_value(node[2], item)
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise ExpressionError("list_append operands must be lists")
+        return first + second
+    if kind == 'arith':
+        left, right = _set_value(node[2], item), _set_value(node[3], item)
+        if not isinstance(left, Decimal) or not isinstance(right, Decimal) \
+                or isinstance(left, bool) or isinstance(right, bool):
+            raise ExpressionError("Arithmetic operands must be numbers")
+        return left + right if node[1] == '+' else left - right
+    value = _operand_value(node, item)
+    if value is _MISSING:
+        raise ExpressionError("The provided expression refers to an attribute that does not exist in the item")
+    return copy.deepcopy(value)
+
+
+def _parent(item: Dict[str, Any], segments: tuple) -> Any:
+    parent = _resolve(item, segments[:-1]) if len(segments) > 1 else item
+    if parent is _MISSING or not isinstance(parent, (dict, list)):
+        raise ExpressionError("The document path provided in the update expression is invalid for update")
+    return parent
+
+
+def _assign(item: Dict[str, Any], segments: tuple, value: Any):
+    parent = _parent(item, segments)
+    last = segments[-1]
+    if isinstance(parent, list):
+        if not isinstance(last, int):
+            raise ExpressionError("Invalid document path")
+        if last >= len(parent):
+            parent.append(value)
+        else:
+            parent[last] = value
+    else:
+        parent[last] = value
+
+
+def _remove(item: Dict[str, Any], segments: tuple):
+    parent = _resolve(item, segments[:-1]) if len(segments) > 1 else item
+    last = segments[-1]
+    if isinstance(parent, list) and isinstance(last, int) and last < len(parent):
+        del parent[last]
+    elif isinstance(parent, dict):
+        parent.pop(last, None)
+
+
+def parse_update(expression: str, names: Optional[Dict[str, str]] = None,
+                 values: Optional[Dict[str, Any]] = None) -> List[tuple]:
+    """Parse an UpdateExpression into SET/REMOVE/ADD/DELETE actions"""
+    parser = _Parser(expression, names, values)
+    return parser.update()
+
+
+def updated_paths(actions: List[tuple]) -> List[tuple]:
+    """Attribute paths written by parsed update actions"""
+    return [action[1][1] for action in actions]
+
+
+def apply_update(item: Dict[str, Any], actions: List[tuple]) -> Dict[str, Any]:
+    """Return a copy of ``item`` with parsed update actions applied
+
+    Every right-hand side is evaluated against the original item, as in
+    DynamoDB, before any action is applied.
+    """
+    original = item
+    updated = copy.deepcopy(item)
+
+    resolved = []
+    for action in actions:
+        kind, target = action[0], action[1][1]
+        if kind == 'set':
+            resolved.append((kind, target, _set_value(action[2], original)))
+        elif kind == 'remove':
+            resolved.append((kind, target, None))
+        else:
+            resolved.append((kind, target, _operand_value(action[2], original)))
+
+    for kind, target, value in resolved:
+        if kind == 'set':
+            _assign(updated, target, value)
+        elif kind == 'remove':
+            _remove(updated, target)
+        elif kind == 'add':
+            current = _resolve(updated, target)
+            if isinstance(value, Decimal) and not isinstance(value, bool):
+                if current is _MISSING:
+                    current = Decimal(0)
+                if not isinstance(current, Decimal):
+                    raise ExpressionError("An operand in the update expression has an incorrect data type")
+                _assign(updated, target, current + value)
+            elif isinstance(value, (set, frozenset)):
+                if current is _MISSING:
+                    current = set()
+                if not isinstance(current, (set, frozenset)):
+                    raise ExpressionError("An operand in the update expression has an incorrect data type")
+                _assign(updated, target, set(current) | set(value))
+            else:
+                raise ExpressionError("ADD only supports numbers and sets")
+        elif kind == 'delete':
+            current = _resolve(updated, target)
+            if current is _MISSING:
+                continue
+            if not isinstance(current, (set, frozenset)) or not isinstance(value, (set, frozenset)):
+                raise ExpressionError("DELETE only supports sets")
+            remaining = set(current) - set(value)
+            if remaining:
+                _assign(updated, target, remaining)
+            else:
+                _remove(updated, target)
+
+    return updated
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+In-Memory Storage Backend
+
+Process-local tables with sorted base-table and GSI indexes, for
+benchmarks, load tests and unit-style checks without AWS.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.storage.base import LocalBackend, LocalTable, sort_value
+
+# Sorts after every sort_value(), used as an upper bound within one hash key
+_END = (4,)
+
+
+class MemoryTable(LocalTable):
+    """Items in a dict, with sorted key lists standing in for indexes"""
+
+    def __init__(self, backend: 'MemoryBackend', table_name: str, schema: Dict[str, Any]):
+        super().__init__(backend, table_name, schema)
+        self._items: Dict[tuple, Dict[str, Any]] = {}
+        self._order: List[tuple] = []
+        self._index_order: Dict[str, List[tuple]] = {name: [] for name in self.indexes}
+
+    def _position(self, item: Dict[str, Any]) -> tuple:
+        return (sort_value(item.get(self.hash_key)),
+                sort_value(item.get(self.range_key)) if self.range_key else (0,))
+
+    def _index_entry(self, index_name: str, item: Dict[str, Any]) -> Optional[tuple]:
+        hash_key, range_key = self.indexes[index_name]
+        if hash_key not in item or (range_key and range_key not in item):
+            return None  # Sparse index: items without the index key are not indexed
+        return (sort_value(item[hash_key]),
+                sort_value(item[range_key]) if range_key else (0,),
+                self._position(item))
+
+    @staticmethod
+    def _remove_entry(order: List[tuple], entry: tuple):
+        index = bisect_left(order, entry)
+        if index < len(order) and order[index] == entry:
+            del order[index]
+
+    def _get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._items.get(self._position(key))
+
+    def _put(self, item: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+        position = self._position(item)
+        if previous is None:
+            insort(self._order, position)
+        else:
+            self._unindex(previous)
+        self._items[position] = item
+        for name, order in self._index_order.items():
+            entry = self._index_entry(name, item)
+            if entry is not None:
+                insort(order, entry)
+
+    def _delete(self, item: Dict[str, Any]):
+        position = self._position(item)
+        self._unindex(item)
+        self._remove_entry(self._order, position)
+        del self._items[position]
+
+    def _unindex(self, item: Dict[str, Any]):
+        for name, order in self._index_order.items():
+            entry = self._index_entry(name, item)
+            if entry is not None:
+                self._remove_entry(order, entry)
+
+    def _iterate(self, index_name: Optional[str], hash_value: Any,
+                 start_key: Optional[Dict[str, Any]], forward: bool) -> Iterator[Dict[str, Any]]:
+        with self.lock:
+            order = self._index_order[index_name] if index_name else self._order
+            low, high = 0, len(order)
+            if hash_value is not None:
+                low = bisect_left(order, (sort_value(hash_value),))
+                high = bisect_left(order, (sort_value(hash_value), _END))
+            if start_key:
+                start = self._index_entry(index_name, start_key) if index_name else self._position(start_key)
+                if forward:
+                    low = max(low, bisect_right(order, start))
+                else:
+                    high = min(high, bisect_left(order, start))
+            snapshot = order[low:high]
+
+        if not forward:
+            snapshot.reverse()
+        for entry in snapshot:
+            item = self._items.get(entry[2] if index_name else entry)
+            if item is not None:
+                yield item
+
+    def _stats(self) -> Tuple[int, int]:
+        with self.lock:
+            return len(self._items), sum(len(repr(item)) for item in self._items.values())
+
+
+class MemoryBackend(LocalBackend):
+    """Non-durable backend; every table starts empty"""
+
+    name = "memory"
+
+    def _create_table(self, table_name: str, schema: Dict[str, Any]) -> MemoryTable:
+        return MemoryTable(self, table_name, schema)
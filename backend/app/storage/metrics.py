@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Storage Operation Metrics
+
+Every table call the ORM makes goes through an InstrumentedTable, which
+asks DynamoDB for ConsumedCapacity and records wall time, capacity units,
+ScannedCount vs Count and item bytes. Totals are kept per table, operation
+and calling route, and slow or low-selectivity calls are logged.
+"""
+
+import contextvars
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+from flask import has_request_context, request
+
+from app.aws_config import aws_config
+
+# Operations that consume read capacity; everything else is a write
+READ_OPERATIONS = {'get_item', 'query', 'scan', 'batch_get_item'}
+
+# Route label for work that happens outside a request, e.g. scripts
+NO_ROUTE = '-'
+
+_route: contextvars.ContextVar = contextvars.ContextVar('orm_route', default=None)
+
+
+def current_route() -> str:
+    """Flask endpoint of the request being served, or the route bound to this thread"""
+    route = _route.get()
+    if route is not None:
+        return route
+    if has_request_context():
+        return request.endpoint or request.path
+    return NO_ROUTE
+
+
+def bind_route(fn: Callable) -> Callable:
+    """Wrap fn so calls from worker threads are attributed to the caller's route"""
+    route = current_route()
+
+    def bound(*args, **kwargs):
+        token = _route.set(route)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _route.reset(token)
+
+    return bound
+
+
+def item_size(value: Any) -> int:
+    """Approximate DynamoDB item size in bytes, per the published sizing rules"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value).lstrip('-').replace('.', '')) // 2 + 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(str(k).encode('utf-8')) + item_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 3 + sum(item_size(v) + 1 for v in value)
+    return len(str(value))
+
+
+def _capacity_units(consumed: Any) -> float:
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return float(sum(entry.get('CapacityUnits', 0) for entry in consumed))
+
+
+def _response_items(operation: str, params: Dict[str, Any], response: Dict[str, Any]) -> List[Any]:
+    """Items read or written by one call, for byte accounting"""
+    if 'Items' in response:
+        return response['Items']
+    if 'Item' in response:
+        return [response['Item']]
+    if operation == 'put_item':
+        return [params.get('Item', {})]
+    if operation == 'batch_get_item':
+        return [item for items in response.get('Responses', {}).values() for item in items]
+    if operation == 'batch_write_item':
+        return [
+            request['PutRequest']['Item']
+            for requests in params.get('RequestItems', {}).values()
+            for request in requests if 'PutRequest' in request
+        ]
+    if 'Attributes' in response:
+        return [response['Attributes']]
+    return []
+
+
+class OperationStats:
+    """Running totals for one (table, operation, route)"""
+
+    __slots__ = ('calls', 'errors', 'slow', 'total_ms', 'max_ms', 'capacity_units',
+                 'scanned', 'returned', 'item_bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.capacity_units = 0.0
+        self.scanned = 0
+        self.returned = 0
+        self.item_bytes = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'slow': self.slow,
+            'total_ms': round(self.total_ms, 2),
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'capacity_units': round(self.capacity_units, 2),
+            'scanned': self.scanned,
+            'returned': self.returned,
+            'selectivity': round(self.returned / self.scanned, 4) if self.scanned else None,
+            'item_bytes': self.item_bytes
+        }
+
+
+class OperationMetrics:
+    """Thread-safe aggregation of storage calls"""
+
+    def __init__(self, enabled: bool = True, slow_ms: float = 250.0,
+                 low_selectivity: float = 0.1, min_scanned: int = 100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.low_selectivity = low_selectivity
+        self.min_scanned = min_scanned
+        self._stats: Dict[Tuple[str, str, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def call(self, table_name: str, operation: str, fn: Callable, params: Dict[str, Any]) -> Any:
+        """Run one storage call and record what it cost"""
+        if not self.enabled:
+            return fn(**params)
+
+        params = dict(params)
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        route = current_route()
+        start = time.perf_counter()
+        try:
+            response = fn(**params)
+        except Exception:
+            self._record(table_name, operation, route, (time.perf_counter() - start) * 1000, error=True)
+            raise
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        returned = response.get('Count')
+        scanned = response.get('ScannedCount')
+        items = _response_items(operation, params, response)
+        if returned is None:
+            returned = len(items)
+        self._record(
+            table_name, operation, route, elapsed_ms,
+            capacity_units=_capacity_units(response.get('ConsumedCapacity')),
+            scanned=scanned if scanned is not None else returned,
+            returned=returned,
+            item_bytes=sum(item_size(item) for item in items)
+        )
+
+        if elapsed_ms >= self.slow_ms:
+            print(f"WARNING ORM: Slow {operation} on {table_name} took {elapsed_ms:.0f} ms (route {route})")
+        if scanned and scanned >= self.min_scanned and returned / scanned < self.low_selectivity:
+            print(f"WARNING ORM: Low-selectivity {operation} on {table_name} kept {returned} of "
+                  f"{scanned} items read (route {route})")
+        return response
+
+    def _record(self, table_name: str, operation: str, route: str, elapsed_ms: float,
+                error: bool = False, capacity_units: float = 0.0, scanned: int = 0,
+                returned: int = 0, item_bytes: int = 0):
+        with self._lock:
+            stats = self._stats.get((table_name, operation, route))
+            if stats is None:
+                stats = self._stats[(table_name, operation, route)] = OperationStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.slow += int(elapsed_ms >= self.slow_ms)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.capacity_units += capacity_units
+            stats.scanned += scanned
+            stats.returned += returned
+            stats.item_bytes += item_bytes
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """All totals, most expensive first"""
+        with self._lock:
+            rows = [
+                {'table': table, 'operation': operation, 'route': route,
+                 'capacity': 'read' if operation in READ_OPERATIONS else 'write',
+                 **stats.to_dict()}
+                for (table, operation, route), stats in self._stats.items()
+            ]
+        rows.sort(key=lambda row: (row['capacity_units'], row['total_ms']), reverse=True)
+        return rows
+
+    def reset(self):
+        """Drop all totals"""
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = OperationMetrics(
+    enabled=aws_config.orm_metrics_enabled,
+    slow_ms=aws_config.orm_slow_query_ms,
+    low_selectivity=aws_config.orm_low_selectivity,
+    min_scanned=aws_config.orm_low_selectivity_min_scanned
+)
+
+
+class InstrumentedClient:
+    """Low-level client whose data calls are recorded against one table"""
+
+    OPERATIONS = ('query', 'scan', 'batch_get_item', 'batch_write_item', 'transact_write_items')
+
+    def __init__(self, client: Any, table_name: str):
+        self._client = client
+        self._table_name = table_name
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in self.OPERATIONS:
+            return attr
+        return lambda **params: metrics.call(self._table_name, name, attr, params)
+
+
+class _InstrumentedMeta:
+    def __init__(self, meta: Any, client: InstrumentedClient):
+        self._meta = meta
+        self.client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._meta, name)
+
+
+class InstrumentedTable:
+    """Table wrapper that records every data call in ``metrics``
+
+    batch_writer() is passed through unrecorded; boto3 drives it internally.
+    """
+
+    OPERATIONS = ('put_item', 'get_item', 'update_item', 'delete_item', 'query', 'scan')
+
+    def __init__(self, table: Any, table_name: str):
+        self._table = table
+        self._table_name = table_name
+
+    @property
+    def meta(self) -> _InstrumentedMeta:
+        meta = self._table.meta
+        return _InstrumentedMeta(meta, InstrumentedClient(meta.client, self._table_name))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._table, name)
+        if name not in self.OPERATIONS:
+            return attr
+        return lambda **params: metrics.call(self._table_name, name, attr, params)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Object Stores
+
+Attributes too large to keep in an item are written here by the codec and
+replaced with a pointer to their SHA-256 key. Objects are immutable, so
+identical content is stored once and fetched objects can be cached freely.
+The store is chosen with OBJECT_STORE:
+
+- none: offloading disabled (default); large attributes stay inline
+- s3: objects in OBJECT_STORE_BUCKET under OBJECT_STORE_PREFIX
+- filesystem: objects under OBJECT_STORE_PATH, for local development
+"""
+
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from app.aws_config import aws_config
+
+
+class ObjectStore(ABC):
+    """Immutable blobs keyed by content hash, with a bounded read cache"""
+
+    name = "base"
+
+    def __init__(self, cache_bytes: int = 32 * 1024 * 1024):
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _read(self, key: str) -> bytes:
+        """Fetch an object, raising KeyError if it doesn't exist"""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes):
+        """Store an object under a key that is not taken yet"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+
+    def put(self, key: str, data: bytes):
+        """Store data unless identical content is already stored"""
+        if not self.exists(key):
+            self._write(key, data)
+
+    def get(self, key: str) -> bytes:
+        """Fetch an object, from the cache when possible"""
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+
+        data = self._read(key)
+        if len(data) <= self.cache_bytes:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = data
+                    self._cached_bytes += len(data)
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return data
+
+
+class S3ObjectStore(ObjectStore):
+    """Objects in an S3 bucket"""
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "objects/", **kwargs):
+        super().__init__(**kwargs)
+        if not bucket:
+            raise ValueError("OBJECT_STORE=s3 requires OBJECT_STORE_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _read(self, key: str) -> bytes:
+        try:
+            response = aws_config.s3.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise KeyError(key)
+            raise Exception(f"Failed to fetch object {key}: {e}")
+        return response['Body'].read()
+
+    def _write(self, key: str, data: bytes):
+        try:
+            aws_config.s3.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data,
+                                     ContentType="application/octet-stream")
+        except ClientError as e:
+            raise Exception(f"Failed to store object {key}: {e}")
+
+    def exists(self, key: str) -> bool:
+        try:
+            aws_config.s3.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound'):
+                return False
+            raise Exception(f"Failed to check object {key}: {e}")
+
+
+class FileObjectStore(ObjectStore):
+    """Objects as files under a directory, fanned out by key prefix"""
+
+    name = "filesystem"
+
+    def __init__(self, root: str, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _read(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial object
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+
+_store: Optional[ObjectStore] = None
+_store_lock = threading.Lock()
+_store_loaded = False
+
+
+def create_object_store(kind: str) -> Optional[ObjectStore]:
+    """Build a store by its OBJECT_STORE name; None disables offloading"""
+    if kind in ('', 'none'):
+        return None
+    if kind == 's3':
+        return S3ObjectStore(aws_config.object_store_bucket, aws_config.object_store_prefix,
+                             cache_bytes=aws_config.object_store_cache_bytes)
+    if kind == 'filesystem':
+        return FileObjectStore(aws_config.object_store_path, cache_bytes=aws_config.object_store_cache_bytes)
+    raise ValueError(f"Unknown OBJECT_STORE {kind!r}; expected none, s3 or filesystem")
+
+
+def get_object_store() -> Optional[ObjectStore]:
+    """The process-wide object store, or None when offloading is disabled"""
+    global _store, _store_loaded
+    with _store_lock:
+        if not _store_loaded:
+            _store = create_object_store(aws_config.object_store)
+            _store_loaded = True
+        return _store
+
+
+def set_object_store(store: Optional[ObjectStore]):
+    """Swap the object store, e.g. to a FileObjectStore in tests"""
+    global _store, _store_loaded
+    with _store_lock:
+        _store = store
+        _store_loaded = True
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+SQLite Storage Backend
+
+Durable single-node tables. Each DynamoDB table is a SQLite table holding
+the item as tagged JSON, with key columns and a real SQL index for the
+base key and every GSI, so queries never fall back to full scans.
+"""
+
+import json
+import sqlite3
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.storage.base import LocalBackend, LocalTable
+from app.storage.codec import decode_value, encode_value
+
+# Rows fetched per round trip while iterating a table or index
+_FETCH_SIZE = 256
+
+
+def _column(value: Any) -> Any:
+    """SQLite value that sorts like the DynamoDB key value
+
+    SQLite orders numbers before text before blobs, as DynamoDB does.
+    Numbers beyond float precision only lose ordering detail; the exact
+    value is kept in the item and the pk column.
+    """
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value() and abs(value) < 2 ** 63:
+            return int(value)
+        return float(value)
+    return value
+
+
+class SQLiteTable(LocalTable):
+    """One SQL table with a composite index per key schema"""
+
+    def __init__(self, backend: 'SQLiteBackend', table_name: str, schema: Dict[str, Any]):
+        super().__init__(backend, table_name, schema)
+        # One connection per backend, so all tables share its lock
+        self.lock = backend.db_lock
+        self.db = backend.db
+        self.sql_name = '"' + table_name.replace('"', '""') + '"'
+        self.index_columns = {
+            name: (f"g{n}_h", f"g{n}_r") for n, name in enumerate(self.indexes)
+        }
+        self._create()
+
+    def _create(self):
+        index_columns = "".join(f", {h}, {r}" for h, r in self.index_columns.values())
+        with self.lock:
+            self.db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.sql_name} "
+                f"(pk TEXT PRIMARY KEY, h NOT NULL, r NOT NULL, item TEXT NOT NULL{index_columns})"
+            )
+            self.db.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.name}__base" ON {self.sql_name} (h, r, pk)'
+            )
+            for name, (h, r) in self.index_columns.items():
+                self.db.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{self.name}__{name}" ON {self.sql_name} ({h}, {r}, pk)'
+                )
+
+    def _pk(self, item: Dict[str, Any]) -> str:
+        key = [encode_value(item.get(self.hash_key))]
+        if self.range_key:
+            key.append(encode_value(item.get(self.range_key)))
+        return json.dumps(key, separators=(",", ":"))
+
+    def _index_values(self, item: Dict[str, Any]) -> List[Any]:
+        values = []
+        for name in self.index_columns:
+            hash_key, range_key = self.indexes[name]
+            if hash_key not in item or (range_key and range_key not in item):
+                values.extend([None, None])  # Sparse index
+            else:
+                values.extend([_column(item[hash_key]), _column(item[range_key]) if range_key else ""])
+        return values
+
+    def _row(self, item: Dict[str, Any], index_name: Optional[str] = None) -> tuple:
+        """Sort position of an item within the base table or an index"""
+        pk = self._pk(item)
+        if index_name:
+            hash_key, range_key = self.indexes[index_name]
+            return (_column(item.get(hash_key)),
+                    _column(item.get(range_key)) if range_key else "", pk)
+        return (_column(item.get(self.hash_key)),
+                _column(item.get(self.range_key)) if self.range_key else "", pk)
+
+    def _get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(f"SELECT item FROM {self.sql_name} WHERE pk = ?", (self._pk(key),)).fetchone()
+        return decode_value(json.loads(row[0])) if row else None
+
+    def _put(self, item: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+        h, r, pk = self._row(item)
+        columns = "pk, h, r, item" + "".join(f", {h_col}, {r_col}" for h_col, r_col in self.index_columns.values())
+        values = [pk, h, r, json.dumps(encode_value(item), separators=(",", ":"))] + self._index_values(item)
+        placeholders = ", ".join("?" for _ in values)
+        self.db.execute(f"INSERT OR REPLACE INTO {self.sql_name} ({columns}) VALUES ({placeholders})", values)
+
+    def _delete(self, item: Dict[str, Any]):
+        self.db.execute(f"DELETE FROM {self.sql_name} WHERE pk = ?", (self._pk(item),))
+
+    def _iterate(self, index_name: Optional[str], hash_value: Any,
+                 start_key: Optional[Dict[str, Any]], forward: bool) -> Iterator[Dict[str, Any]]:
+        h_col, r_col = self.index_columns[index_name] if index_name else ("h", "r")
+        direction, comparison = ("ASC", ">") if forward else ("DESC", "<")
+
+        where, params = [f"{h_col} IS NOT NULL"], []
+        if hash_value is not None:
+            where.append(f"{h_col} = ?")
+            params.append(_column(hash_value))
+
+        cursor = self._row(start_key, index_name) if start_key else None
+        while True:
+            clauses, args = list(where), list(params)
+            if cursor is not None:
+                clauses.append(f"({h_col}, {r_col}, pk) {comparison} (?, ?, ?)")
+                args.extend(cursor)
+            sql = (f"SELECT {h_col}, {r_col}, pk, item FROM {self.sql_name} WHERE {' AND '.join(clauses)} "
+                   f"ORDER BY {h_col} {direction}, {r_col} {direction}, pk {direction} LIMIT {_FETCH_SIZE}")
+            with self.lock:
+                rows = self.db.execute(sql, args).fetchall()
+            for row in rows:
+                yield decode_value(json.loads(row[3]))
+            if len(rows) < _FETCH_SIZE:
+                return
+            cursor = rows[-1][:3]
+
+    def _stats(self) -> Tuple[int, int]:
+        with self.lock:
+            count, size = self.db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(LENGTH(item)), 0) FROM {self.sql_name}"
+            ).fetchone()
+        return count, size
+
+
+class SQLiteBackend(LocalBackend):
+    """Durable backend in a single SQLite database file"""
+
+    name = "sqlite"
+
+    def __init__(self, table_prefix: str, path: str):
+        super().__init__(table_prefix)
+        self.path = path
+        self.db_lock = threading.RLock()
+        # Autocommit; every write is its own transaction
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+
+    def _create_table(self, table_name: str, schema: Dict[str, Any]) -> SQLiteTable:
+        return SQLiteTable(self, table_name, schema)
@@ -0,0 +1,862 @@
+"""
+Prismo DynamoDB Table Schemas
+
+Single source of truth for every table's key schema and secondary indexes.
+Used by setup_tables.py to create the tables and by the ORM to plan
+queries against the right key or index.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+TABLE_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    # Users table
+    "users": {
+        "key_schema": [{"AttributeName": "cognito_user_id", "KeyType": "HASH"}],
+        "attribute_definitions": [{"AttributeName": "cognito_user_id", "AttributeType": "S"}],
+    },
+    # Labs table
+    "labs": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "lab_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "lab-type-index",
+                "KeySchema": [{"AttributeName": "lab_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Widgets table
+    "widgets": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "widget_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "widget-type-index",
+                "KeySchema": [{"AttributeName": "widget_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Collections table
+    "collections": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Modules table (composed learning sequences)
+    "modules": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "module_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "module-type-index",
+                "KeySchema": [{"AttributeName": "module_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Attempts table (user lab attempts and progress)
+    "attempts": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "lab_id", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "lab-id-index",
+                "KeySchema": [{"AttributeName": "lab_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-created-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Mastery table (skill mastery tracking)
+    "mastery": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "skill_tag", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "skill-tag-index",
+                "KeySchema": [{"AttributeName": "skill_tag", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Feedback table (generated feedback and ratings)
+    "feedback": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "widget_id", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "widget-id-index",
+                "KeySchema": [{"AttributeName": "widget_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Analytics - Widget Selection table
+    "widget-selection": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "module_id", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "module-id-index",
+                "KeySchema": [{"AttributeName": "module_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-created-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Analytics - Feedback Generated table
+    "feedback-generated": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "module_id", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "module-id-index",
+                "KeySchema": [{"AttributeName": "module_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-created-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Learning Sessions table
+    "learning-sessions": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "session_date", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "session-date-index",
+                "KeySchema": [{"AttributeName": "session_date", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Skill Progress table
+    "skill-progress": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "skill_tag", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "skill-tag-index",
+                "KeySchema": [{"AttributeName": "skill_tag", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Skill Tags table
+    "skill-tags": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "category", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "category-index",
+                "KeySchema": [{"AttributeName": "category", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Difficulty Levels table
+    "difficulty-levels": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "level", "AttributeType": "N"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "level-index",
+                "KeySchema": [{"AttributeName": "level", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Learning Paths table
+    "learning-paths": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "path_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "path-type-index",
+                "KeySchema": [{"AttributeName": "path_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Educator Content table (manual lab overrides)
+    "educator-content": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "educator_id", "AttributeType": "S"},
+            {"AttributeName": "content_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "educator-id-index",
+                "KeySchema": [{"AttributeName": "educator_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "content-type-index",
+                "KeySchema": [{"AttributeName": "content_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Lab Templates table (AI-generated templates)
+    "lab-templates": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "template_type", "AttributeType": "S"},
+            {"AttributeName": "difficulty", "AttributeType": "N"},
+            {"AttributeName": "subject", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "template-type-index",
+                "KeySchema": [{"AttributeName": "template_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "difficulty-index",
+                "KeySchema": [{"AttributeName": "difficulty", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "subject-index",
+                "KeySchema": [{"AttributeName": "subject", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Widget Registry table (centralized widget definitions)
+    "widget-registry": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "widget_type", "AttributeType": "S"},
+            {"AttributeName": "domain", "AttributeType": "S"},
+            {"AttributeName": "version", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "widget-type-index",
+                "KeySchema": [{"AttributeName": "widget_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "domain-index",
+                "KeySchema": [{"AttributeName": "domain", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "version-index",
+                "KeySchema": [{"AttributeName": "version", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Lab Steps table (individual steps within labs)
+    "lab-steps": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "lab_id", "AttributeType": "S"},
+            {"AttributeName": "step_order", "AttributeType": "N"},
+            {"AttributeName": "step_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "lab-id-index",
+                "KeySchema": [{"AttributeName": "lab_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "lab-step-order-index",
+                "KeySchema": [
+                    {"AttributeName": "lab_id", "KeyType": "HASH"},
+                    {"AttributeName": "step_order", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "step-type-index",
+                "KeySchema": [{"AttributeName": "step_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Hints table (progressive hints for each step)
+    "hints": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "step_id", "AttributeType": "S"},
+            {"AttributeName": "hint_level", "AttributeType": "N"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "step-id-index",
+                "KeySchema": [{"AttributeName": "step_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "step-hint-level-index",
+                "KeySchema": [
+                    {"AttributeName": "step_id", "KeyType": "HASH"},
+                    {"AttributeName": "hint_level", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # User Preferences table
+    "user-preferences": {
+        "key_schema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "preference_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "preference-type-index",
+                "KeySchema": [{"AttributeName": "preference_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Notifications table
+    "notifications": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "notification_type", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "notification-type-index",
+                "KeySchema": [{"AttributeName": "notification_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-created-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Streaks table (learning streaks and motivation)
+    "streaks": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "streak_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "streak-type-index",
+                "KeySchema": [{"AttributeName": "streak_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Badges table (achievements and milestones)
+    "badges": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "badge_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "badge-type-index",
+                "KeySchema": [{"AttributeName": "badge_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Version History table (lab attempt versions)
+    "version-history": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "attempt_id", "AttributeType": "S"},
+            {"AttributeName": "version_number", "AttributeType": "N"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "attempt-id-index",
+                "KeySchema": [{"AttributeName": "attempt_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "attempt-version-index",
+                "KeySchema": [
+                    {"AttributeName": "attempt_id", "KeyType": "HASH"},
+                    {"AttributeName": "version_number", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Coach Chat Messages table
+    "coach-chat": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "session_id", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "session-id-index",
+                "KeySchema": [{"AttributeName": "session_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-created-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Walkthrough Sessions table
+    "walkthrough-sessions": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "step_id", "AttributeType": "S"},
+            {"AttributeName": "session_status", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "step-id-index",
+                "KeySchema": [{"AttributeName": "step_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "session-status-index",
+                "KeySchema": [{"AttributeName": "session_status", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Micro Assessments table
+    "micro-assessments": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "skill_tag", "AttributeType": "S"},
+            {"AttributeName": "assessment_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "skill-tag-index",
+                "KeySchema": [{"AttributeName": "skill_tag", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "assessment-type-index",
+                "KeySchema": [{"AttributeName": "assessment_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Sandbox Sessions table
+    "sandbox-sessions": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "session_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "session-type-index",
+                "KeySchema": [{"AttributeName": "session_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Review Sessions table
+    "review-sessions": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "review_type", "AttributeType": "S"},
+            {"AttributeName": "session_date", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "review-type-index",
+                "KeySchema": [{"AttributeName": "review_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "session-date-index",
+                "KeySchema": [{"AttributeName": "session_date", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Accessibility Settings table
+    "accessibility-settings": {
+        "key_schema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "setting_type", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "setting-type-index",
+                "KeySchema": [{"AttributeName": "setting_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # API Usage Analytics table
+    "api-usage": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "endpoint", "AttributeType": "S"},
+            {"AttributeName": "timestamp", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "endpoint-index",
+                "KeySchema": [{"AttributeName": "endpoint", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-timestamp-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Error Logs table
+    "error-logs": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "error_type", "AttributeType": "S"},
+            {"AttributeName": "severity", "AttributeType": "S"},
+            {"AttributeName": "timestamp", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "error-type-index",
+                "KeySchema": [{"AttributeName": "error_type", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "severity-index",
+                "KeySchema": [{"AttributeName": "severity", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "timestamp-index",
+                "KeySchema": [{"AttributeName": "timestamp", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # System Configuration table
+    "system-config": {
+        "key_schema": [{"AttributeName": "config_key", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "config_key", "AttributeType": "S"},
+            {"AttributeName": "config_category", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "config-category-index",
+                "KeySchema": [{"AttributeName": "config_category", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Module Sessions table (tracks when users start and work on modules)
+    "module-sessions": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "user_id", "AttributeType": "S"},
+            {"AttributeName": "module_id", "AttributeType": "S"},
+            {"AttributeName": "status", "AttributeType": "S"},
+            {"AttributeName": "started_at", "AttributeType": "S"},
+        ],
+        "global_secondary_indexes": [
+            {
+                "IndexName": "user-id-index",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "module-id-index",
+                "KeySchema": [{"AttributeName": "module_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-status-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "status", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "user-started-index",
+                "KeySchema": [
+                    {"AttributeName": "user_id", "KeyType": "HASH"},
+                    {"AttributeName": "started_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Session Interactions table (append-only widget events, one item per event)
+    "session-interactions": {
+        "key_schema": [
+            {"AttributeName": "session_id", "KeyType": "HASH"},
+            {"AttributeName": "event_key", "KeyType": "RANGE"},
+        ],
+        "attribute_definitions": [
+            {"AttributeName": "session_id", "AttributeType": "S"},
+            {"AttributeName": "event_key", "AttributeType": "S"},
+        ],
+    },
+    # Widget Performance table (one record per widget, id is the widget_id)
+    "widget-performance": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+        ],
+    },
+    # Widget Usage table (one record per widget, id is the widget_id)
+    "widget-usage": {
+        "key_schema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "id", "AttributeType": "S"},
+        ],
+    },
+    # Counters table (materialized per-table and per-user item counts)
+    "counters": {
+        "key_schema": [{"AttributeName": "counter_id", "KeyType": "HASH"}],
+        "attribute_definitions": [
+            {"AttributeName": "counter_id", "AttributeType": "S"},
+        ],
+    },
+}
+
+
+def get_table_schema(table_type: str) -> Optional[Dict[str, Any]]:
+    """Get the schema for an unprefixed table name, e.g. module-sessions"""
+    return TABLE_SCHEMAS.get(table_type)
+
+
+def key_attributes(key_schema: List[Dict[str, str]]) -> Tuple[str, Optional[str]]:
+    """Return the (hash, range) attribute names of a key schema"""
+    hash_key = next(k["AttributeName"] for k in key_schema if k["KeyType"] == "HASH")
+    range_key = next((k["AttributeName"] for k in key_schema if k["KeyType"] == "RANGE"), None)
+    return hash_key, range_key
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Offline Cognito Token Verification
+
+Cognito signs its JWTs with RS256 keys published as a JWKS document. The
+verifier checks a token's signature against a cached copy of that key set
+and validates ``exp``, ``iss``, ``token_use`` and the app client (the
+``client_id`` claim of access tokens, ``aud`` of ID tokens), so no network
+call is needed per request.
+
+Keys come from COGNITO_JWKS_URL (derived from the user pool by default)
+and are refreshed every JWKS_REFRESH_INTERVAL seconds, or sooner when a
+token names an unknown key id (Cognito rotating keys). JWKS_PATH loads the
+key set from a local file instead, e.g. one generated for tests.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Optional
+
+import jwt
+
+from app.aws_config import aws_config
+
+
+class TokenVerificationError(Exception):
+    """The token is malformed, forged, expired or meant for another client"""
+
+
+class KeySetUnavailableError(Exception):
+    """The signing keys could not be loaded, so tokens can't be checked offline"""
+
+
+class JWKSKeySet:
+    """Signing keys by key id, loaded from a URL or file and refreshed periodically"""
+
+    def __init__(self, url: Optional[str] = None, path: Optional[str] = None,
+                 refresh_interval: float = 3600.0, min_refresh_interval: float = 60.0,
+                 timeout: float = 2.0):
+        if not url and not path:
+            raise ValueError("JWKSKeySet needs a JWKS url or path")
+        self.url = url
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, Any] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_key(self, kid: str) -> Any:
+        """Public key for a key id, refreshing the set if it is stale or lacks the id"""
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now - self._loaded_at < self.refresh_interval:
+            return key
+
+        with self._lock:
+            key = self._keys.get(kid)
+            stale = time.monotonic() - self._loaded_at >= self.refresh_interval
+            # An unknown kid only forces a reload once per min_refresh_interval,
+            # so tokens with made-up key ids can't hammer the JWKS endpoint
+            may_reload = stale or time.monotonic() - self._loaded_at >= self.min_refresh_interval
+            if (key is None or stale) and may_reload:
+                try:
+                    self._keys = self._load()
+                    self._loaded_at = time.monotonic()
+                except Exception as e:
+                    if not self._keys:
+                        raise KeySetUnavailableError(f"Failed to load JWKS: {e}")
+                    # Keep serving the previous keys until the endpoint recovers
+                    print(f"WARNING: Failed to refresh JWKS, using cached keys: {e}")
+                key = self._keys.get(kid)
+
+        if key is None:
+            raise TokenVerificationError(f"Unknown signing key {kid!r}")
+        return key
+
+    def _load(self) -> Dict[str, Any]:
+        if self.path:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        else:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                document = json.loads(response.read())
+        return {
+            jwk['kid']: jwt.PyJWK.from_dict(jwk).key
+            for jwk in document.get('keys', [])
+            if jwk.get('kid') and jwk.get('kty') == 'RSA'
+        }
+
+
+class CognitoTokenVerifier:
+    """RS256 verification of Cognito access and ID tokens"""
+
+    def __init__(self, keys: JWKSKeySet, issuer: str, client_id: Optional[str], leeway: float = 30.0):
+        self.keys = keys
+        self.issuer = issuer
+        self.client_id = client_id
+        self.leeway = leeway
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Claims of a valid token; raises TokenVerificationError otherwise"""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed token: {e}")
+        if header.get('alg') != 'RS256':
+            raise TokenVerificationError(f"Unexpected signing algorithm {header.get('alg')!r}")
+
+        key = self.keys.get_key(header.get('kid', ''))
+        try:
+            claims = jwt.decode(
+                token, key, algorithms=['RS256'], issuer=self.issuer, leeway=self.leeway,
+                options={'require': ['exp', 'iss', 'sub', 'token_use'], 'verify_aud': False}
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+        token_use = claims['token_use']
+        if token_use == 'access':
+            audience = claims.get('client_id')
+        elif token_use == 'id':
+            audience = claims.get('aud')
+        else:
+            raise TokenVerificationError(f"Unexpected token_use {token_use!r}")
+        if self.client_id and audience != self.client_id:
+            raise TokenVerificationError("Token was issued to another app client")
+        return claims
+
+
+def create_token_verifier() -> Optional[CognitoTokenVerifier]:
+    """Verifier from aws_config, or None when there is no key source to verify against"""
+    if not aws_config.auth_offline_verification:
+        return None
+    if not aws_config.jwks_path and not aws_config.cognito_jwks_url:
+        return None
+    keys = JWKSKeySet(
+        url=aws_config.cognito_jwks_url,
+        path=aws_config.jwks_path,
+        refresh_interval=aws_config.jwks_refresh_interval
+    )
+    return CognitoTokenVerifier(keys, aws_config.cognito_issuer, aws_config.cognito_client_id,
+                                leeway=aws_config.jwt_leeway)
@@ -3,36 +3,48 @@
 Script to fix corrupted time_spent values in module_sessions table
 """
 
-import boto3
+import json
 import os
 from datetime import datetime
 
-# Initialize DynamoDB
-region = os.getenv("AWS_REGION", "us-east-1")
-dynamodb = boto3.resource('dynamodb', region_name=region)
+from app.orm import orm
 
-table = dynamodb.Table('prismo_module_sessions')
+# Per-segment scan progress, so an interrupted run resumes where it stopped
+CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fix_time_spent.checkpoint.json")
+
+def load_checkpoints():
+    """Load per-segment checkpoints from a previous interrupted run"""
+    if not os.path.exists(CHECKPOINT_FILE):
+        return {}
+    with open(CHECKPOINT_FILE) as f:
+        return {int(segment): key for segment, key in json.load(f).items()}
+
+def save_checkpoint(checkpoints, segment, last_key):
+    """Record the last key processed for a scan segment"""
+    checkpoints[segment] = last_key
+    with open(CHECKPOINT_FILE, "w") as f:
+        json.dump(checkpoints, f)
 
 def fix_time_spent():
     """Scan all module sessions and fix corrupted time_spent values"""
     
     print("Scanning module_sessions table...")
-    response = table.scan()
-    items = response.get('Items', [])
-    
-    # Handle pagination
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        items.extend(response.get('Items', []))
-    
-    print(f"Found {len(items)} module sessions\n")
     
+    total_count = 0
     fixed_count = 0
     current_timestamp = int(datetime.now().timestamp())
+    checkpoints = load_checkpoints()
+    if checkpoints:
+        print(f"Resuming from checkpoints for {len(checkpoints)} segments")
     
-    for item in items:
-        session_id = item.get('id')
-        time_spent = item.get('time_spent', 0)
+    # Parallel segmented scan, streamed so memory stays flat on large tables
+    for session in orm.module_sessions.parallel_scan(
+        checkpoints=dict(checkpoints),
+        on_checkpoint=lambda segment, last_key: save_checkpoint(checkpoints, segment, last_key)
+    ):
+        total_count += 1
+        session_id = session.id
+        time_spent = session.time_spent or 0
         
         # Check if time_spent looks corrupted
         needs_fix = False
@@ -51,24 +63,23 @@ def fix_time_spent():
         # If it's reasonable but > 24 hours for a single session
         elif time_spent > 86400:  # 24 hours
             print(f"Session {session_id}: QUESTIONABLE - time_spent={time_spent}s ({time_spent/3600:.1f}h)")
-            print(f"  Created: {item.get('created_at')}")
-            print(f"  Updated: {item.get('updated_at')}")
+            print(f"  Created: {session.created_at}")
+            print(f"  Updated: {session.updated_at}")
         else:
             # Normal value
             continue
         
         if needs_fix:
             print(f"  → Fixing: {time_spent} → {new_value}")
-            table.update_item(
-                Key={'id': session_id},
-                UpdateExpression='SET time_spent = :val',
-                ExpressionAttributeValues={':val': new_value}
-            )
+            orm.module_sessions.update(session_id, {'time_spent': new_value})
             fixed_count += 1
             print(f"  ✓ Fixed\n")
     
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    
     print(f"\nSummary:")
-    print(f"  Total sessions: {len(items)}")
+    print(f"  Total sessions: {total_count}")
     print(f"  Fixed: {fixed_count}")
     print(f"  Done!")
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-process test harnesses
+
+Runs test cases through run_test_cases (no server needed) and compares the
+C++ harness, which compiles once, with compiling every test program.
+"""
+
+import shutil
+import sys
+import time
+
+from app.claude_routes import execute_cpp_code, run_test_cases
+from app.sandbox import TestRun, run_cpp_tests, run_python_tests
+
+PYTHON_CODE = '''
+def add(a, b):
+    return a + b
+
+print("loaded")
+'''
+
+CPP_CODE = '''
+#include <iostream>
+using namespace std;
+
+int add(int a, int b) {
+    return a + b;
+}
+'''
+
+
+def check_python() -> bool:
+    print("[TEST] Python tests in one harness process...")
+    runs = run_python_tests(PYTHON_CODE, [
+        "print(add(2, 3))",
+        "print(add(1))",
+        "import time\ntime.sleep(10)",
+        "import sys\nsys.exit(4)",
+    ], timeout=1)
+    assert runs is not None, "harness failed"
+    assert runs[0].output == "loaded\n5\n" and runs[0].error is None, runs[0]
+    assert 'File "main.py", line 7' in runs[1].error and "TypeError" in runs[1].error, runs[1].error
+    assert runs[2].output is None and "timed out" in runs[2].error, runs[2]
+    assert runs[3].error == "", runs[3]
+    print(f"[SUCCESS] Output, tracebacks, timeouts and exit codes per test "
+          f"({', '.join(f'{run.time_ms:.1f}' for run in runs)} ms)")
+
+    base = TestRun("loaded\n", None, 12)
+    results = run_test_cases(PYTHON_CODE, "python", [
+        {"id": "same", "input": "", "expectedOutput": "loaded"},
+        {"id": "add", "input": "print(add(2, 3))", "expectedOutput": "loaded\n5"},
+        {"id": "again", "input": "print(add(2, 3))", "expectedOutput": "loaded\n5"},
+        {"id": "wrong", "input": "print(add(2, 2))", "expectedOutput": "loaded\n5"},
+    ], base)
+    assert [r["passed"] for r in results] == [True, True, True, False], results
+    assert results[0]["executionTime"] == 12
+    print("[SUCCESS] run_test_cases reuses the base run for tests without input")
+    return True
+
+
+def check_cpp() -> bool:
+    if shutil.which("g++") is None:
+        print("[SKIP] g++ is not installed")
+        return True
+
+    print("[TEST] C++ tests with one compile...")
+    inputs = [f"int main() {{ cout << add({i}, {i}) << endl; return 0; }}" for i in range(10)]
+    start = time.perf_counter()
+    runs = run_cpp_tests(CPP_CODE, inputs)
+    harness_ms = (time.perf_counter() - start) * 1000
+    assert runs is not None, "harness failed"
+    assert [run.output for run in runs] == [f"{2 * i}\n" for i in range(10)], runs
+    assert run_cpp_tests(CPP_CODE, ["int main() { while (true) {} return 0; }"], timeout=0.5)[0].error.startswith(
+        "Error: Code execution timed out")
+    # No return in a renamed main: falls back to separate runs
+    assert run_cpp_tests(CPP_CODE, ["int main() { cout << add(1, 1); }"]) is None
+
+    start = time.perf_counter()
+    for test_input in inputs:
+        execute_cpp_code(f"{CPP_CODE}\n{test_input}")
+    separate_ms = (time.perf_counter() - start) * 1000
+    print(f"[SUCCESS] 10 tests: {harness_ms:.0f} ms with one compile, {separate_ms:.0f} ms compiling each")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        passed = check_python() and check_cpp()
+    except Exception as e:
+        print(f"[ERROR] Test harness test failed: {e!r}")
+        passed = False
+    print("\nAll test harness tests passed!" if passed else "\nSome test harness tests failed")
+    sys.exit(0 if passed else 1)
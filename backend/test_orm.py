@@ -174,6 +174,15 @@ def test_orm_operations():
         })
         print("[SUCCESS] System configuration created")
         
+        # Test 15: Streaming scan across pages
+        print("\n[TEST] Streaming scan of user labs...")
+        streamed_labs = list(orm.labs.iter_scan(
+            filter_expression='user_id = :user_id',
+            expression_values={':user_id': user.id},
+            page_size=2
+        ))
+        print(f"[SUCCESS] Streamed {len(streamed_labs)} labs for user")
+        
         print("\n" + "=" * 50)
         print("[SUCCESS] All ORM tests passed!")
         print("Your Prismo backend ORM is working perfectly!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm Python worker pool
+
+Runs programs through a PythonWorkerPool directly (no server needed) and
+compares its latency with starting a new python3 per run.
+"""
+
+import os
+import sys
+import time
+
+from app.claude_routes import execute_python_subprocess
+from app.sandbox import ExecutionTimeout, PythonWorkerPool, pool_supported
+
+HELLO = 'def greet(name):\n    return f"Hello, {name}!"\n\nprint(greet("World"))\n'
+
+
+def run_tests() -> bool:
+    pool = PythonWorkerPool(size=2, timeout=3, cpu_seconds=1, memory_mb=256, output_bytes=64 * 1024)
+    try:
+        print("[TEST] Running a simple program...")
+        output, error, code = pool.run(HELLO)
+        assert (output, error, code) == ("Hello, World!\n", "", 0), (output, error, code)
+        print("[SUCCESS] Output captured")
+
+        print("[TEST] Errors and exit codes...")
+        output, error, code = pool.run("print('before')\nraise ValueError('boom')\n")
+        assert code == 1 and output == "before\n", (output, code)
+        assert 'File "main.py", line 2' in error and "ValueError: boom" in error, error
+        assert pool.run("import sys\nsys.exit(3)\n")[2] == 3
+        assert pool.run("def broken(:\n")[2] == 1
+        print("[SUCCESS] Tracebacks and exit codes match a script run")
+
+        print("[TEST] Workers are recycled and isolated...")
+        pool.run("import math\nmath.pi = 3\n")
+        assert pool.run("import math\nprint(math.pi > 3)\n")[0] == "True\n"
+        assert pool.run("import os\nprint('AWS_SECRET_ACCESS_KEY' in os.environ)\n")[0] == "False\n"
+        print("[SUCCESS] Each program gets a fresh worker without the server's environment")
+
+        print("[TEST] Limits...")
+        try:
+            pool.run("import time\ntime.sleep(10)\n")
+            raise AssertionError("sleep should have timed out")
+        except ExecutionTimeout:
+            pass
+        assert pool.run("while True:\n    pass\n")[2] != 0
+        output, error, code = pool.run("x = bytearray(1024 * 1024 * 1024)\n")
+        assert code == 1 and "MemoryError" in error, error
+        output, error, code = pool.run("while True:\n    print('x' * 1000)\n")
+        assert code == 1 and len(output) <= 64 * 1024, (code, len(output))
+        assert pool.run("print('still working')\n")[0] == "still working\n"
+        print("[SUCCESS] Timeout, CPU, memory and output limits enforced")
+
+        print("[TEST] Latency...")
+        pool.run(HELLO)
+        time.sleep(0.5)  # Let the pool refill
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            pool.run(HELLO)
+        pooled = (time.perf_counter() - start) / runs * 1000
+        start = time.perf_counter()
+        for _ in range(5):
+            execute_python_subprocess(HELLO)
+        fresh = (time.perf_counter() - start) / 5 * 1000
+        print(f"[SUCCESS] {pooled:.1f} ms per pooled run, {fresh:.1f} ms per new process")
+        print(f"Pool stats: {pool.stats()}")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Python worker pool test failed: {e!r}")
+        return False
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    if not pool_supported():
+        print("Python worker pool is not supported on this platform")
+        sys.exit(0)
+    passed = run_tests()
+    print("\nAll Python worker pool tests passed!" if passed else "\nSome Python worker pool tests failed")
+    sys.exit(0 if passed else 1)
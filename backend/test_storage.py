@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for the local storage backends
+
+Runs the ORM against the in-memory and SQLite backends, so it needs no
+AWS account or credentials.
+"""
+
+import copy
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from app.orm import (
+    BaseModel, DynamoDBORM, Lab, ModuleSession, PaginationParams, ConditionalCheckError, TransactionCancelledError,
+    UnitOfWork, User
+)
+from app.storage import MemoryBackend, SQLiteBackend, set_backend
+from app.aws_config import aws_config
+
+
+class StubbornTable:
+    """Table whose BatchWriteItem leaves the last request of every call unprocessed
+
+    Unprocessed requests come back as copies, as boto3 deserializes them.
+    """
+
+    def __init__(self, table):
+        self._table = table
+        self.meta = SimpleNamespace(client=self)
+
+    def batch_write_item(self, RequestItems):
+        (name, requests), = RequestItems.items()
+        self._table.meta.client.batch_write_item(RequestItems={name: requests[:-1]})
+        return {'UnprocessedItems': {name: [copy.deepcopy(requests[-1])]}}
+
+    def __getattr__(self, name):
+        return getattr(self._table.meta.client if name.startswith('batch_') else self._table, name)
+
+
+def run_backend_tests(backend) -> bool:
+    """Exercise the ORM paths the routes rely on against one backend"""
+    print(f"\n[BACKEND] {backend.name}")
+    set_backend(backend)
+    labs = DynamoDBORM("labs", Lab)
+    sessions = DynamoDBORM("module-sessions", ModuleSession)
+
+    try:
+        print("[TEST] Creating labs...")
+        for i in range(12):
+            labs.create({
+                'id': f'lab-{i:02}', 'user_id': 'user-a' if i % 2 else 'user-b',
+                'name': f'Lab {i}', 'lab_type': 'coding', 'description': '',
+                'content': {'steps': [i]}, 'is_public': i % 3 == 0, 'tags': ['python'],
+                'difficulty': i, 'estimated_time': 10
+            })
+        print("[SUCCESS] 12 labs created")
+
+        print("[TEST] Querying user-id-index with pagination...")
+        first = labs.find({'user_id': 'user-a'}, pagination=PaginationParams(limit=4))
+        rest = labs.find({'user_id': 'user-a'},
+                         pagination=PaginationParams(limit=10, last_evaluated_key=first.last_evaluated_key))
+        assert len(first.items) + len(rest.items) == 6, "expected 6 labs for user-a"
+        print("[SUCCESS] Index query paged through all 6 labs")
+
+        print("[TEST] Filtered scan and count...")
+        public = list(labs.iter_scan(filter_expression="is_public = :p", expression_values={":p": True}, page_size=5))
+        assert len(public) == 4, "expected 4 public labs"
+        assert labs.count() == 12
+        print("[SUCCESS] Scan filters and counts match")
+
+        print("[TEST] Batch get and delete...")
+        found = labs.batch_get(['lab-03', 'lab-01', 'missing'], preserve_order=True)
+        assert [lab.id for lab in found] == ['lab-03', 'lab-01']
+        deleted = labs.batch_delete([f'lab-{i:02}' for i in range(6)])
+        assert deleted.succeeded == 6 and labs.count() == 6
+        print("[SUCCESS] Batch operations applied")
+
+        print("[TEST] Cached reads after overwrites...")
+        users = DynamoDBORM("users", User, cache_size=16, counted=True)
+        user_key = {'cognito_user_id': 'sub-1'}
+        users.create({**user_key, 'email': 'a@example.com', 'username': 'before'})
+        assert users.get_by_key(user_key).username == 'before'
+        users.create({**user_key, 'email': 'a@example.com', 'username': 'after'})
+        assert users.get_by_key(user_key).username == 'after'
+        users.batch_put([{**user_key, 'email': 'a@example.com', 'username': 'batched'}])
+        assert users.get_by_key(user_key).username == 'batched'
+        assert users.count() == 1
+        print("[SUCCESS] Overwriting a user evicts its cached record")
+
+        print("[TEST] Cached ownership checks between counter updates...")
+        cached_sessions = DynamoDBORM("module-sessions", ModuleSession, cache_size=16)
+        cached_sessions.atomic_update({'id': 'cached-session'}, set_fields={
+            'user_id': 'user-a', 'module_id': 'module-1', 'status': 'started',
+            'started_at': '2025-01-01T00:00:00', 'last_activity_at': '2025-01-01T00:00:00'
+        })
+        for i in range(5):
+            owner = cached_sessions.get_by_id('cached-session', fields=['id', 'user_id'])
+            assert owner.user_id == 'user-a'
+            session = cached_sessions.atomic_update({'id': 'cached-session'}, add={'interaction_count': 1})
+        assert session.interaction_count == 5
+        assert cached_sessions.get_by_id('cached-session').interaction_count == 5
+        stats = cached_sessions.cache.stats()
+        assert stats['hits'] == 6 and stats['misses'] == 0, stats
+        cached_sessions.cache.clear()
+        assert cached_sessions.get_by_id('cached-session', fields=['user_id']).user_id == 'user-a'
+        assert cached_sessions.get_by_id('cached-session').interaction_count == 5
+        assert cached_sessions.cache.stats()['hits'] == 7
+        print("[SUCCESS] Projected reads are served from the item each update cached")
+
+        print("[TEST] Batch writes to a counted table...")
+        users.batch_put([{'cognito_user_id': f'sub-{i}', 'username': f'user {i}', 'user_id': 'owner'}
+                         for i in range(2, 31)])
+        assert users.item_count() == 30 and users.item_count('owner') == 29
+        deleted = users.batch_delete([{'cognito_user_id': f'sub-{i}'} for i in range(20, 40)])
+        assert deleted.succeeded == 20 and users.count() == 19
+        assert users.item_count() == 19 and users.item_count('owner') == 18
+        print("[SUCCESS] Batched puts and deletes keep the maintained counts exact")
+
+        print("[TEST] Batch writes left unprocessed...")
+        users.table = StubbornTable(users.table)
+        written = users.batch_put([{'cognito_user_id': f'stuck-{i}', 'user_id': 'owner'} for i in range(30)],
+                                  max_retries=1)
+        assert written.succeeded == 28, written
+        assert [failure['item']['cognito_user_id'] for failure in written.failed] == ['stuck-24', 'stuck-29']
+        assert users.item_count() == users.count() == 47 and users.item_count('owner') == 46
+        users.table = users.table._table
+        print("[SUCCESS] Requests still unprocessed after retries are reported and not counted")
+
+        print("[TEST] Atomic counters and versioned updates...")
+        session_key = {'id': 'session-1'}
+        sessions.atomic_update(session_key, set_fields={
+            'user_id': 'user-a', 'module_id': 'module-1', 'status': 'started',
+            'started_at': '2025-01-01T00:00:00', 'last_activity_at': '2025-01-01T00:00:00'
+        })
+        for _ in range(3):
+            session = sessions.increment(session_key, {'interaction_count': 1})
+        assert session.interaction_count == 3
+        sessions.update_with_version(session_key, lambda current: {'status': 'in_progress'})
+        try:
+            sessions.atomic_update(session_key, set_fields={'status': 'x'},
+                                   condition_expression="attribute_not_exists(id)")
+            raise AssertionError("condition should have failed")
+        except ConditionalCheckError:
+            pass
+        print("[SUCCESS] Counters, versions and conditions behave like DynamoDB")
+
+        print("[TEST] Write-behind buffer...")
+        error_logs = DynamoDBORM("error-logs", BaseModel, counted=True, buffered=True)
+        for i in range(60):
+            error_logs.create_deferred({'error_type': 'test', 'message': f'error {i}', 'user_id': 'user-a'})
+        error_logs.buffer.close()
+        assert error_logs.count() == 60 and error_logs.item_count('user-a') == 60
+        print("[SUCCESS] Deferred records flushed and counted")
+
+        print("[TEST] Write-behind batches left unprocessed...")
+        error_logs = DynamoDBORM("error-logs", BaseModel, counted=True, buffered=True)
+        error_logs.table = StubbornTable(error_logs.table)
+        for i in range(60):
+            error_logs.create_deferred({'error_type': 'test', 'message': f'stuck {i}', 'user_id': 'user-b'})
+        error_logs.buffer.close()
+        error_logs.table = error_logs.table._table
+        stored = error_logs.count() - 60
+        assert 0 < stored < 60 and error_logs.item_count('user-b') == stored, stored
+        assert error_logs.item_count() == error_logs.count()
+        print(f"[SUCCESS] Only the {stored} written records were counted")
+
+        print("[TEST] Transactions...")
+        with UnitOfWork() as uow:
+            uow.update(sessions, session_key, add={'interaction_count': 1})
+            uow.put(labs, {'id': 'lab-tx', 'user_id': 'user-a', 'name': 'Tx'})
+        try:
+            with UnitOfWork() as uow:
+                uow.update(sessions, session_key, add={'interaction_count': 1})
+                uow.update(labs, {'id': 'lab-tx'}, set_fields={'name': 'Duplicate'},
+                           condition_expression="attribute_not_exists(id)")
+            raise AssertionError("failed condition should cancel the transaction")
+        except ConditionalCheckError:
+            pass
+        assert sessions.get_by_key(session_key).interaction_count == 4
+        assert labs.get_by_id('lab-tx').name == 'Tx'
+        print("[SUCCESS] Transactions apply all writes or none")
+
+        print("[TEST] Units of work split into several transactions...")
+        before = users.item_count()
+        try:
+            with UnitOfWork() as uow:
+                for i in range(100):
+                    uow.put(users, {'cognito_user_id': f'tx-{i}'})
+                # Counted puts must create their item, and this one exists
+                uow.put(users, {'cognito_user_id': 'sub-1'})
+            raise AssertionError("the second transaction should have been cancelled")
+        except TransactionCancelledError as e:
+            assert e.code(100) == 'ConditionalCheckFailed' and e.code(0) is None, e.reasons
+        assert users.item_count() == users.count() == before + 100
+        print("[SUCCESS] Writes of the committed transaction were counted")
+
+        return True
+    except Exception as e:
+        print(f"[ERROR] {backend.name} backend failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    prefix = aws_config.dynamodb_table_prefix
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run_backend_tests(MemoryBackend(prefix)),
+            run_backend_tests(SQLiteBackend(prefix, os.path.join(directory, "prismo.db")))
+        ]
+    print("\nAll storage backend tests passed!" if all(results) else "\nSome storage backend tests failed")
+    sys.exit(0 if all(results) else 1)
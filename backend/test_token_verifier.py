@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for offline token verification
+
+Generates an RSA key, writes its public half as a local JWKS file (the
+same file JWKS_PATH accepts) and checks Cognito-style tokens against it,
+so it needs no AWS account or credentials. User records live in the
+in-memory storage backend.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from app.auth_service import auth_service
+from app.identity import Identity
+from app.orm import orm
+from app.token_verifier import CognitoTokenVerifier, JWKSKeySet, TokenVerificationError
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_TestPool"
+CLIENT_ID = "test-client"
+
+
+def write_jwks(path: str, key, kid: str):
+    """Write the public half of key as a one-key JWKS document"""
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"keys": [jwk]}, f)
+
+
+def sign(key, kid: str, **overrides) -> str:
+    """Cognito-style access token"""
+    claims = {
+        "sub": "user-123", "username": "tester", "token_use": "access", "client_id": CLIENT_ID,
+        "iss": ISSUER, "exp": int(time.time()) + 3600, "iat": int(time.time())
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})
+
+
+def expect_rejected(verifier: CognitoTokenVerifier, token: str, reason: str):
+    try:
+        verifier.verify(token)
+    except TokenVerificationError:
+        print(f"[SUCCESS] Rejected {reason}")
+        return
+    raise AssertionError(f"{reason} should have been rejected")
+
+
+def run_tests(directory: str) -> bool:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, "jwks.json")
+    write_jwks(path, key, "test-key")
+    verifier = CognitoTokenVerifier(JWKSKeySet(path=path), ISSUER, CLIENT_ID, leeway=0)
+
+    try:
+        print("[TEST] Verifying a valid access token...")
+        claims = verifier.verify(sign(key, "test-key"))
+        assert claims["sub"] == "user-123"
+        id_claims = verifier.verify(sign(key, "test-key", token_use="id", aud=CLIENT_ID, client_id=None))
+        assert id_claims["token_use"] == "id"
+        print("[SUCCESS] Access and ID tokens verified offline")
+
+        print("[TEST] Rejecting bad tokens...")
+        expect_rejected(verifier, sign(key, "test-key", exp=int(time.time()) - 10), "expired token")
+        expect_rejected(verifier, sign(key, "test-key", iss=ISSUER + "x"), "foreign issuer")
+        expect_rejected(verifier, sign(key, "test-key", client_id="other-client"), "other app client")
+        expect_rejected(verifier, sign(other_key, "test-key"), "forged signature")
+        expect_rejected(verifier, sign(key, "unknown-key"), "unknown key id")
+        expect_rejected(verifier, "not-a-token", "malformed token")
+
+        print("[TEST] Resolving callers to their user records...")
+        auth_service.token_verifier = verifier
+        orm.users.create({'cognito_user_id': 'user-123', 'email': 'tester@example.com', 'username': 'tester'})
+        # Older Google users are keyed by their Cognito username, not the sub
+        orm.users.create({'cognito_user_id': 'Google_1057', 'email': 'g@example.com', 'username': 'Google_1057'})
+        identity = Identity(auth_service.resolve_identity(sign(key, "test-key")))
+        assert identity.user_id == "user-123" and identity.user["username"] == "tester"
+        federated = sign(key, "test-key", sub="federated-sub", username="Google_1057")
+        identity = Identity(auth_service.resolve_identity(federated))
+        assert identity.user_id == "Google_1057", identity.user_id
+        assert identity.user["email"] == "g@example.com"
+        assert auth_service.verify_token(federated)["user_id"] == "Google_1057"
+        unknown = auth_service.resolve_identity(sign(key, "test-key", sub="new-sub", username="new"))
+        assert unknown["user_id"] == "new-sub"
+        print("[SUCCESS] Federated users keep the id their rows are stored under")
+
+        print("[TEST] Timing cached verification...")
+        token = sign(key, "test-key")
+        start = time.perf_counter()
+        for _ in range(200):
+            verifier.verify(token)
+        print(f"[SUCCESS] {(time.perf_counter() - start) / 200 * 1e6:.0f} us per verification")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Token verification test failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        passed = run_tests(directory)
+    print("\nAll token verification tests passed!" if passed else "\nSome token verification tests failed")
+    sys.exit(0 if passed else 1)